@@ -0,0 +1,60 @@
+"""Add appointment reminder queue
+
+Revision ID: 8b2e4c6d1f35
+Revises: 3f9c1a7b2d40
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4c6d1f35'
+down_revision = '3f9c1a7b2d40'
+branch_labels = None
+depends_on = None
+
+
+reminder_kind = sa.Enum('day_before', 'hour_before', name='reminderkind')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'appointment_reminders',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('appointment_id', sa.Integer(), sa.ForeignKey('appointments.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('kind', reminder_kind, nullable=False),
+        sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('appointment_id', 'kind', name='uq_appointment_reminders_appointment_kind'),
+    )
+    op.create_index('ix_appointment_reminders_id', 'appointment_reminders', ['id'])
+    op.create_index(
+        'ix_appointment_reminders_unsent_due',
+        'appointment_reminders',
+        ['due_at'],
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+
+    # Queue reminders for appointments that were booked before this table existed.
+    op.execute(
+        """
+        INSERT INTO appointment_reminders (appointment_id, kind, due_at, attempts)
+        SELECT a.id, r.kind::reminderkind, a.start_time - r.offset_interval, 0
+        FROM appointments a
+        CROSS JOIN (VALUES ('day_before', interval '24 hours'),
+                           ('hour_before', interval '1 hour')) AS r(kind, offset_interval)
+        WHERE a.status = 'scheduled' AND a.start_time - r.offset_interval > now()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointment_reminders_unsent_due', table_name='appointment_reminders')
+    op.drop_index('ix_appointment_reminders_id', table_name='appointment_reminders')
+    op.drop_table('appointment_reminders')
+    reminder_kind.drop(op.get_bind(), checkfirst=True)
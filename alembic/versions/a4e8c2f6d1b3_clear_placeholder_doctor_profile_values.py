@@ -0,0 +1,32 @@
+"""Clear placeholder experience and languages from doctor profiles
+
+Revision ID: a4e8c2f6d1b3
+Revises: f1c8a4d6b2e9
+Create Date: 2026-10-20 04:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e8c2f6d1b3'
+down_revision = 'f1c8a4d6b2e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Experience and languages were derived from the doctor id, not entered
+    # by anyone; the directory treats NULL / empty as unknown.
+    op.execute(
+        """
+        UPDATE doctor_profiles
+        SET years_experience = NULL, languages = '{}'
+        WHERE years_experience = (doctor_id * 3) % 15 + 1
+            AND languages = ARRAY['English', 'Spanish']::varchar[]
+        """
+    )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,33 @@
+"""Add doctor briefings
+
+Revision ID: a5d8c3e0f7b4
+Revises: f4c7b2d9e6a3
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d8c3e0f7b4'
+down_revision = 'f4c7b2d9e6a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'doctor_briefings',
+        sa.Column('doctor_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('appointments_version', sa.Integer(), nullable=False),
+        sa.Column('document', sa.Text(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('doctor_id', 'day'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('doctor_briefings')
@@ -0,0 +1,27 @@
+"""Add users.appointments_version
+
+Revision ID: a8d2c6e4f157
+Revises: f7c1b5d3e946
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d2c6e4f157'
+down_revision = 'f7c1b5d3e946'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('appointments_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'appointments_version')
@@ -0,0 +1,65 @@
+"""Add newest-first listing indexes on health_records
+
+Revision ID: b6e9d4f1a8c5
+Revises: a5d8c3e0f7b4
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e9d4f1a8c5'
+down_revision = 'a5d8c3e0f7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so record writes are not blocked; the new type index
+    # supersedes ix_health_records_patient_type_created, dropped once it exists.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_health_records_patient_recent',
+            'health_records',
+            ['patient_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_health_records_patient_type_recent',
+            'health_records',
+            ['patient_id', 'record_type', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_health_records_patient_type_created',
+            table_name='health_records',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_health_records_patient_type_created',
+            'health_records',
+            ['patient_id', 'record_type', 'created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_health_records_patient_type_recent',
+            table_name='health_records',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_health_records_patient_recent',
+            table_name='health_records',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,44 @@
+"""Make the doctor overlap constraint deferrable
+
+Revision ID: b9e3d7f5a268
+Revises: a8d2c6e4f157
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e3d7f5a268'
+down_revision = 'a8d2c6e4f157'
+branch_labels = None
+depends_on = None
+
+
+def _recreate_overlap_constraint(deferrable: str) -> None:
+    # Exclusion constraints cannot be altered in place, so swap them inside
+    # the migration's transaction.
+    op.drop_constraint('ex_appointments_doctor_no_overlap', 'appointments')
+    op.execute(
+        f"""
+        ALTER TABLE appointments
+        ADD CONSTRAINT ex_appointments_doctor_no_overlap
+        EXCLUDE USING gist (
+            doctor_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        )
+        WHERE (status = 'scheduled')
+        {deferrable}
+        """
+    )
+
+
+def upgrade() -> None:
+    # A deferrable constraint is checked at the end of each statement instead of
+    # per row, so one UPDATE can shift a block of back-to-back appointments.
+    _recreate_overlap_constraint('DEFERRABLE INITIALLY IMMEDIATE')
+
+
+def downgrade() -> None:
+    _recreate_overlap_constraint('NOT DEFERRABLE')
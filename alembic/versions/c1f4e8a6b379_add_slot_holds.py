@@ -0,0 +1,48 @@
+"""Add slot holds
+
+Revision ID: c1f4e8a6b379
+Revises: b9e3d7f5a268
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f4e8a6b379'
+down_revision = 'b9e3d7f5a268'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slot_holds',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('doctor_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('patient_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.CheckConstraint('end_time > start_time', name='ck_slot_holds_time_order'),
+    )
+    op.create_index('ix_slot_holds_id', 'slot_holds', ['id'])
+    op.create_index('ix_slot_holds_patient_id', 'slot_holds', ['patient_id'])
+    op.create_index('ix_slot_holds_expires_at', 'slot_holds', ['expires_at'])
+    # btree_gist was installed with the appointment overlap constraint.
+    op.execute(
+        """
+        ALTER TABLE slot_holds
+        ADD CONSTRAINT ex_slot_holds_doctor_no_overlap
+        EXCLUDE USING gist (
+            doctor_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('slot_holds')
@@ -0,0 +1,47 @@
+"""Add scheduler job run history
+
+Revision ID: c4d7e2a9b613
+Revises: 8b2e4c6d1f35
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e2a9b613'
+down_revision = '8b2e4c6d1f35'
+branch_labels = None
+depends_on = None
+
+
+job_run_status = sa.Enum('succeeded', 'failed', name='jobrunstatus')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduler_job_runs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.String(length=100), nullable=False),
+        sa.Column('status', job_run_status, nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_seconds', sa.Float(), nullable=False),
+        sa.Column('rows_scanned', sa.Integer(), nullable=False),
+        sa.Column('emails_attempted', sa.Integer(), nullable=False),
+        sa.Column('emails_sent', sa.Integer(), nullable=False),
+        sa.Column('emails_failed', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_scheduler_job_runs_id', 'scheduler_job_runs', ['id'])
+    op.create_index('ix_scheduler_job_runs_started_at', 'scheduler_job_runs', ['started_at'])
+    op.create_index('ix_scheduler_job_runs_job_started', 'scheduler_job_runs', ['job_id', 'started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scheduler_job_runs_job_started', table_name='scheduler_job_runs')
+    op.drop_index('ix_scheduler_job_runs_started_at', table_name='scheduler_job_runs')
+    op.drop_index('ix_scheduler_job_runs_id', table_name='scheduler_job_runs')
+    op.drop_table('scheduler_job_runs')
+    job_run_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,54 @@
+"""Store health record item lists as JSONB with GIN indexes
+
+Revision ID: c7f1a5b2d9e6
+Revises: b6e9d4f1a8c5
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f1a5b2d9e6'
+down_revision = 'b6e9d4f1a8c5'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('symptoms', 'diagnosis', 'treatment_plan', 'medication')
+INDEXED = ('symptoms', 'diagnosis', 'medication')
+
+
+def upgrade() -> None:
+    # One ALTER TABLE, so the table is rewritten once for all four columns.
+    op.execute(
+        'ALTER TABLE health_records '
+        + ', '.join(f'ALTER COLUMN {c} TYPE jsonb USING {c}::jsonb' for c in COLUMNS)
+    )
+
+    with op.get_context().autocommit_block():
+        for column in INDEXED:
+            op.create_index(
+                f'ix_health_records_{column}',
+                'health_records',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'jsonb_path_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in INDEXED:
+            op.drop_index(
+                f'ix_health_records_{column}',
+                table_name='health_records',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.execute(
+        'ALTER TABLE health_records '
+        + ', '.join(f'ALTER COLUMN {c} TYPE json USING {c}::json' for c in COLUMNS)
+    )
@@ -0,0 +1,62 @@
+"""Add doctor directory indexes
+
+Revision ID: d2a5f9b7c480
+Revises: c1f4e8a6b379
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a5f9b7c480'
+down_revision = 'c1f4e8a6b379'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # pg_trgm lets GIN indexes answer leading-wildcard ILIKE searches.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_available_doctors',
+            'users',
+            ['last_name', 'first_name'],
+            postgresql_where=sa.text("role = 'doctor' AND is_available"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_doctor_specialization_trgm
+            ON users USING gin (specialization gin_trgm_ops)
+            WHERE role = 'doctor'
+            """
+        )
+        # Must match DOCTOR_SEARCH_NAME in app/services/doctor.py.
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_doctor_name_trgm
+            ON users USING gin (
+                (coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops
+            )
+            WHERE role = 'doctor'
+            """
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index in (
+            'ix_users_doctor_name_trgm',
+            'ix_users_doctor_specialization_trgm',
+            'ix_users_available_doctors',
+        ):
+            op.drop_index(
+                index,
+                table_name='users',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,64 @@
+"""Prevent overlapping appointments per doctor
+
+Revision ID: d5a8f3b1c724
+Revises: c4d7e2a9b613
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f3b1c724'
+down_revision = 'c4d7e2a9b613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    invalid = bind.execute(sa.text(
+        "SELECT count(*) FROM appointments WHERE end_time <= start_time"
+    )).scalar()
+    overlapping = bind.execute(sa.text(
+        """
+        SELECT count(*)
+        FROM appointments a
+        JOIN appointments b
+          ON a.doctor_id = b.doctor_id
+         AND a.id < b.id
+         AND tstzrange(a.start_time, a.end_time) && tstzrange(b.start_time, b.end_time)
+        WHERE a.status = 'scheduled' AND b.status = 'scheduled'
+        """
+    )).scalar()
+    if invalid or overlapping:
+        raise RuntimeError(
+            f"Cannot add appointment constraints: {invalid} appointment(s) end before "
+            f"they start and {overlapping} pair(s) of scheduled appointments overlap "
+            "for the same doctor. Resolve them and re-run the migration."
+        )
+
+    op.create_check_constraint(
+        'ck_appointments_time_order', 'appointments', 'end_time > start_time'
+    )
+
+    # btree_gist provides the GiST operator class for the integer equality part.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        ALTER TABLE appointments
+        ADD CONSTRAINT ex_appointments_doctor_no_overlap
+        EXCLUDE USING gist (
+            doctor_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        )
+        WHERE (status = 'scheduled')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ex_appointments_doctor_no_overlap', 'appointments')
+    op.drop_constraint('ck_appointments_time_order', 'appointments', type_='check')
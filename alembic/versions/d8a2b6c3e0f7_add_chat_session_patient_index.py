@@ -0,0 +1,37 @@
+"""Add newest-first patient index on chat_sessions
+
+Revision ID: d8a2b6c3e0f7
+Revises: c7f1a5b2d9e6
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a2b6c3e0f7'
+down_revision = 'c7f1a5b2d9e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_chat_sessions_patient_recent',
+            'chat_sessions',
+            ['patient_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_chat_sessions_patient_recent',
+            table_name='chat_sessions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
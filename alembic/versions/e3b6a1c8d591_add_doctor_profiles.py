@@ -0,0 +1,69 @@
+"""Add doctor profiles
+
+Revision ID: e3b6a1c8d591
+Revises: d2a5f9b7c480
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b6a1c8d591'
+down_revision = 'd2a5f9b7c480'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'doctor_profiles',
+        sa.Column('doctor_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('years_experience', sa.Integer(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('expertise_areas', postgresql.ARRAY(sa.String(length=100)), server_default='{}', nullable=False),
+        sa.Column('languages', postgresql.ARRAY(sa.String(length=50)), server_default='{}', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+
+    # Backfill with the values the API used to compute on the fly for each
+    # doctor (see default_profile_values in app/services/doctor.py).
+    op.execute(
+        """
+        INSERT INTO doctor_profiles
+            (doctor_id, years_experience, bio, rating, expertise_areas, languages)
+        SELECT
+            id,
+            (id * 3) % 15 + 1,
+            'Experienced physician specializing in '
+                || coalesce(nullif(specialization, ''), 'General Medicine')
+                || '. Committed to providing compassionate and comprehensive care.',
+            4.0 + (id % 10) / 10.0,
+            CASE
+                WHEN coalesce(specialization, '') = '' THEN '{}'::varchar[]
+                ELSE string_to_array(specialization, ', ')::varchar[]
+                    || CASE
+                        WHEN specialization LIKE '%Cardiology%'
+                            THEN ARRAY['Heart Disease', 'Hypertension Management']::varchar[]
+                        WHEN specialization LIKE '%Neurology%'
+                            THEN ARRAY['Headache Disorders', 'Movement Disorders']::varchar[]
+                        ELSE '{}'::varchar[]
+                    END
+            END,
+            ARRAY['English', 'Spanish']::varchar[]
+        FROM users
+        WHERE role = 'doctor'
+        ON CONFLICT (doctor_id) DO NOTHING
+        """
+    )
+
+    op.create_index('ix_doctor_profiles_rating', 'doctor_profiles', ['rating'])
+    op.create_index('ix_doctor_profiles_years_experience', 'doctor_profiles', ['years_experience'])
+    op.create_index('ix_doctor_profiles_languages', 'doctor_profiles', ['languages'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_table('doctor_profiles')
@@ -0,0 +1,50 @@
+"""Add (participant, start_time) indexes on appointments
+
+Revision ID: e6b9a4c2d835
+Revises: d5a8f3b1c724
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b9a4c2d835'
+down_revision = 'd5a8f3b1c724'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so bookings are not blocked on a large table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_patient_start',
+            'appointments',
+            ['patient_id', 'start_time'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_appointments_doctor_start',
+            'appointments',
+            ['doctor_id', 'start_time'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_appointments_doctor_start',
+            table_name='appointments',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_appointments_patient_start',
+            table_name='appointments',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,74 @@
+"""Track reminder recipients and give up on exhausted reminders
+
+Revision ID: e9b3c7d1f4a8
+Revises: d8a2b6c3e0f7
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b3c7d1f4a8'
+down_revision = 'd8a2b6c3e0f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'appointment_reminders',
+        sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        'appointment_reminders',
+        sa.Column(
+            'delivered_to',
+            postgresql.ARRAY(sa.String(16)),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+    )
+    # Reminders the dispatcher already stopped retrying (5 attempts).
+    op.execute(
+        "UPDATE appointment_reminders SET failed_at = now() "
+        "WHERE sent_at IS NULL AND attempts >= 5"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointment_reminders_pending_due',
+            'appointment_reminders',
+            ['due_at'],
+            postgresql_where=sa.text('sent_at IS NULL AND failed_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_appointment_reminders_unsent_due',
+            table_name='appointment_reminders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointment_reminders_unsent_due',
+            'appointment_reminders',
+            ['due_at'],
+            postgresql_where=sa.text('sent_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_appointment_reminders_pending_due',
+            table_name='appointment_reminders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('appointment_reminders', 'delivered_to')
+    op.drop_column('appointment_reminders', 'failed_at')
@@ -0,0 +1,57 @@
+"""Index symptom and medication lists lower-cased for case-insensitive search
+
+Revision ID: f1c8a4d6b2e9
+Revises: e9b3c7d1f4a8
+Create Date: 2026-10-20 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c8a4d6b2e9'
+down_revision = 'e9b3c7d1f4a8'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('symptoms', 'medication')
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.create_index(
+                f'ix_health_records_{column}_lower',
+                'health_records',
+                [sa.text(f'(lower({column}::text)::jsonb) jsonb_path_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                f'ix_health_records_{column}',
+                table_name='health_records',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.create_index(
+                f'ix_health_records_{column}',
+                'health_records',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'jsonb_path_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                f'ix_health_records_{column}_lower',
+                table_name='health_records',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,52 @@
+"""Add doctor reviews and rating aggregates
+
+Revision ID: f4c7b2d9e6a3
+Revises: e3b6a1c8d591
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c7b2d9e6a3'
+down_revision = 'e3b6a1c8d591'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'doctor_reviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), sa.ForeignKey('appointments.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('patient_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('rating', sa.SmallInteger(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('appointment_id'),
+        sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_doctor_reviews_rating'),
+    )
+    op.create_index(op.f('ix_doctor_reviews_id'), 'doctor_reviews', ['id'], unique=False)
+    op.create_index('ix_doctor_reviews_doctor_created', 'doctor_reviews', ['doctor_id', 'created_at'])
+
+    op.add_column('doctor_profiles', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('doctor_profiles', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('doctor_profiles', sa.Column('rating_histogram', postgresql.ARRAY(sa.Integer()), server_default='{0,0,0,0,0}', nullable=False))
+
+    # The ratings backfilled with doctor_profiles were placeholders; ratings
+    # are now the average of the reviews, and there are none yet.
+    op.execute('UPDATE doctor_profiles SET rating = NULL')
+
+
+def downgrade() -> None:
+    op.drop_column('doctor_profiles', 'rating_histogram')
+    op.drop_column('doctor_profiles', 'rating_sum')
+    op.drop_column('doctor_profiles', 'rating_count')
+    op.drop_index('ix_doctor_reviews_doctor_created', table_name='doctor_reviews')
+    op.drop_index(op.f('ix_doctor_reviews_id'), table_name='doctor_reviews')
+    op.drop_table('doctor_reviews')
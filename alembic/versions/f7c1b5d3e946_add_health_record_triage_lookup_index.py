@@ -0,0 +1,36 @@
+"""Add (patient_id, record_type, created_at) index on health_records
+
+Revision ID: f7c1b5d3e946
+Revises: e6b9a4c2d835
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c1b5d3e946'
+down_revision = 'e6b9a4c2d835'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_health_records_patient_type_created',
+            'health_records',
+            ['patient_id', 'record_type', 'created_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_health_records_patient_type_created',
+            table_name='health_records',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
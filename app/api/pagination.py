@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, *row_keys) -> str:
+    """Opaque keyset cursor for the row after which the next page starts."""
+    payload = json.dumps([sort_value.isoformat(), *row_keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], key_types: Tuple[type, ...] = (int,)
+) -> Optional[tuple]:
+    """
+    Parse a cursor from `encode_cursor` whose row keys have `key_types`
+    (by default a single id); raises 400 if it is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, *row_keys = json.loads(base64.urlsafe_b64decode(padded))
+        if len(row_keys) != len(key_types):
+            raise ValueError("Wrong number of cursor keys")
+        return (
+            datetime.fromisoformat(sort_value),
+            *(key_type(key) for key_type, key in zip(key_types, row_keys)),
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Expose the next page cursor in a header, leaving the body a plain list."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,27 +1,68 @@
-from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.api.schemas.appointment import AppointmentRequest, AppointmentResponse
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.schemas.appointment import (
+    AppointmentDetailResponse,
+    AppointmentRequest,
+    AppointmentResponse,
+    AppointmentStatusUpdate,
+    AvailableSlot,
+    BulkAppointmentChange,
+    BulkAppointmentChangeResult,
+    SlotHoldRequest,
+    SlotHoldResponse,
+    TimeSlot,
+)
+from app.api.schemas.briefing import DoctorBriefingOut
 from app.api.schemas.doctor import DoctorList, DoctorDetail
 from app.api.schemas.health_record import HealthRecordOut
+from app.core.config import settings
 from app.db.database import get_db_session
 from app.models.appointment import Appointment, AppointmentStatus
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.services.appointment import (
+    bump_appointments_version,
+    change_scheduled_appointments,
+    find_nearest_free_slots,
+    get_doctor_busy_slots,
+    is_double_booking,
+    list_user_appointments,
+    sync_availability,
+)
 from app.services.auth import AuthService, oauth2_scheme
-from app.services.doctor import get_available_doctors, get_doctor_by_id
+from app.services.availability import availability_engine
+from app.services.briefing import clinic_today, get_briefing
+from app.services.doctor import (
+    doctor_directory_cache,
+    get_available_doctors,
+    get_doctor_by_id,
+)
 from app.services.health_record import (
     create_triage_record_from_chats,
     get_patient_health_records,
 )
+from app.services.reminders import create_appointment_reminders
+from app.services.slot_holds import (
+    confirm_hold,
+    is_slot_held,
+    place_hold,
+    release_hold,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_CALENDAR_RANGE = timedelta(days=62)
+_doctor_list_adapter = TypeAdapter(List[DoctorList])
+
 
 @router.post(
     "/",
@@ -44,6 +85,33 @@ async def schedule_appointment(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found."
             )
 
+        # Settle slot contention before the comparatively slow triage work.
+        if payload.hold_id is not None:
+            confirmed = await confirm_hold(
+                db,
+                payload.hold_id,
+                current_user.id,
+                payload.doctor_id,
+                payload.start_time,
+                payload.end_time,
+            )
+            if not confirmed:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Your hold on this slot has expired or does not match it. Please pick the slot again.",
+                )
+        elif await is_slot_held(
+            db,
+            payload.doctor_id,
+            payload.start_time,
+            payload.end_time,
+            exclude_patient_id=current_user.id,
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This slot is being booked by another patient.",
+            )
+
         new_appointment = Appointment(
             patient_id=current_user.id,
             doctor_id=payload.doctor_id,
@@ -53,8 +121,34 @@ async def schedule_appointment(
             telemedicine_url=payload.telemedicine_url,
         )
         db.add(new_appointment)
-        await db.flush()
+        try:
+            await db.flush()
+        except IntegrityError as exc:
+            if not is_double_booking(exc):
+                raise
+            await db.rollback()
+            free_slots = await find_nearest_free_slots(
+                db,
+                payload.doctor_id,
+                payload.start_time,
+                payload.end_time,
+                not_before=datetime.now(timezone.utc),
+            )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "The doctor already has an appointment at that time.",
+                    "nearest_free_slots": [
+                        TimeSlot(start_time=start, end_time=end).model_dump(mode="json")
+                        for start, end in free_slots
+                    ],
+                },
+            )
         await db.refresh(new_appointment)
+        create_appointment_reminders(db, new_appointment)
+        await bump_appointments_version(
+            db, [new_appointment.patient_id, new_appointment.doctor_id]
+        )
 
         triage_record = await create_triage_record_from_chats(
             db, current_user.id, payload.doctor_id
@@ -67,6 +161,11 @@ async def schedule_appointment(
 
         await db.commit()
         await db.refresh(new_appointment)
+        availability_engine.book(
+            new_appointment.doctor_id,
+            new_appointment.start_time,
+            new_appointment.end_time,
+        )
 
         return new_appointment
 
@@ -84,39 +183,145 @@ async def schedule_appointment(
         )
 
 
+@router.post(
+    "/holds",
+    response_model=SlotHoldResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Hold a slot while the booking is completed",
+)
+async def hold_slot(
+    payload: SlotHoldRequest,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Reserve a doctor's slot for the current user for a few minutes. Pass the
+    returned id as `hold_id` when booking; other patients cannot hold or book
+    the slot until the hold is confirmed, released or expires. Holding a new
+    slot releases the user's previous hold.
+    """
+    try:
+        current_user = await auth_service.get_current_user(token)
+        if payload.start_time <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot hold a slot in the past.",
+            )
+        doctor_id = await db.scalar(
+            select(User.id).where(User.id == payload.doctor_id, User.role == "doctor")
+        )
+        if doctor_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found."
+            )
+
+        hold = await place_hold(
+            db,
+            current_user.id,
+            payload.doctor_id,
+            payload.start_time,
+            payload.end_time,
+            timedelta(minutes=settings.SLOT_HOLD_MINUTES),
+        )
+        if hold is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This slot is already booked or held by another patient.",
+            )
+        await db.commit()
+        return hold
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(
+            f"Error holding slot with doctor {payload.doctor_id} for user {current_user.id if 'current_user' in locals() else 'unknown'}: {exc}"
+        )
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to hold the slot.",
+        )
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_slot_hold(
+    hold_id: int,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Release one of the current user's slot holds before it expires."""
+    try:
+        current_user = await auth_service.get_current_user(token)
+        if not await release_hold(db, hold_id, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Hold not found."
+            )
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(f"Error releasing slot hold {hold_id}: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to release the hold.",
+        )
+
+
 @router.get(
     "/my-appointments",
-    response_model=List[AppointmentResponse],
+    response_model=List[AppointmentDetailResponse],
+    response_model_exclude_unset=True,
     status_code=status.HTTP_200_OK,
-    summary="Get all appointments for the current user (patient or doctor)",
-    description="Retrieves a list of all appointments associated with the currently authenticated user, "
-    "regardless of whether they are the patient or the doctor in the appointment.",
+    summary="Get the appointments of the current user (patient or doctor)",
+    description="Retrieves a page of the appointments associated with the currently authenticated user, "
+    "regardless of whether they are the patient or the doctor in the appointment. "
+    "Supports date-range and status filters and keyset pagination via X-Next-Cursor. "
+    "With expand=true, rows include counterpart display fields and the latest triage record id.",
 )
 async def get_my_appointments(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header"
+    ),
+    start_from: Optional[datetime] = Query(
+        None, description="Only appointments starting at or after this time"
+    ),
+    start_to: Optional[datetime] = Query(
+        None, description="Only appointments starting before this time"
+    ),
+    appointment_status: Optional[AppointmentStatus] = Query(None, alias="status"),
+    expand: bool = Query(
+        False,
+        description="Include the counterpart's name, role and specialization "
+        "and the latest triage record id",
+    ),
     auth_service: AuthService = Depends(AuthService),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db_session),
 ):
     """
-    Retrieves all appointments linked to the current authenticated user's ID,
-    covering both cases where the user is the patient and where the user is the doctor.
+    Retrieves the current user's appointments, as patient or doctor, newest first.
+    Results are paginated: when more rows exist, the X-Next-Cursor response
+    header carries the cursor for the next page.
     """
+    after = decode_cursor(cursor)
     try:
         current_user: User = await auth_service.get_current_user(token)
 
-        query = (
-            select(Appointment)
-            .where(
-                or_(
-                    Appointment.patient_id == current_user.id,
-                    Appointment.doctor_id == current_user.id,
-                )
-            )
-            .order_by(Appointment.start_time.desc())
+        appointments, next_cursor = await list_user_appointments(
+            db,
+            current_user.id,
+            limit=limit,
+            after=after,
+            start_from=start_from,
+            start_to=start_to,
+            status=appointment_status,
+            expand=expand,
         )
-
-        result = await db.execute(query)
-        appointments = result.scalars().all()
+        set_next_cursor(response, next_cursor)
         return appointments
     except HTTPException as http_exc:
         raise http_exc
@@ -131,14 +336,32 @@ async def get_my_appointments(
         )
 
 
-@router.get("/{appointment_id}/health-records", response_model=List[HealthRecordOut])
+@router.get(
+    "/{appointment_id}/health-records",
+    response_model=List[HealthRecordOut],
+    response_model_exclude_unset=True,
+)
 async def get_patient_health_records_for_doctor(
     appointment_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header"
+    ),
+    summary: bool = Query(
+        False,
+        description="Leave out the symptoms, diagnosis, treatment_plan and "
+        "medication lists",
+    ),
     auth_service: AuthService = Depends(AuthService),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db_session),
 ):
-    """Get health records for a patient that a doctor is seeing."""
+    """
+    Get a page of the health records of a patient that a doctor is seeing,
+    newest first, with the next page cursor in the X-Next-Cursor header.
+    """
+    after = decode_cursor(cursor)
     try:
         current_user = await auth_service.get_current_user(token)
 
@@ -165,7 +388,10 @@ async def get_patient_health_records_for_doctor(
                 detail="You do not have permission to access health records for this appointment.",
             )
 
-        records = await get_patient_health_records(db, appointment.patient_id)
+        records, next_cursor = await get_patient_health_records(
+            db, appointment.patient_id, limit=limit, after=after, summary=summary
+        )
+        set_next_cursor(response, next_cursor)
         return records
     except HTTPException as http_exc:
         raise http_exc
@@ -180,20 +406,95 @@ async def get_patient_health_records_for_doctor(
         )
 
 
+@router.get(
+    "/briefing",
+    response_model=DoctorBriefingOut,
+    status_code=status.HTTP_200_OK,
+    summary="Get the current doctor's briefing for a day",
+    description="The doctor's appointments of a clinic day (default today) with each "
+    "patient's latest triage record and a digest of their health records. Briefings "
+    "for the next day are built nightly and kept current as records are added; "
+    "only today and tomorrow can be requested.",
+)
+async def get_doctor_briefing(
+    day: Optional[date] = Query(None, description="Clinic day, defaults to today"),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Serve the stored briefing document, building it first if needed."""
+    try:
+        current_user = await auth_service.get_current_user(token)
+        if current_user.role != UserRole.doctor:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only doctors have briefings.",
+            )
+        today = clinic_today()
+        day = day or today
+        if not today <= day <= today + timedelta(days=1):
+            # Briefings are stored; other days would pile up rows nobody prunes.
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Briefings are available for today and tomorrow only.",
+            )
+        document = await get_briefing(db, current_user.id, day)
+        return Response(content=document, media_type="application/json")
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        await db.rollback()
+        logger.error(
+            f"Error loading briefing for doctor {current_user.id if 'current_user' in locals() else 'unknown'}: {exc}"
+        )
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve the briefing.",
+        )
+
+
 @router.get("/doctors", response_model=List[DoctorList], status_code=status.HTTP_200_OK)
 async def list_available_doctors(
     specialization: Optional[str] = Query(
         None, description="Filter doctors by specialization"
     ),
+    name: Optional[str] = Query(None, description="Filter doctors by name"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    min_experience: Optional[int] = Query(
+        None, ge=0, description="Minimum years of experience"
+    ),
+    language: Optional[str] = Query(None, description="Spoken language"),
+    sort: Literal["name", "rating", "experience"] = Query("name"),
     auth_service: AuthService = Depends(AuthService),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db_session),
 ):
-    """Get a list of available doctors with their basic information."""
+    """
+    Get a list of available doctors with their basic information. The
+    serialized list is cached per filter.
+    """
     try:
         await auth_service.get_current_user(token)
-        doctors = await get_available_doctors(db, specialization)
-        return doctors
+        cache_key = doctor_directory_cache.key(
+            specialization, name, min_rating, min_experience, language, sort
+        )
+        payload = doctor_directory_cache.get(cache_key)
+        if payload is None:
+            doctors = await get_available_doctors(
+                db,
+                specialization,
+                name,
+                min_rating=min_rating,
+                min_experience=min_experience,
+                language=language,
+                sort=sort,
+            )
+            payload = _doctor_list_adapter.dump_json(
+                _doctor_list_adapter.validate_python(doctors, from_attributes=True)
+            )
+            doctor_directory_cache.set(cache_key, payload)
+        return Response(content=payload, media_type="application/json")
     except HTTPException as http_exc:
         raise http_exc
     except Exception as exc:
@@ -207,6 +508,241 @@ async def list_available_doctors(
         )
 
 
+@router.get(
+    "/availability",
+    response_model=List[AvailableSlot],
+    status_code=status.HTTP_200_OK,
+    summary="Find the first free appointment slots",
+)
+async def find_available_slots(
+    specialization: Optional[str] = Query(
+        None, description="Filter doctors by specialization"
+    ),
+    doctor_id: Optional[int] = Query(None, description="Only this doctor"),
+    count: int = Query(10, ge=1, le=100),
+    days: int = Query(14, ge=1, le=settings.AVAILABILITY_HORIZON_DAYS),
+    duration_minutes: int = Query(30, ge=15, le=240),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Get the earliest free slots across available doctors within the next `days`,
+    served from the in-memory availability snapshot.
+    """
+    try:
+        await auth_service.get_current_user(token)
+        await availability_engine.ensure_fresh(db)
+        slots = availability_engine.find_free_slots(
+            specialization=specialization,
+            doctor_id=doctor_id,
+            count=count,
+            days=days,
+            duration_minutes=duration_minutes,
+        )
+        return [slot._asdict() for slot in slots]
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(
+            f"Error finding available slots (specialization: {specialization}): {exc}"
+        )
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve available slots.",
+        )
+
+
+@router.get(
+    "/doctors/{doctor_id}/calendar",
+    response_model=List[TimeSlot],
+    status_code=status.HTTP_200_OK,
+)
+async def get_doctor_calendar(
+    doctor_id: int,
+    start: datetime = Query(..., description="Start of the range (inclusive)"),
+    end: datetime = Query(..., description="End of the range (exclusive)"),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Get the busy time slots of a doctor's scheduled appointments in a range."""
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start.",
+        )
+    if end - start > MAX_CALENDAR_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Calendar range cannot exceed {MAX_CALENDAR_RANGE.days} days.",
+        )
+    try:
+        await auth_service.get_current_user(token)
+        busy = await get_doctor_busy_slots(db, doctor_id, start, end)
+        return [
+            TimeSlot(start_time=slot_start, end_time=slot_end)
+            for slot_start, slot_end in busy
+        ]
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(f"Error retrieving calendar for doctor ID {doctor_id}: {exc}")
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve doctor calendar.",
+        )
+
+
+@router.post(
+    "/doctors/{doctor_id}/bulk-change",
+    response_model=BulkAppointmentChangeResult,
+    status_code=status.HTTP_200_OK,
+    summary="Cancel or shift a doctor's appointments in a time range",
+)
+async def bulk_change_doctor_appointments(
+    doctor_id: int,
+    payload: BulkAppointmentChange,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Cancel, or move by `shift_minutes`, every scheduled appointment of a doctor
+    starting in [start, end), e.g. for a leave of absence. Allowed for admins
+    and for the doctor themselves. Affected patients are notified through the
+    email outbox.
+    """
+    try:
+        current_user = await auth_service.get_current_user(token)
+        if current_user.role != UserRole.admin and current_user.id != doctor_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only administrators or the doctor can change these appointments.",
+            )
+
+        shift = (
+            timedelta(minutes=payload.shift_minutes)
+            if payload.action == "shift"
+            else None
+        )
+        try:
+            rows = await change_scheduled_appointments(
+                db,
+                [
+                    Appointment.doctor_id == doctor_id,
+                    Appointment.start_time >= payload.start,
+                    Appointment.start_time < payload.end,
+                ],
+                shift=shift,
+                notify_patients=payload.notify_patients,
+                reason=payload.reason,
+            )
+            await db.commit()
+        except IntegrityError as exc:
+            if not is_double_booking(exc):
+                raise
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Shifting would overlap other appointments of the doctor.",
+            )
+        sync_availability(rows, shift)
+
+        return BulkAppointmentChangeResult(
+            action=payload.action,
+            affected=len(rows),
+            notified_patients=len(rows) if payload.notify_patients else 0,
+            appointments=[
+                AppointmentResponse.model_validate(row, from_attributes=True)
+                for row in rows
+            ],
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(
+            f"Error changing appointments of doctor ID {doctor_id} ({payload.action}): {exc}"
+        )
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to change the doctor's appointments.",
+        )
+
+
+@router.patch(
+    "/{appointment_id}/status",
+    response_model=AppointmentResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def update_appointment_status(
+    appointment_id: int,
+    payload: AppointmentStatusUpdate,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Cancel or complete a scheduled appointment. Patients may cancel their own
+    appointments; the doctor may also mark them completed. The patient is
+    notified when someone else cancels.
+    """
+    try:
+        current_user = await auth_service.get_current_user(token)
+        appointment = await db.get(Appointment, appointment_id)
+        is_admin = current_user.role == UserRole.admin
+        if appointment is None or not (
+            is_admin
+            or current_user.id in (appointment.patient_id, appointment.doctor_id)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Appointment not found.",
+            )
+        if (
+            payload.status == "completed"
+            and not is_admin
+            and current_user.id != appointment.doctor_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the doctor can mark an appointment as completed.",
+            )
+
+        rows = await change_scheduled_appointments(
+            db,
+            [Appointment.id == appointment_id],
+            new_status=AppointmentStatus(payload.status),
+            notify_patients=(
+                payload.status == "cancelled"
+                and current_user.id != appointment.patient_id
+            ),
+            reason=payload.reason,
+        )
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Appointment is already {appointment.status.value}.",
+            )
+        await db.commit()
+        sync_availability(rows)
+        return AppointmentResponse.model_validate(rows[0], from_attributes=True)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        logger.error(
+            f"Error updating status of appointment {appointment_id} by user {current_user.id if 'current_user' in locals() else 'unknown'}: {exc}"
+        )
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update the appointment status.",
+        )
+
+
 @router.get(
     "/doctors/{doctor_id}", response_model=DoctorDetail, status_code=status.HTTP_200_OK
 )
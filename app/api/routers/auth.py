@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.auth import UserCreate, Token
+from app.core.config import settings
+from app.core.rate_limit import client_ip
 from app.db.database import get_db_session
 from app.services.auth import AuthService
 
@@ -23,6 +25,7 @@ async def register(
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db_session: AsyncSession = Depends(get_db_session),
     auth_service: AuthService = Depends(AuthService),
@@ -30,4 +33,6 @@ async def login(
     """
     Login endpoint for user authentication.
     """
-    return await auth_service.login_user(form_data, db_session)
+    return await auth_service.login_user(
+        form_data, db_session, client_ip(request, settings.TRUSTED_PROXY_COUNT)
+    )
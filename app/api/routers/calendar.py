@@ -0,0 +1,89 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.calendar import CalendarFeedUrl
+from app.db.database import get_db_session
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.calendar_feed import (
+    create_feed_token,
+    feed_etag,
+    feed_window_start,
+    get_appointments_version,
+    parse_feed_token,
+    render_feed,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+CALENDAR_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+@router.get("/feed-url", response_model=CalendarFeedUrl)
+async def get_calendar_feed_url(
+    request: Request,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+):
+    """Get the private iCalendar subscription URL for the current user."""
+    current_user = await auth_service.get_current_user(token)
+    feed_token = create_feed_token(current_user.id)
+    return CalendarFeedUrl(
+        url=str(request.url_for("get_calendar_feed", feed_token=feed_token))
+    )
+
+
+@router.get("/{feed_token}.ics", name="get_calendar_feed")
+async def get_calendar_feed(
+    feed_token: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    iCalendar feed of the user's appointments, for calendar app subscriptions.
+    Authenticated by the token in the URL. Supports conditional GET: when the
+    If-None-Match header carries the current ETag, a 304 is returned without
+    reading any appointments.
+    """
+    user_id = parse_feed_token(feed_token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found."
+        )
+
+    try:
+        version = await get_appointments_version(db, user_id)
+    except Exception as exc:
+        logger.error(f"Error loading calendar feed version for user {user_id}: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to load calendar feed.",
+        )
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found."
+        )
+
+    since = feed_window_start()
+    etag = feed_etag(user_id, version, since)
+    headers = {"ETag": etag, "Cache-Control": CALENDAR_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return StreamingResponse(
+        render_feed(db, user_id, since),
+        media_type="text/calendar; charset=utf-8",
+        headers={**headers, "Content-Disposition": 'inline; filename="healthsync.ics"'},
+    )
@@ -0,0 +1,68 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db_session
+from app.models.user import UserRole
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.patient_export import (
+    export_patient_resources,
+    get_export_patient,
+    render_ndjson_export,
+    render_zip_export,
+    resolve_resume_point,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/patient/{patient_id}",
+    summary="Export all of a patient's data",
+    description="Streams the patient's profile, chat messages, appointments and "
+    "health records as FHIR-style resources (Patient, Communication, Appointment, "
+    "Composition): NDJSON by default, or a zip with one .ndjson file per resource "
+    "type. To resume an interrupted export, pass the reference of the last "
+    "resource received as resume_after, e.g. Appointment/42.",
+    response_class=StreamingResponse,
+)
+async def export_patient(
+    patient_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|zip)$"),
+    resume_after: Optional[str] = Query(
+        None, description="Last resource received, as ResourceType/id"
+    ),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Stream a data-portability export of a patient."""
+    current_user = await auth_service.get_current_user(token)
+
+    if current_user.id != patient_id and current_user.role != UserRole.doctor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to export this patient's data",
+        )
+
+    patient = await get_export_patient(db, patient_id)
+    resume = await resolve_resume_point(db, patient_id, resume_after)
+    batches = export_patient_resources(db, patient, resume)
+    logger.info(f"User {current_user.id} exporting patient {patient_id} ({format})")
+
+    if format == "zip":
+        return StreamingResponse(
+            render_zip_export(batches),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="patient-{patient_id}-export.zip"'
+            },
+        )
+    return StreamingResponse(
+        render_ndjson_export(batches), media_type="application/fhir+ndjson"
+    )
@@ -1,11 +1,15 @@
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.pagination import decode_cursor, set_next_cursor
 from app.api.schemas.health_record import (
     HealthRecordOut,
+    HealthRecordSummaryOut,
     DoctorRecordCreate,
     HealthRecordCreate,
+    HealthRecordImportReport,
 )
 from app.db.database import get_db_session
 from app.services.auth import AuthService, oauth2_scheme
@@ -13,7 +17,10 @@ from app.services.health_record import (
     create_health_record,
     get_patient_health_records,
     get_health_record_by_id,
+    parse_record_type,
+    search_health_records,
 )
+from app.services.health_record_import import import_health_records, ndjson_lines
 from app.models.user import UserRole
 from app.models.health_record import RecordType
 
@@ -72,15 +79,76 @@ async def add_doctor_note(
     return await create_health_record(db, health_record, current_user.id)
 
 
-@router.get("/patient/{patient_id}", response_model=List[HealthRecordOut])
+@router.post(
+    "/bulk",
+    response_model=HealthRecordImportReport,
+    summary="Import health records from NDJSON",
+    description="The request body is NDJSON, one health record per line in the "
+    "shape of POST /api/health-record/. Valid rows are inserted in chunks and "
+    "invalid ones, including lines over 1 MiB, reported by line. If the import stops early, re-send the same "
+    "body with start_line set to the reported checkpoint to resume.",
+)
+async def bulk_import_health_records(
+    request: Request,
+    start_line: int = Query(
+        0, ge=0, description="Skip lines up to this one (a previous checkpoint)"
+    ),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Stream-parse and import many health records. Only doctors can import."""
+    current_user = await auth_service.get_current_user(token)
+
+    if current_user.role != UserRole.doctor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can import health records",
+        )
+
+    return await import_health_records(
+        db,
+        ndjson_lines(request.stream()),
+        creator_id=current_user.id,
+        start_line=start_line,
+    )
+
+
+@router.get(
+    "/patient/{patient_id}",
+    response_model=List[HealthRecordOut],
+    response_model_exclude_unset=True,
+)
 async def get_patient_records(
     patient_id: int,
+    response: Response,
     record_type: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(
+        None, description="Only records created at or after this time"
+    ),
+    created_to: Optional[datetime] = Query(
+        None, description="Only records created before this time"
+    ),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header"
+    ),
+    summary: bool = Query(
+        False,
+        description="Leave out the symptoms, diagnosis, treatment_plan and "
+        "medication lists",
+    ),
     auth_service: AuthService = Depends(AuthService),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db_session),
 ):
-    """Get all health records for a specific patient."""
+    """
+    Get a page of the health records of a specific patient, newest first.
+    When more records exist, the X-Next-Cursor response header carries the
+    cursor for the next page.
+    """
+    record_type_filter = parse_record_type(record_type)
+    after = decode_cursor(cursor)
     current_user = await auth_service.get_current_user(token)
 
     if current_user.id != patient_id and current_user.role != UserRole.doctor:
@@ -89,7 +157,63 @@ async def get_patient_records(
             detail="You don't have permission to access these records",
         )
 
-    return await get_patient_health_records(db, patient_id, record_type)
+    records, next_cursor = await get_patient_health_records(
+        db,
+        patient_id,
+        record_type_filter,
+        limit=limit,
+        after=after,
+        created_from=created_from,
+        created_to=created_to,
+        summary=summary,
+    )
+    set_next_cursor(response, next_cursor)
+    return records
+
+
+@router.get("/search", response_model=List[HealthRecordSummaryOut])
+async def search_records(
+    response: Response,
+    symptom: Optional[str] = Query(None, description="Symptom name"),
+    icd10_code: Optional[str] = Query(None, description="Diagnosis ICD-10 code"),
+    medication: Optional[str] = Query(None, description="Medication name"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header"
+    ),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Find records, across patients, listing a symptom, an ICD-10 diagnosis
+    code and/or a medication, newest first. Values must match whole, names
+    in any case; all given criteria must match. Only doctors can search.
+    """
+    criteria = {
+        "symptom": symptom and symptom.strip(),
+        "icd10_code": icd10_code and icd10_code.strip(),
+        "medication": medication and medication.strip(),
+    }
+    if not any(criteria.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give at least one of symptom, icd10_code or medication.",
+        )
+    after = decode_cursor(cursor)
+    current_user = await auth_service.get_current_user(token)
+
+    if current_user.role != UserRole.doctor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can search health records",
+        )
+
+    records, next_cursor = await search_health_records(
+        db, **criteria, limit=limit, after=after
+    )
+    set_next_cursor(response, next_cursor)
+    return records
 
 
 @router.get("/{record_id}", response_model=HealthRecordOut)
@@ -0,0 +1,78 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db_session
+from app.models.user import User, UserRole
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.presence import presence_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _current_doctor(auth_service: AuthService, token: str) -> User:
+    current_user: User = await auth_service.get_current_user(token)
+    if current_user.role != UserRole.doctor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors report presence.",
+        )
+    return current_user
+
+
+@router.post(
+    "/heartbeat",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Report that the doctor's client is online",
+    description="Doctors' clients call this periodically, well within PRESENCE_TTL_SECONDS. "
+    "A doctor is listed as available from the first heartbeat until they sign off or "
+    "their heartbeats stop.",
+)
+async def heartbeat(
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Refresh the current doctor's presence."""
+    try:
+        doctor = await _current_doctor(auth_service, token)
+        await presence_registry.heartbeat(db, doctor.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        await db.rollback()
+        logger.error(f"Error recording presence heartbeat: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to record the heartbeat.",
+        )
+
+
+@router.delete(
+    "/heartbeat",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Sign the doctor off",
+)
+async def sign_off(
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Mark the current doctor unavailable without waiting for the expiry."""
+    try:
+        doctor = await _current_doctor(auth_service, token)
+        await presence_registry.sign_off(db, doctor.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        await db.rollback()
+        logger.error(f"Error signing off doctor: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to sign off.",
+        )
@@ -0,0 +1,116 @@
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.schemas.review import ReviewCreate, ReviewOut, ReviewPublicOut
+from app.db.database import get_db_session
+from app.models.user import User, UserRole
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.review import (
+    add_review,
+    get_reviewable_appointment,
+    list_doctor_reviews,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    response_model=ReviewOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Review a completed appointment",
+    description="Rates the doctor of one of the current patient's completed appointments. "
+    "Each appointment can be reviewed once; the doctor's rating aggregates are updated "
+    "in the same transaction.",
+)
+async def create_review(
+    review_data: ReviewCreate,
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Submit a 1 to 5 star review of a completed appointment."""
+    try:
+        current_user: User = await auth_service.get_current_user(token)
+        if current_user.role != UserRole.patient:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only patients can review appointments.",
+            )
+
+        appointment = await get_reviewable_appointment(
+            db, review_data.appointment_id, current_user.id
+        )
+        if appointment is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No completed appointment found to review.",
+            )
+
+        try:
+            review = await add_review(
+                db, appointment, review_data.rating, review_data.comment
+            )
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This appointment has already been reviewed.",
+            )
+        await db.refresh(review)
+        return review
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as exc:
+        await db.rollback()
+        logger.error(
+            f"Error creating review for appointment {review_data.appointment_id}: {exc}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create the review.",
+        )
+
+
+@router.get(
+    "/doctors/{doctor_id}",
+    response_model=List[ReviewPublicOut],
+    summary="List a doctor's reviews",
+    description="Newest first, with keyset pagination via the X-Next-Cursor header.",
+)
+async def get_doctor_reviews(
+    doctor_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header"
+    ),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Retrieves a page of the reviews of a doctor."""
+    after = decode_cursor(cursor)
+    try:
+        await auth_service.get_current_user(token)
+        reviews, next_cursor = await list_doctor_reviews(
+            db, doctor_id, limit=limit, after=after
+        )
+        set_next_cursor(response, next_cursor)
+        return reviews
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.error(f"Error fetching reviews for doctor {doctor_id}: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve reviews.",
+        )
@@ -0,0 +1,67 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.scheduler import JobRunOut, JobRunSummary
+from app.db.database import get_db_session
+from app.models.scheduler_job_run import JobRunStatus
+from app.models.user import UserRole
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.job_runs import list_job_runs, summarize_job_runs
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _require_admin(auth_service: AuthService, token: str):
+    current_user = await auth_service.get_current_user(token)
+    if current_user.role != UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can view scheduler job runs",
+        )
+
+
+@router.get("/runs", response_model=List[JobRunOut])
+async def get_job_runs(
+    job_id: Optional[str] = Query(None, description="Only runs of this job."),
+    run_status: Optional[JobRunStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """List recent scheduler job executions, newest first."""
+    await _require_admin(auth_service, token)
+    try:
+        return await list_job_runs(db, job_id, run_status, limit)
+    except Exception as e:
+        logger.error(f"Error listing scheduler job runs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not list scheduler job runs",
+        )
+
+
+@router.get("/runs/summary", response_model=List[JobRunSummary])
+async def get_job_run_summary(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Per-job run counts, failures and duration percentiles over the last `hours`."""
+    await _require_admin(auth_service, token)
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    try:
+        return await summarize_job_runs(db, since)
+    except Exception as e:
+        logger.error(f"Error summarizing scheduler job runs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not summarize scheduler job runs",
+        )
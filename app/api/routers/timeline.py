@@ -0,0 +1,56 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import decode_cursor
+from app.db.database import get_db_session
+from app.models.user import UserRole
+from app.services.auth import AuthService, oauth2_scheme
+from app.services.timeline import TIMELINE_KINDS, stream_timeline
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/patient/{patient_id}",
+    summary="Stream a patient's timeline",
+    description="Chat messages, appointments and health records of a patient, newest "
+    "first, streamed as NDJSON: one object per line with type, id, at and data. "
+    "With limit, a final next_cursor line carries the cursor to continue from.",
+    response_class=StreamingResponse,
+)
+async def get_patient_timeline(
+    patient_id: int,
+    limit: Optional[int] = Query(
+        None, ge=1, description="Stop after this many entries (default: all)"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous response's next_cursor line"
+    ),
+    auth_service: AuthService = Depends(AuthService),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Stream the merged history of a patient."""
+    after = decode_cursor(cursor, key_types=(str, int))
+    if after is not None and after[1] not in TIMELINE_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+    current_user = await auth_service.get_current_user(token)
+
+    if current_user.id != patient_id and current_user.role != UserRole.doctor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this timeline",
+        )
+
+    return StreamingResponse(
+        stream_timeline(db, patient_id, after=after, limit=limit),
+        media_type="application/x-ndjson",
+    )
@@ -1,15 +1,58 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 
+# Longest range a single bulk change may cover, and the furthest it may move.
+MAX_BULK_RANGE = timedelta(days=92)
+MAX_SHIFT = timedelta(days=30)
 
-class AppointmentRequest(BaseModel):
+
+class SlotHoldRequest(BaseModel):
     doctor_id: int
 
     start_time: datetime
     end_time: datetime
+
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def as_utc(cls, value: datetime) -> datetime:
+        """Times without an offset have always been taken as UTC."""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+    @model_validator(mode="after")
+    def check_time_order(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class AppointmentRequest(SlotHoldRequest):
     telemedicine_url: Optional[str] = None
+    # Hold from POST /holds on exactly this slot, confirmed by the booking.
+    hold_id: Optional[int] = None
+
+
+class SlotHoldResponse(BaseModel):
+    id: int
+    doctor_id: int
+    start_time: datetime
+    end_time: datetime
+    expires_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class TimeSlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class AvailableSlot(TimeSlot):
+    doctor_id: int
 
 
 class AppointmentResponse(BaseModel):
@@ -23,3 +66,48 @@ class AppointmentResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class AppointmentDetailResponse(AppointmentResponse):
+    """Appointment with the display fields the appointments screen needs."""
+
+    counterpart_name: Optional[str] = None
+    counterpart_role: Optional[str] = None
+    counterpart_specialization: Optional[str] = None
+    latest_triage_record_id: Optional[int] = None
+
+
+class AppointmentStatusUpdate(BaseModel):
+    status: Literal["cancelled", "completed"]
+    reason: Optional[str] = Field(None, max_length=500)
+
+
+class BulkAppointmentChange(BaseModel):
+    """Cancel or shift all of a doctor's scheduled appointments starting in [start, end)."""
+
+    action: Literal["cancel", "shift"]
+    start: datetime
+    end: datetime
+    shift_minutes: Optional[int] = None
+    reason: Optional[str] = Field(None, max_length=500)
+    notify_patients: bool = True
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.end <= self.start:
+            raise ValueError("end must be after start")
+        if self.end - self.start > MAX_BULK_RANGE:
+            raise ValueError(f"range cannot exceed {MAX_BULK_RANGE.days} days")
+        if self.action == "shift":
+            if not self.shift_minutes:
+                raise ValueError("shift_minutes is required to shift appointments")
+            if abs(timedelta(minutes=self.shift_minutes)) > MAX_SHIFT:
+                raise ValueError(f"shift cannot exceed {MAX_SHIFT.days} days")
+        return self
+
+
+class BulkAppointmentChangeResult(BaseModel):
+    action: str
+    affected: int
+    notified_patients: int
+    appointments: List[AppointmentResponse]
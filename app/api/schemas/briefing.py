@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BriefingPatient(BaseModel):
+    id: int
+    name: str
+    date_of_birth: Optional[date] = None
+    gender: Optional[str] = None
+    blood_type: Optional[str] = None
+    allergies: Optional[str] = None
+    existing_conditions: Optional[str] = None
+
+
+class BriefingTriage(BaseModel):
+    id: int
+    title: str
+    summary: Optional[str] = None
+    triage_recommendation: Optional[str] = None
+    confidence_score: Optional[float] = None
+    created_at: datetime
+
+
+class BriefingRecordHeader(BaseModel):
+    id: int
+    record_type: str
+    title: str
+    created_at: datetime
+
+
+class BriefingRecordDigest(BaseModel):
+    total: int = 0
+    doctor_notes: int = 0
+    last_record_at: Optional[datetime] = None
+    recent: List[BriefingRecordHeader] = []
+
+
+class BriefingAppointment(BaseModel):
+    appointment_id: int
+    start_time: datetime
+    end_time: datetime
+    status: str
+    telemedicine_url: Optional[str] = None
+    patient: BriefingPatient
+    latest_triage: Optional[BriefingTriage] = None
+    records: BriefingRecordDigest
+
+
+class DoctorBriefingOut(BaseModel):
+    doctor_id: int
+    day: date
+    generated_at: datetime
+    appointments: List[BriefingAppointment]
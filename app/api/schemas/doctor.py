@@ -17,6 +17,7 @@ class DoctorList(DoctorBase):
     years_experience: Optional[int] = None
     bio: Optional[str] = None
     rating: Optional[float] = None
+    review_count: Optional[int] = None
 
     model_config = {"from_attributes": True}
 
@@ -24,6 +25,8 @@ class DoctorList(DoctorBase):
 class DoctorDetail(DoctorList):
     expertise_areas: Optional[List[str]] = None
     languages: Optional[List[str]] = None
+    # Number of 1 to 5 star reviews.
+    rating_histogram: Optional[List[int]] = None
     education: Optional[str] = None
 
     model_config = {"from_attributes": True}
@@ -63,6 +63,23 @@ class DoctorRecordCreate(HealthRecordBase):
 
 
 # Output schemas
+class HealthRecordSummaryOut(HealthRecordBase):
+    """A record without its symptom, diagnosis, treatment and medication lists."""
+
+    id: int
+    patient_id: int
+    doctor_id: Optional[int] = None
+    record_type: str
+
+    triage_recommendation: Optional[str] = None
+    confidence_score: Optional[float] = None
+
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class HealthRecordOut(HealthRecordBase):
     id: int
     patient_id: int
@@ -81,3 +98,20 @@ class HealthRecordOut(HealthRecordBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class HealthRecordImportError(BaseModel):
+    line: int
+    error: str
+
+
+class HealthRecordImportReport(BaseModel):
+    """Outcome of a bulk import; resume an interrupted one from `checkpoint`."""
+
+    inserted: int = 0
+    failed: int = 0
+    checkpoint: int = Field(
+        0, description="Last input line whose outcome is final (1-based)"
+    )
+    completed: bool = False
+    errors: List[HealthRecordImportError] = []
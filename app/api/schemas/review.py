@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReviewCreate(BaseModel):
+    appointment_id: int
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = Field(None, max_length=2000)
+
+
+class ReviewOut(BaseModel):
+    id: int
+    appointment_id: int
+    doctor_id: int
+    patient_id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ReviewPublicOut(BaseModel):
+    """A review as listed on a doctor's page, without who wrote it."""
+
+    id: int
+    doctor_id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.scheduler_job_run import JobRunStatus
+
+
+class JobRunOut(BaseModel):
+    id: int
+    job_id: str
+    status: JobRunStatus
+    started_at: datetime
+    finished_at: datetime
+    duration_seconds: float
+    rows_scanned: int
+    emails_attempted: int
+    emails_sent: int
+    emails_failed: int
+    error: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class JobRunSummary(BaseModel):
+    job_id: str
+    runs: int
+    failures: int
+    p50_seconds: float
+    p95_seconds: float
+    max_seconds: float
+    rows_scanned: int
+    emails_sent: int
+    emails_failed: int
+    last_started_at: datetime
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -23,6 +25,72 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = Field(..., alias="SMTP_PASSWORD")
     SMTP_FROM_EMAIL: str = Field(..., alias="SMTP_FROM_EMAIL")
     SMTP_FROM_NAME: str = Field("HealthSync AI", alias="SMTP_FROM_NAME")
+    SMTP_START_TLS: bool = Field(True, alias="SMTP_START_TLS")
+    SMTP_POOL_SIZE: int = Field(3, alias="SMTP_POOL_SIZE")
+    # Provider sending limit; 0 disables pacing.
+    SMTP_RATE_LIMIT_PER_SECOND: float = Field(10, alias="SMTP_RATE_LIMIT_PER_SECOND")
+
+    # Optional shared backend (e.g. "redis://localhost:6379/0") for state that
+    # must be consistent across workers. Falls back to per-process memory.
+    REDIS_URL: Optional[str] = Field(None, alias="REDIS_URL")
+    # Worker processes serving the app (uvicorn/gunicorn read the same
+    # variable). Per-process state is refused when there is more than one.
+    WEB_CONCURRENCY: int = Field(1, alias="WEB_CONCURRENCY")
+
+    # Scheduled jobs run only in the worker holding this Postgres advisory lock.
+    SCHEDULER_LOCK_KEY: int = Field(7241001, alias="SCHEDULER_LOCK_KEY")
+    SCHEDULER_LEADER_CHECK_SECONDS: float = Field(
+        15, alias="SCHEDULER_LEADER_CHECK_SECONDS"
+    )
+    # Runs missed while no leader was up are caught up if within this window.
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = Field(
+        6 * 3600, alias="SCHEDULER_MISFIRE_GRACE_SECONDS"
+    )
+
+    SCHEDULER_JOB_RUN_RETENTION_DAYS: int = Field(
+        14, alias="SCHEDULER_JOB_RUN_RETENTION_DAYS"
+    )
+
+    REMINDER_POLL_SECONDS: int = Field(5, alias="REMINDER_POLL_SECONDS")
+
+    # Default working hours (clinic timezone, Monday to Friday) used to derive
+    # free appointment slots.
+    CLINIC_TIMEZONE: str = Field("UTC", alias="CLINIC_TIMEZONE")
+    AVAILABILITY_DAY_START_HOUR: int = Field(9, alias="AVAILABILITY_DAY_START_HOUR")
+    AVAILABILITY_DAY_END_HOUR: int = Field(17, alias="AVAILABILITY_DAY_END_HOUR")
+    AVAILABILITY_HORIZON_DAYS: int = Field(28, alias="AVAILABILITY_HORIZON_DAYS")
+    AVAILABILITY_REFRESH_SECONDS: int = Field(60, alias="AVAILABILITY_REFRESH_SECONDS")
+    # Capped at PRESENCE_TTL_SECONDS: other workers only see availability
+    # changes once their cached entries expire.
+    DOCTOR_DIRECTORY_CACHE_SECONDS: int = Field(
+        300, alias="DOCTOR_DIRECTORY_CACHE_SECONDS"
+    )
+    # How long a slot stays reserved for a patient who is completing a booking.
+    SLOT_HOLD_MINUTES: int = Field(5, alias="SLOT_HOLD_MINUTES")
+    SLOT_HOLD_SWEEP_SECONDS: int = Field(60, alias="SLOT_HOLD_SWEEP_SECONDS")
+    # Doctors whose client has not sent a heartbeat for this long are offline.
+    PRESENCE_TTL_SECONDS: int = Field(60, alias="PRESENCE_TTL_SECONDS")
+    PRESENCE_SWEEP_SECONDS: int = Field(15, alias="PRESENCE_SWEEP_SECONDS")
+    # Clinic-time hour at which tomorrow's doctor briefings are built.
+    BRIEFING_BUILD_HOUR: int = Field(2, alias="BRIEFING_BUILD_HOUR")
+    # Rows validated and inserted per transaction by bulk record imports.
+    HEALTH_RECORD_IMPORT_CHUNK_SIZE: int = Field(
+        500, alias="HEALTH_RECORD_IMPORT_CHUNK_SIZE"
+    )
+    # Longer import lines are rejected without being buffered.
+    HEALTH_RECORD_IMPORT_MAX_LINE_BYTES: int = Field(
+        1024 * 1024, alias="HEALTH_RECORD_IMPORT_MAX_LINE_BYTES"
+    )
+
+    LOGIN_USERNAME_BURST: int = Field(5, alias="LOGIN_USERNAME_BURST")
+    LOGIN_USERNAME_PER_MINUTE: float = Field(5, alias="LOGIN_USERNAME_PER_MINUTE")
+    LOGIN_IP_BURST: int = Field(30, alias="LOGIN_IP_BURST")
+    LOGIN_IP_PER_MINUTE: float = Field(30, alias="LOGIN_IP_PER_MINUTE")
+    # Reverse proxies / load balancers in front of the app, each appending the
+    # address it received from to X-Forwarded-For. The client IP is read that
+    # many entries from the right; 0 uses the connection's peer address. Only
+    # set it when the app cannot be reached except through those proxies.
+    TRUSTED_PROXY_COUNT: int = Field(0, alias="TRUSTED_PROXY_COUNT")
 
 
 settings = Settings()
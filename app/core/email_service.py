@@ -1,73 +1,72 @@
 import logging
 import traceback
-import smtplib
 from email.mime.text import MIMEText
+from typing import Optional
 
+import aiosmtplib
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.smtp_pool import SMTPConnectionPool
 
 logger = logging.getLogger(__name__)
 
 
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.SMTP_SERVER,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USERNAME,
+    password=settings.SMTP_PASSWORD,
+    start_tls=settings.SMTP_START_TLS,
+    size=settings.SMTP_POOL_SIZE,
+)
+
+
 class EmailService:
-    def __init__(self):
+    def __init__(self, pool: Optional[SMTPConnectionPool] = None):
         self.smtp_server = settings.SMTP_SERVER
         self.smtp_port = settings.SMTP_PORT
         self.smtp_username = settings.SMTP_USERNAME
         self.smtp_password = settings.SMTP_PASSWORD
         self.from_email = settings.SMTP_FROM_EMAIL
         self.from_name = settings.SMTP_FROM_NAME
+        self.pool = pool or smtp_pool
+
+    def build_message(self, to: str, subject: str, body: str) -> MIMEText:
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = f"{self.from_name} <{self.from_email}>"
+        msg["To"] = to
+        return msg
 
-    async def send_email(self, to: str, subject: str, body: str):
-        """Send an email using SMTP with enhanced error handling."""
+    async def send_email(self, to: str, subject: str, body: str) -> bool:
+        """
+        Send an email over a pooled SMTP connection without blocking the event loop.
+        Returns True if the server accepted it, False if delivery failed.
+        """
         try:
             logger.info(f"Preparing to send email to: {to}")
-            msg = MIMEText(body)
-            msg["Subject"] = subject
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
-            msg["To"] = to
-
-            logger.info(f"SMTP data prepared for: {to}")
+            msg = self.build_message(to, subject, body)
             logger.debug(f"SMTP message: {msg}")
 
-            logger.info("Attempting to send email via SMTP...")
-
             try:
-                with smtplib.SMTP(
-                    self.smtp_server, self.smtp_port, timeout=10
-                ) as server:
-                    logger.info("SMTP connection established")
-                    server.starttls()
-                    logger.info("TLS started")
-                    server.login(self.smtp_username, self.smtp_password)
-                    logger.info("SMTP login successful")
-                    server.sendmail(self.from_email, to, msg.as_string())
-                    logger.info("Email sent successfully")
-
-            except smtplib.SMTPAuthenticationError:
+                await self.pool.send_message(msg)
+            except aiosmtplib.SMTPAuthenticationError:
                 logger.error("SMTP Authentication failed. Check your credentials.")
-            except smtplib.SMTPException as e:
-                logger.error(f"SMTP error: {str(e)}")
-            except TimeoutError:
+                return False
+            except aiosmtplib.SMTPTimeoutError:
                 logger.error("SMTP connection timed out.")
+                return False
+            except aiosmtplib.SMTPException as e:
+                logger.error(f"SMTP error: {str(e)}")
+                return False
             except Exception as e:
                 logger.error(f"Unexpected error: {e}")
+                return False
 
             logger.info(f"Email sent to {to} successfully")
+            return True
 
-        except smtplib.SMTPAuthenticationError:
-            logger.error("SMTP Authentication failed. Check your credentials.")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="SMTP Authentication failed.",
-            )
-        except smtplib.SMTPException as e:
-            logger.error(f"SMTP error: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send email via SMTP",
-            )
         except Exception as e:
             logger.error(f"Unexpected error while sending email: {str(e)}")
             logger.error(traceback.format_exc())
@@ -76,8 +75,8 @@ class EmailService:
                 detail="Unexpected error occurred while sending email",
             )
 
-    async def send_registration_email(self, user_email: str, username: str):
-        """Send a welcome email to a new user using SMTP."""
+    def render_registration_email(self, username: str) -> tuple[str, str]:
+        """Build the subject and body of the welcome email for a new user."""
         subject = "Welcome to HealthSync AI!"
         body = f"""
         Dear {username},
@@ -90,4 +89,9 @@ class EmailService:
         Best regards,
         The HealthSync AI Team
         """
-        await self.send_email(user_email, subject, body)
+        return subject, body
+
+    async def send_registration_email(self, user_email: str, username: str):
+        """Send a welcome email to a new user using SMTP."""
+        subject, body = self.render_registration_email(username)
+        return await self.send_email(user_email, subject, body)
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLockLeaderElection:
+    """
+    Elects a single leader among processes sharing a Postgres database.
+
+    Each candidate polls `pg_try_advisory_lock(key)`. The winner keeps the
+    session-level lock on a dedicated connection and pings it periodically.
+    If the leader process dies or its connection drops, Postgres releases the
+    lock with the session. Followers pick it up on their next poll, so the
+    poll interval bounds the failover time.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        lock_key: int,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        check_interval: float = 15,
+    ):
+        self.engine = engine
+        self.lock_key = lock_key
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.check_interval = check_interval
+
+        self.is_leader = False
+        self._connection: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def step(self):
+        """Run one election round: try to take the lock, or confirm we still hold it."""
+        if self.is_leader:
+            try:
+                await self._connection.execute(text("SELECT 1"))
+                await self._connection.commit()
+            except Exception as exc:
+                logger.warning(f"Lost leader connection ({exc}), stepping down.")
+                await self._demote()
+            return
+
+        try:
+            if self._connection is None:
+                self._connection = await self.engine.connect()
+            acquired = await self._connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )
+            # Keep the session idle rather than idle-in-transaction while we hold it.
+            await self._connection.commit()
+        except Exception as exc:
+            logger.warning(f"Leader election attempt failed: {exc}")
+            await self._close_connection()
+            return
+
+        if not acquired:
+            # No lock held, so the connection can safely go back to the pool.
+            await self._connection.close()
+            self._connection = None
+            return
+
+        self.is_leader = True
+        logger.info(f"Acquired scheduler leadership (lock {self.lock_key}).")
+        await self.on_elected()
+
+    async def _demote(self):
+        self.is_leader = False
+        await self._close_connection()
+        await self.on_demoted()
+
+    async def _close_connection(self):
+        # Invalidate rather than return to the pool, so a session that may still
+        # hold the lock is never handed to unrelated code.
+        if self._connection is not None:
+            try:
+                await self._connection.invalidate()
+                await self._connection.close()
+            except Exception as exc:
+                logger.debug(f"Error closing leader connection: {exc}")
+            self._connection = None
+
+    async def _run(self):
+        while True:
+            await self.step()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning and release the lock if held."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.is_leader:
+            try:
+                await self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+                )
+                await self._connection.commit()
+            except Exception as exc:
+                logger.warning(f"Could not release leader lock cleanly: {exc}")
+            await self._demote()
+        else:
+            await self._close_connection()
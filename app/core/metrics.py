@@ -0,0 +1,88 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# --- Login throttling ---
+LOGIN_THROTTLE_REJECTIONS = Counter(
+    "healthsync_login_throttle_rejections_total",
+    "Login attempts rejected by the throttle before any password hashing.",
+    ["scope"],
+)
+LOGIN_THROTTLE_BUCKET_FILL = Histogram(
+    "healthsync_login_throttle_bucket_fill_ratio",
+    "Fraction of the bucket left after a login attempt (0 = exhausted).",
+    ["scope"],
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 1.0),
+)
+LOGIN_THROTTLE_TRACKED_BUCKETS = Gauge(
+    "healthsync_login_throttle_tracked_buckets",
+    "Buckets currently held by the in-memory rate limit backend.",
+)
+
+# --- Email fan-out ---
+EMAIL_FANOUT_MESSAGES = Counter(
+    "healthsync_email_fanout_messages_total",
+    "Emails handled by the fan-out stage, by outcome.",
+    ["result"],
+)
+EMAIL_FANOUT_RUN_SECONDS = Histogram(
+    "healthsync_email_fanout_run_seconds",
+    "Wall-clock duration of a fan-out run.",
+    buckets=(1, 5, 15, 60, 300, 900, 1800, 3600),
+)
+
+# --- Scheduler jobs ---
+SCHEDULER_JOB_RUNS = Counter(
+    "healthsync_scheduler_job_runs_total",
+    "Scheduler job executions, by job and outcome.",
+    ["job", "status"],
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "healthsync_scheduler_job_duration_seconds",
+    "Wall-clock duration of a scheduler job execution.",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+SCHEDULER_JOB_ROWS_SCANNED = Counter(
+    "healthsync_scheduler_job_rows_scanned_total",
+    "Rows picked up by scheduler jobs.",
+    ["job"],
+)
+SCHEDULER_JOB_EMAILS = Counter(
+    "healthsync_scheduler_job_emails_total",
+    "Emails handled by scheduler jobs, by outcome.",
+    ["job", "result"],
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+    "healthsync_scheduler_job_last_success_timestamp_seconds",
+    "Unix time of the last successful run of each scheduler job.",
+    ["job"],
+)
+
+# --- Availability ---
+AVAILABILITY_REBUILD_SECONDS = Histogram(
+    "healthsync_availability_rebuild_seconds",
+    "Time taken to rebuild the in-memory availability snapshot.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DOCTOR_DIRECTORY_CACHE = Counter(
+    "healthsync_doctor_directory_cache_total",
+    "Doctor directory cache lookups, by result.",
+    ["result"],
+)
+
+# --- Slot holds ---
+SLOT_HOLDS = Counter(
+    "healthsync_slot_holds_total",
+    "Slot hold requests and their fate, by outcome.",
+    ["outcome"],
+)
+
+# --- Doctor presence ---
+PRESENCE_HEARTBEATS = Counter(
+    "healthsync_presence_heartbeats_total",
+    "Heartbeats received from doctors' clients.",
+)
+PRESENCE_TRANSITIONS = Counter(
+    "healthsync_presence_transitions_total",
+    "Doctor availability changes persisted from the presence registry.",
+    ["state"],
+)
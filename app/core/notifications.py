@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterable, Hashable, Iterable, NamedTuple, Optional, Union
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.email_service import EmailService
+from app.core.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingEmail(NamedTuple):
+    """
+    A fully rendered email, ready for delivery. `key` optionally ties it back to
+    the record that produced it, so callers can tell which records failed.
+    """
+
+    to: str
+    subject: str
+    body: str
+    key: Optional[Hashable] = None
+
+
+class DeliveryStats:
+    """Throughput and failure counters for one fan-out run."""
+
+    def __init__(self):
+        self.attempted = 0
+        self.sent = 0
+        self.failed = 0
+        self.sent_keys = set()
+        self.failed_keys = set()
+        self.started_at = time.monotonic()
+        self.duration_seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Emails handled per second over the run."""
+        return self.attempted / self.duration_seconds if self.duration_seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "attempted": self.attempted,
+            "sent": self.sent,
+            "failed": self.failed,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "throughput_per_second": round(self.throughput, 2),
+        }
+
+
+class EmailFanout:
+    """
+    Delivers a stream of rendered emails with bounded concurrency and a provider
+    rate limit. Each worker sends its messages back to back over a pooled SMTP
+    session, so the number of workers equals the number of open connections.
+    The input queue is bounded, so a slow server applies back-pressure to the
+    producer (e.g. a streaming DB cursor) instead of buffering everything.
+    """
+
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        concurrency: int = settings.SMTP_POOL_SIZE,
+        rate_per_second: Optional[float] = settings.SMTP_RATE_LIMIT_PER_SECOND,
+    ):
+        self.email_service = email_service or EmailService()
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+
+    async def deliver(
+        self, messages: Union[Iterable[OutgoingEmail], AsyncIterable[OutgoingEmail]]
+    ) -> DeliveryStats:
+        stats = DeliveryStats()
+        limiter = RateLimiter(self.rate_per_second, burst=self.concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 4)
+
+        async def worker():
+            while True:
+                message = await queue.get()
+                try:
+                    if message is None:
+                        return
+                    await limiter.acquire()
+                    stats.attempted += 1
+                    try:
+                        sent = await self.email_service.send_email(
+                            message.to, message.subject, message.body
+                        )
+                    except Exception as exc:
+                        logger.error(f"Error sending email to {message.to}: {exc}")
+                        sent = False
+                    if sent:
+                        stats.sent += 1
+                        if message.key is not None:
+                            stats.sent_keys.add(message.key)
+                    else:
+                        stats.failed += 1
+                        if message.key is not None:
+                            stats.failed_keys.add(message.key)
+                    metrics.EMAIL_FANOUT_MESSAGES.labels(
+                        "sent" if sent else "failed"
+                    ).inc()
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            if hasattr(messages, "__aiter__"):
+                async for message in messages:
+                    await queue.put(message)
+            else:
+                for message in messages:
+                    await queue.put(message)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        stats.duration_seconds = time.monotonic() - stats.started_at
+        metrics.EMAIL_FANOUT_RUN_SECONDS.observe(stats.duration_seconds)
+        logger.info(f"Email fan-out finished: {stats.as_dict()}")
+        return stats
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Retry-After for buckets that never refill, i.e. logins disabled by a zero rate.
+NO_REFILL_RETRY_AFTER = 3600
+
+
+class RateLimitBackend:
+    """Stores token buckets. Subclasses must make `consume` atomic per key."""
+
+    async def consume(
+        self, key: str, capacity: float, refill_per_second: float, cost: float = 1
+    ) -> Tuple[bool, float]:
+        """
+        Try to take `cost` tokens from the bucket at `key`.
+        Returns (allowed, tokens_left).
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process buckets. `consume` never awaits, so it is atomic on the event loop.
+    Full buckets are indistinguishable from missing ones and are pruned once the
+    table grows past `max_keys`, which bounds memory under username spraying.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def consume(
+        self, key: str, capacity: float, refill_per_second: float, cost: float = 1
+    ) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now, capacity, refill_per_second)
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = [tokens, now]
+        metrics.LOGIN_THROTTLE_TRACKED_BUCKETS.set(len(self._buckets))
+        return allowed, tokens
+
+    def _prune(self, now: float, capacity: float, refill_per_second: float):
+        refill_time = capacity / refill_per_second if refill_per_second else math.inf
+        stale = [k for k, (_, ts) in self._buckets.items() if now - ts >= refill_time]
+        for k in stale:
+            del self._buckets[k]
+        if len(self._buckets) >= self.max_keys:
+            # Still full of active buckets: drop the oldest half rather than grow.
+            by_age = sorted(self._buckets.items(), key=lambda kv: kv[1][1])
+            for k, _ in by_age[: len(by_age) // 2]:
+                del self._buckets[k]
+        logger.info(f"Pruned rate limit buckets, {len(self._buckets)} remain")
+
+    def reset(self):
+        self._buckets.clear()
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker, updated atomically by a Lua script."""
+
+    _SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    if rate > 0 then
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    end
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "healthsync:ratelimit:"):
+        # Imported lazily so the in-memory default needs no extra dependency.
+        from redis import asyncio as redis_asyncio
+
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(self._SCRIPT)
+
+    async def consume(
+        self, key: str, capacity: float, refill_per_second: float, cost: float = 1
+    ) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key],
+            args=[capacity, refill_per_second, cost, time.time()],
+        )
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:
+    """
+    Paces callers to `rate_per_second` with bursts of up to `burst`.
+    Unlike the backends above it waits for a token instead of rejecting.
+    """
+
+    def __init__(self, rate_per_second: Optional[float], burst: float = 1):
+        self.rate = rate_per_second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def client_ip(request: Request, trusted_proxies: int) -> Optional[str]:
+    """
+    The address a request came from, for per-IP limits. Behind
+    `trusted_proxies` reverse proxies the peer is the nearest proxy, so the
+    client is that many hops back in X-Forwarded-For; entries further left
+    are supplied by the client and cannot be trusted.
+    """
+    peer = request.client.host if request.client else None
+    if trusted_proxies <= 0:
+        return peer
+    hops = [
+        address.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for address in header.split(",")
+        if address.strip()
+    ]
+    if peer:
+        hops.append(peer)
+    if not hops:
+        return None
+    return hops[max(len(hops) - 1 - trusted_proxies, 0)]
+
+
+def build_rate_limit_backend(redis_url: Optional[str] = None) -> RateLimitBackend:
+    """Use Redis when configured so limits hold across workers, else process memory."""
+    if redis_url:
+        logger.info("Using Redis rate limit backend.")
+        return RedisRateLimitBackend(redis_url)
+    return InMemoryRateLimitBackend()
+
+
+class LoginThrottle:
+    """
+    Token-bucket throttling for login attempts, keyed by username and by client IP.
+    Checked before the user lookup and password hash so rejected attempts cost
+    neither a query nor a bcrypt round.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        username_burst: int = settings.LOGIN_USERNAME_BURST,
+        username_per_minute: float = settings.LOGIN_USERNAME_PER_MINUTE,
+        ip_burst: int = settings.LOGIN_IP_BURST,
+        ip_per_minute: float = settings.LOGIN_IP_PER_MINUTE,
+    ):
+        self.backend = backend
+        self.limits = {
+            "username": (username_burst, max(username_per_minute, 0) / 60),
+            "ip": (ip_burst, max(ip_per_minute, 0) / 60),
+        }
+
+    @staticmethod
+    def _retry_after(tokens: float, rate: float) -> int:
+        """Seconds until the bucket holds a whole token again."""
+        if rate <= 0:
+            return NO_REFILL_RETRY_AFTER
+        return math.ceil((1 - tokens) / rate)
+
+    async def check(self, username: str, client_ip: Optional[str] = None):
+        """Raises a 429 HTTPException if either bucket is empty."""
+        keys = [("username", username.strip().lower())]
+        if client_ip:
+            keys.append(("ip", client_ip))
+
+        for scope, value in keys:
+            capacity, rate = self.limits[scope]
+            allowed, tokens = await self.backend.consume(
+                f"login:{scope}:{value}", capacity, rate
+            )
+            metrics.LOGIN_THROTTLE_BUCKET_FILL.labels(scope).observe(
+                tokens / capacity if capacity > 0 else 0
+            )
+            if not allowed:
+                metrics.LOGIN_THROTTLE_REJECTIONS.labels(scope).inc()
+                logger.warning(f"Login throttled by {scope} bucket for {value}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts. Please try again later.",
+                    headers={"Retry-After": str(self._retry_after(tokens, rate))},
+                )
+
+
+login_throttle = LoginThrottle(build_rate_limit_backend(settings.REDIS_URL))
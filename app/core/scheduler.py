@@ -1,148 +1,259 @@
-import datetime
 import logging
 
+from datetime import timedelta
+
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.core.config import settings
 from app.core.email_service import EmailService
-from app.db.database import get_db_session
-from app.models.appointment import Appointment, AppointmentStatus
-from app.models.user import User
+from app.core.leader import AdvisoryLockLeaderElection
+from app.core.notifications import EmailFanout
+from app.db.database import engine, get_db_session, sync_database_uri
+from app.services.briefing import build_briefings, clinic_today, prune_briefings
+from app.services.job_runs import JobRunRecorder, prune_job_runs
+from app.services.outbox import OutboxDispatcher
+from app.services.presence import presence_registry
+from app.services.reminders import ReminderDispatcher
+from app.services.slot_holds import sweep_expired_holds
 
 logger = logging.getLogger(__name__)
 
 
 class SchedulerService:
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        self.scheduler = AsyncIOScheduler(
+            jobstores={
+                "default": SQLAlchemyJobStore(
+                    url=sync_database_uri(settings.database_uri)
+                )
+            },
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+            },
+        )
+        # Queue polling and sweeps run every few seconds and need no catch-up.
+        # They live in memory: APScheduler queries its job stores on the event
+        # loop at every wakeup, and the persistent store is synchronous.
+        self.polling_scheduler = AsyncIOScheduler(
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": None,
+            },
+        )
+        self.leader_election = AdvisoryLockLeaderElection(
+            engine,
+            settings.SCHEDULER_LOCK_KEY,
+            on_elected=self._on_elected,
+            on_demoted=self._on_demoted,
+            check_interval=settings.SCHEDULER_LEADER_CHECK_SECONDS,
+        )
         self.email_service = EmailService()
+        self.outbox_dispatcher = OutboxDispatcher(self.email_service)
+        self.fanout = EmailFanout(self.email_service)
+        self.reminder_dispatcher = ReminderDispatcher(self.fanout)
+        self.job_runs = JobRunRecorder()
 
-    async def check_and_notify_appointments(self):
+    async def dispatch_due_reminders(self):
         """
-        Checks for appointments scheduled for today and sends notifications
-        to both patients and doctors.
+        Polls the reminder queue and sends everything that is due, in small
+        batches, so reminders go out close to their due time.
         """
-        logger.info("Running daily appointment notification check...")
-        async for db in get_db_session():
-            try:
-                today_start = datetime.datetime.now().replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                today_end = datetime.datetime.now().replace(
-                    hour=23, minute=59, second=59, microsecond=999
-                )
-
-                query = select(Appointment).where(
-                    Appointment.start_time >= today_start,
-                    Appointment.start_time <= today_end,
-                    Appointment.status == AppointmentStatus.scheduled,
-                )
-                result = await db.execute(query)
-                appointments = result.scalars().all()
-
-                for appointment in appointments:
-                    await self._notify_appointment(db, appointment)
-                logger.info("Appointment notification check completed.")
-
-            except Exception as e:
-                logger.error(f"Error during appointment notification check: {e}")
-                logger.exception(e)
-
-    async def _notify_appointment(self, db: AsyncSession, appointment: Appointment):
+        async with self.job_runs.track("appointment_reminders") as run:
+            async for db in get_db_session():
+                try:
+                    while True:
+                        claimed, stats = await self.reminder_dispatcher.dispatch_due(db)
+                        run.rows_scanned += claimed
+                        run.record_delivery(stats)
+                        if claimed:
+                            logger.info(
+                                f"Sent {claimed} due reminder(s): {stats.as_dict()}"
+                            )
+                        if claimed < self.reminder_dispatcher.batch_size:
+                            break
+                except Exception as e:
+                    logger.error(f"Error during reminder dispatch: {e}")
+                    logger.exception(e)
+                    await db.rollback()
+                    run.fail(e)
+
+    async def dispatch_outbox(self):
+        """Drains the email outbox."""
+        async with self.job_runs.track("email_outbox_dispatch") as run:
+            await self.outbox_dispatcher.dispatch_pending(run)
+
+    async def prune_job_history(self):
+        """Drops job run history older than the retention window."""
+        async with self.job_runs.track("job_run_retention", record_idle=True) as run:
+            async for db in get_db_session():
+                try:
+                    run.rows_scanned = await prune_job_runs(
+                        db, timedelta(days=settings.SCHEDULER_JOB_RUN_RETENTION_DAYS)
+                    )
+                except Exception as e:
+                    logger.error(f"Error pruning job run history: {e}")
+                    await db.rollback()
+                    run.fail(e)
+
+    async def sweep_slot_holds(self):
+        """Deletes expired slot holds."""
+        async with self.job_runs.track("slot_hold_sweep") as run:
+            async for db in get_db_session():
+                try:
+                    run.rows_scanned = await sweep_expired_holds(db)
+                except Exception as e:
+                    logger.error(f"Error sweeping expired slot holds: {e}")
+                    await db.rollback()
+                    run.fail(e)
+
+    async def sweep_presence(self):
+        """Marks doctors whose clients stopped sending heartbeats as unavailable."""
+        if not presence_registry.backend.shared:
+            # Each worker sweeps its own in-memory registry.
+            return
+        async with self.job_runs.track("presence_sweep") as run:
+            async for db in get_db_session():
+                try:
+                    run.rows_scanned = await presence_registry.sweep(db)
+                except Exception as e:
+                    logger.error(f"Error sweeping doctor presence: {e}")
+                    await db.rollback()
+                    run.fail(e)
+
+    async def build_doctor_briefings(self):
+        """Precomputes each doctor's briefing for tomorrow's appointments."""
+        async with self.job_runs.track("doctor_briefings", record_idle=True) as run:
+            async for db in get_db_session():
+                try:
+                    today = clinic_today()
+                    documents = await build_briefings(db, today + timedelta(days=1))
+                    await prune_briefings(db, today)
+                    await db.commit()
+                    run.rows_scanned = len(documents)
+                    logger.info(f"Built {len(documents)} doctor briefing(s).")
+                except Exception as e:
+                    logger.error(f"Error building doctor briefings: {e}")
+                    await db.rollback()
+                    run.fail(e)
+
+    @staticmethod
+    def _declare_job(scheduler: AsyncIOScheduler, method: str, job_id: str, trigger):
         """
-        Sends notification emails to both patient and doctor for a given appointment.
+        Add a job unless the store already has it with the same target and
+        schedule. An existing job keeps its stored next run time, so a run
+        missed while no worker was leader is caught up (misfire/coalesce)
+        rather than pushed to the next interval.
         """
-        try:
-            logger.info(f"Starting notification for appointment ID {appointment.id}")
-
-            patient_query = select(User).where(User.id == appointment.patient_id)
-            doctor_query = select(User).where(User.id == appointment.doctor_id)
-
-            logger.info(f"Fetching patient with ID: {appointment.patient_id}")
-            patient_result = await db.execute(patient_query)
-            patient = patient_result.scalar_one_or_none()
-
-            logger.info(f"Fetching doctor with ID: {appointment.doctor_id}")
-            doctor_result = await db.execute(doctor_query)
-            doctor = doctor_result.scalar_one_or_none()
-
-            if not patient or not doctor:
-                logger.warning(
-                    f"Could not retrieve patient or doctor for appointment ID {appointment.id}"
-                )
-                return
-
-            logger.info(
-                f"Patient found: {patient.email if patient else 'None'}, Doctor found: {doctor.email if doctor else 'None'}"
-            )
-
-            patient_subject = "Appointment Reminder"
-            patient_body = f"""
-            Dear {patient.first_name or patient.username},
-
-            This is a reminder about your upcoming appointment with Dr. {doctor.first_name or doctor.username} today.
-
-            Appointment Details:
-            - Doctor: Dr. {doctor.first_name or doctor.username}
-            - Time: {appointment.start_time.strftime("%Y-%m-%d %H:%M %Z")}
-            - Telemedicine Link (if available): {appointment.telemedicine_url or 'N/A'}
-
-            Please be ready for your appointment. If you need to reschedule or cancel, please do so as soon as possible.
-
-            Best regards,
-            HealthSync AI Team
-            """
-
-            doctor_subject = "Appointment Notification"
-            doctor_body = f"""
-            Dear Dr. {doctor.last_name or doctor.username},
-
-            This is a notification for your appointment with patient {patient.first_name or patient.username} today.
-
-            Appointment Details:
-            - Patient: {patient.first_name or patient.username}
-            - Time: {appointment.start_time.strftime("%Y-%m-%d %H:%M %Z")}
-            - Telemedicine Link (if available): {appointment.telemedicine_url or 'N/A'}
-
-            Please be prepared for your appointment.
-
-            Best regards,
-            HealthSync AI Team
-            """
-
-            logger.info(f"Sending email to patient: {patient.email}")
-            await self.email_service.send_email(
-                patient.email, patient_subject, patient_body
-            )
-            logger.info(f"Sending email to doctor: {doctor.email}")
-            await self.email_service.send_email(
-                doctor.email, doctor_subject, doctor_body
-            )
+        existing = scheduler.get_job(job_id)
+        if (
+            existing is not None
+            and existing.func_ref == _job_ref(method)
+            and _same_trigger(existing.trigger, trigger)
+        ):
+            return
+        scheduler.add_job(_job_ref(method), trigger, id=job_id, replace_existing=True)
+        if existing is not None:
+            logger.info(f"Scheduler job {job_id} changed; rescheduled.")
+
+    def _register_jobs(self):
+        """
+        Declare the jobs. Calendar jobs go in the persistent job store, by
+        textual reference so any worker that becomes leader can load them;
+        their next run times survive restarts so missed runs are caught up.
+        Polling jobs are declared in memory by each new leader.
+        """
+        polling_jobs = [
+            (
+                "dispatch_due_reminders",
+                "appointment_reminders",
+                IntervalTrigger(seconds=settings.REMINDER_POLL_SECONDS),
+            ),
+            ("dispatch_outbox", "email_outbox_dispatch", IntervalTrigger(seconds=10)),
+            (
+                "sweep_slot_holds",
+                "slot_hold_sweep",
+                IntervalTrigger(seconds=settings.SLOT_HOLD_SWEEP_SECONDS),
+            ),
+            (
+                "sweep_presence",
+                "presence_sweep",
+                IntervalTrigger(seconds=settings.PRESENCE_SWEEP_SECONDS),
+            ),
+        ]
+        for method, job_id, trigger in polling_jobs:
+            # Earlier releases persisted the polling jobs too.
+            if self.scheduler.get_job(job_id) is not None:
+                self.scheduler.remove_job(job_id)
+            self._declare_job(self.polling_scheduler, method, job_id, trigger)
+
+        self._declare_job(
+            self.scheduler,
+            "prune_job_history",
+            "job_run_retention",
+            CronTrigger(hour=3, minute=15),
+        )
+        self._declare_job(
+            self.scheduler,
+            "build_doctor_briefings",
+            "doctor_briefings",
+            CronTrigger(
+                hour=settings.BRIEFING_BUILD_HOUR, timezone=settings.CLINIC_TIMEZONE
+            ),
+        )
 
-            logger.info(
-                f"Notifications sent for appointment ID {appointment.id} (Patient: {patient.email}, Doctor: {doctor.email})"
-            )
+    async def _on_elected(self):
+        if self.scheduler.running:
+            self.scheduler.resume()
+            self.polling_scheduler.resume()
+        else:
+            self.scheduler.start()
+            self.polling_scheduler.start()
+            self._register_jobs()
+        logger.info("This worker is the scheduler leader; jobs are running.")
 
-        except Exception as e:
-            logger.error(f"Error notifying appointment {appointment.id}: {e}")
-            logger.exception(e)
+    async def _on_demoted(self):
+        if self.scheduler.running:
+            self.scheduler.pause()
+            self.polling_scheduler.pause()
+        logger.info("This worker is no longer the scheduler leader; jobs paused.")
 
     def start_scheduler(self):
-        """Starts the APScheduler."""
-        self.scheduler.add_job(
-            self.check_and_notify_appointments, "cron", hour=11, minute=35
-        )
-        self.scheduler.start()
-        logger.info("Scheduler started...")
+        """
+        Starts campaigning for scheduler leadership. Only the worker holding the
+        advisory lock runs jobs; the others stand by and take over if it dies.
+        """
+        self.leader_election.start()
+        logger.info("Scheduler started, waiting for leadership...")
 
-    def stop_scheduler(self):
-        """Stops the APScheduler."""
+    async def stop_scheduler(self):
+        """Stops the APScheduler and hands leadership to another worker."""
+        await self.leader_election.stop()
         if self.scheduler.running:
             self.scheduler.shutdown()
+            self.polling_scheduler.shutdown()
             logger.info("Scheduler stopped.")
         else:
             logger.info("Scheduler is not running.")
 
 
+def _job_ref(method: str) -> str:
+    return f"{__name__}:scheduler_service.{method}"
+
+
+def _same_trigger(stored, declared) -> bool:
+    if type(stored) is not type(declared):
+        return False
+    if isinstance(declared, IntervalTrigger):
+        return stored.interval == declared.interval
+    return str(stored) == str(declared) and str(stored.timezone) == str(
+        declared.timezone
+    )
+
+
 scheduler_service = SchedulerService()
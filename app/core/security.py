@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 
 import jwt
 from jwt import PyJWTError
@@ -24,6 +26,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    return pwd_context.hash("healthsync-dummy-password")
+
+
+def verify_password_or_dummy(
+    plain_password: str, hashed_password: Optional[str]
+) -> bool:
+    """
+    Like verify_password, but when there is no stored hash (unknown user) it still
+    runs one bcrypt verification against a dummy hash, so response timing does
+    not reveal whether the username exists.
+    """
+    if hashed_password is None:
+        pwd_context.verify(plain_password, _dummy_password_hash())
+        return False
+    return verify_password(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """
     Create a JWT token with an expiration.
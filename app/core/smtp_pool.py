@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.message import Message
+from typing import List, Optional, Tuple
+
+import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection cannot be trusted and must be replaced.
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+class SMTPConnectionPool:
+    """
+    A small pool of connected, TLS-upgraded and authenticated SMTP sessions.
+
+    Sessions are reused across sends instead of paying the TCP + STARTTLS + AUTH
+    handshake per email, and everything runs on the event loop so a slow SMTP
+    server never blocks other requests. Broken sessions are dropped and replaced.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 3,
+        timeout: float = 10,
+        max_idle_seconds: float = 60,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self.connections_opened = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            timeout=self.timeout,
+            start_tls=self.start_tls,
+            username=self.username or None,
+            password=self.password or None,
+        )
+        await smtp.connect()
+        self.connections_opened += 1
+        logger.info(f"SMTP connection established to {self.hostname}:{self.port}")
+        return smtp
+
+    async def _discard(self, smtp: aiosmtplib.SMTP):
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a live session. It is returned on success and dropped on error."""
+        async with self._slots:
+            smtp = None
+            while self._idle and smtp is None:
+                candidate, released_at = self._idle.pop()
+                if (
+                    candidate.is_connected
+                    and time.monotonic() - released_at < self.max_idle_seconds
+                ):
+                    smtp = candidate
+                else:
+                    await self._discard(candidate)
+            if smtp is None:
+                smtp = await self._connect()
+
+            try:
+                yield smtp
+            except BaseException:
+                await self._discard(smtp)
+                raise
+            else:
+                self._idle.append((smtp, time.monotonic()))
+
+    async def send_message(self, message: Message):
+        """Send on a pooled session, reconnecting once if the session went stale."""
+        try:
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+        except CONNECTION_ERRORS as exc:
+            logger.warning(f"SMTP session failed ({exc!r}), reconnecting once.")
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+
+    async def close(self):
+        """Close all idle sessions, e.g. on application shutdown."""
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+        logger.info("SMTP connection pool closed.")
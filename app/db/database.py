@@ -16,6 +16,11 @@ TestAsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def sync_database_uri(uri: str) -> str:
+    """Map an asyncpg URI to its psycopg2 equivalent for sync-only consumers."""
+    return uri.replace("+asyncpg", "+psycopg2")
+
+
 async def get_db_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import os
+
+from app.db.database import AsyncSessionLocal
+from app.services.health_record_import import import_health_records
+
+
+async def _file_lines(path: str):
+    with open(path, "rb") as handle:
+        for line in handle:
+            yield line.rstrip(b"\n")
+
+
+async def run_import(path: str, creator_id: int, chunk_size: int = None):
+    """
+    Import an NDJSON file, recording progress in `<path>.checkpoint` after
+    every committed chunk so that running the same command again resumes.
+    """
+    checkpoint_path = f"{path}.checkpoint"
+    start_line = 0
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as handle:
+            start_line = int(handle.read().strip() or 0)
+
+    def save_checkpoint(line: int):
+        with open(checkpoint_path, "w") as handle:
+            handle.write(str(line))
+
+    async with AsyncSessionLocal() as session:
+        report = await import_health_records(
+            session,
+            _file_lines(path),
+            creator_id=creator_id,
+            start_line=start_line,
+            chunk_size=chunk_size,
+            on_checkpoint=save_checkpoint,
+        )
+    if report.completed and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import NDJSON health records.")
+    parser.add_argument("path", help="NDJSON file, one health record per line")
+    parser.add_argument(
+        "--creator-id",
+        type=int,
+        required=True,
+        help="Doctor recorded on rows that do not name one",
+    )
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_import(args.path, args.creator_id, args.chunk_size))
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}")
+    print(
+        f"{report.inserted} record(s) imported, {report.failed} rejected, "
+        f"checkpoint at line {report.checkpoint}."
+    )
+    if not report.completed:
+        raise SystemExit("Import stopped early; run again to resume.")
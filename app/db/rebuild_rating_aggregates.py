@@ -0,0 +1,14 @@
+import asyncio
+
+from app.db.database import AsyncSessionLocal
+from app.services.review import rebuild_rating_aggregates
+
+
+async def rebuild():
+    async with AsyncSessionLocal() as session:
+        return await rebuild_rating_aggregates(session)
+
+
+if __name__ == "__main__":
+    rated = asyncio.run(rebuild())
+    print(f"Rating aggregates rebuilt for {rated} doctor(s).")
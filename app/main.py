@@ -10,9 +10,19 @@ from app.api.routers import (
     health_record,
     statistics,
     health,
+    metrics,
+    scheduler,
+    calendar,
+    review,
+    presence,
+    timeline,
+    export,
 )
+from app.core.config import settings
+from app.core.email_service import smtp_pool
 from app.core.logger import setup_logging
 from app.core.scheduler import scheduler_service
+from app.services.presence import presence_registry
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -36,6 +46,12 @@ app = FastAPI(
         },
         {"name": "health-record", "description": "Manage patient health records."},
         {"name": "statistics", "description": "Usage statistics."},
+        {"name": "scheduler", "description": "Scheduler job run history."},
+        {"name": "calendar", "description": "iCalendar appointment feeds."},
+        {"name": "reviews", "description": "Patient reviews of doctors."},
+        {"name": "presence", "description": "Doctor online presence heartbeats."},
+        {"name": "timeline", "description": "Merged patient history."},
+        {"name": "export", "description": "Patient data exports."},
         {"name": "health", "description": "Application health checks."},
     ],
 )
@@ -56,6 +72,13 @@ app.include_router(
     health_record.router, prefix="/api/health-record", tags=["health-record"]
 )
 app.include_router(statistics.router, prefix="/api/statistics", tags=["statistics"])
+app.include_router(calendar.router, prefix="/api/calendar", tags=["calendar"])
+app.include_router(review.router, prefix="/api/reviews", tags=["reviews"])
+app.include_router(presence.router, prefix="/api/presence", tags=["presence"])
+app.include_router(timeline.router, prefix="/api/timeline", tags=["timeline"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(scheduler.router, prefix="/api/scheduler", tags=["scheduler"])
+app.include_router(metrics.router, prefix="/metrics")
 
 
 @app.get("/", include_in_schema=False)
@@ -70,10 +93,15 @@ async def startup_event():
     logger.info("Starting up application and scheduler...")
 
     scheduler_service.start_scheduler()
+    presence_registry.start_local_sweeper(
+        settings.PRESENCE_SWEEP_SECONDS, settings.WEB_CONCURRENCY
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application and scheduler...")
 
-    scheduler_service.stop_scheduler()
+    await scheduler_service.stop_scheduler()
+    await presence_registry.stop_local_sweeper()
+    await smtp_pool.close()
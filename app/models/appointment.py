@@ -1,6 +1,15 @@
 import enum
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    DateTime,
+    ForeignKey,
+    String,
+    Enum,
+    CheckConstraint,
+    Index,
+)
 from sqlalchemy.sql import func
 
 from app.db.database import Base
@@ -12,8 +21,20 @@ class AppointmentStatus(enum.Enum):
     completed = "completed"
 
 
+# GiST exclusion constraint on (doctor_id, tstzrange(start_time, end_time)) for
+# scheduled appointments. It needs the btree_gist extension, so it is created by
+# the Alembic migration rather than declared here. It is DEFERRABLE INITIALLY
+# IMMEDIATE, so it is checked at the end of each statement rather than per row.
+DOCTOR_OVERLAP_CONSTRAINT = "ex_appointments_doctor_no_overlap"
+
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="ck_appointments_time_order"),
+        Index("ix_appointments_patient_start", "patient_id", "start_time"),
+        Index("ix_appointments_doctor_start", "doctor_id", "start_time"),
+    )
     id = Column(Integer, primary_key=True, index=True)
 
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
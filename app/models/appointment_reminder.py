@@ -0,0 +1,64 @@
+import enum
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    DateTime,
+    ForeignKey,
+    Enum,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class ReminderKind(enum.Enum):
+    day_before = "day_before"
+    hour_before = "hour_before"
+
+
+class AppointmentReminder(Base):
+    __tablename__ = "appointment_reminders"
+    __table_args__ = (
+        UniqueConstraint(
+            "appointment_id", "kind", name="uq_appointment_reminders_appointment_kind"
+        ),
+        # Only pending reminders are ever polled, so keep the index to just those.
+        Index(
+            "ix_appointment_reminders_pending_due",
+            "due_at",
+            postgresql_where=text("sent_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    appointment_id = Column(
+        Integer, ForeignKey("appointments.id", ondelete="CASCADE"), nullable=False
+    )
+    kind = Column(Enum(ReminderKind), nullable=False)
+
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    # Set when delivery is given up after the last attempt.
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    # Recipients ("patient", "doctor") that already got this reminder, so a
+    # retry after a partial failure only goes to the others.
+    delivered_to = Column(
+        ARRAY(String(16)), server_default=text("'{}'"), nullable=False
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<AppointmentReminder id={self.id} appointment_id={self.appointment_id} "
+            f"kind={self.kind.value} due={self.due_at} sent={self.sent_at}>"
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -33,3 +33,12 @@ class ChatSession(Base):
     def room_number(self):
 
         return self.chat_room.room_number if self.chat_room else None
+
+
+# Newest-first listing of a patient's messages, e.g. in the timeline.
+Index(
+    "ix_chat_sessions_patient_recent",
+    ChatSession.patient_id,
+    ChatSession.created_at.desc(),
+    ChatSession.id.desc(),
+)
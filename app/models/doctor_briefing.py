@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class DoctorBriefing(Base):
+    """
+    A doctor's appointments of one clinic day with a digest of each patient's
+    records, stored as the serialized `DoctorBriefingOut` JSON it is served as.
+    """
+
+    __tablename__ = "doctor_briefings"
+
+    doctor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    # The doctor's users.appointments_version the briefing was built from;
+    # a different current value means the appointment list is stale.
+    appointments_version = Column(Integer, nullable=False)
+    document = Column(Text, nullable=False)
+
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<DoctorBriefing doctor={self.doctor_id} day={self.day}>"
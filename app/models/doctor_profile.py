@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, String, Text, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class DoctorProfile(Base):
+    """Directory attributes of a doctor, stored so they can be filtered and sorted."""
+
+    __tablename__ = "doctor_profiles"
+    __table_args__ = (
+        Index("ix_doctor_profiles_rating", "rating"),
+        Index("ix_doctor_profiles_years_experience", "years_experience"),
+        Index("ix_doctor_profiles_languages", "languages", postgresql_using="gin"),
+    )
+
+    doctor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    years_experience = Column(Integer, nullable=True)
+    bio = Column(Text, nullable=True)
+    # Review aggregates, updated in the same transaction as each review.
+    # `rating` is their average (NULL until the first review); the histogram
+    # holds the number of 1 to 5 star reviews.
+    rating = Column(Float, nullable=True)
+    rating_count = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_sum = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_histogram = Column(
+        ARRAY(Integer), nullable=False, server_default="{0,0,0,0,0}"
+    )
+    expertise_areas = Column(ARRAY(String(100)), nullable=False, server_default="{}")
+    languages = Column(ARRAY(String(50)), nullable=False, server_default="{}")
+
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<DoctorProfile doctor_id={self.doctor_id} rating={self.rating}>"
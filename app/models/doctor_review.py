@@ -0,0 +1,49 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    DateTime,
+    ForeignKey,
+    Text,
+    CheckConstraint,
+    Index,
+)
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class DoctorReview(Base):
+    """A patient's rating of a completed appointment."""
+
+    __tablename__ = "doctor_reviews"
+    __table_args__ = (
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_doctor_reviews_rating"),
+        Index("ix_doctor_reviews_doctor_created", "doctor_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # One review per appointment.
+    appointment_id = Column(
+        Integer,
+        ForeignKey("appointments.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    doctor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    patient_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    rating = Column(SmallInteger, nullable=False)
+    comment = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<DoctorReview id={self.id} doctor={self.doctor_id} "
+            f"rating={self.rating}>"
+        )
@@ -5,11 +5,13 @@ from sqlalchemy import (
     Text,
     DateTime,
     String,
-    JSON,
     Float,
     Enum,
+    Index,
+    cast,
 )
 import enum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
 from app.db.database import Base
@@ -22,7 +24,6 @@ class RecordType(enum.Enum):
 
 class HealthRecord(Base):
     __tablename__ = "health_records"
-
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     doctor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -33,10 +34,11 @@ class HealthRecord(Base):
     title = Column(String(200), nullable=False)
     summary = Column(Text, nullable=True)
 
-    symptoms = Column(JSON, nullable=True)
-    diagnosis = Column(JSON, nullable=True)
-    treatment_plan = Column(JSON, nullable=True)
-    medication = Column(JSON, nullable=True)
+    # Lists of SymptomItem, DiagnosisItem, TreatmentPlanItem and MedicationItem.
+    symptoms = Column(JSONB, nullable=True)
+    diagnosis = Column(JSONB, nullable=True)
+    treatment_plan = Column(JSONB, nullable=True)
+    medication = Column(JSONB, nullable=True)
 
     triage_recommendation = Column(String(50), nullable=True)
     confidence_score = Column(Float, nullable=True)
@@ -48,3 +50,43 @@ class HealthRecord(Base):
 
     def __repr__(self):
         return f"<HealthRecord id={self.id} type={self.record_type.value} for patient_id={self.patient_id}>"
+
+
+# Newest-first keyset listings of a patient's records, all types or one type;
+# the second also serves latest-triage lookups.
+Index(
+    "ix_health_records_patient_recent",
+    HealthRecord.patient_id,
+    HealthRecord.created_at.desc(),
+    HealthRecord.id.desc(),
+)
+Index(
+    "ix_health_records_patient_type_recent",
+    HealthRecord.patient_id,
+    HealthRecord.record_type,
+    HealthRecord.created_at.desc(),
+    HealthRecord.id.desc(),
+)
+
+
+def lowered(column):
+    """The JSONB list with every string lower-cased, for case-insensitive
+    containment tests; matches the expression indexes below."""
+    return cast(func.lower(cast(column, Text)), JSONB)
+
+
+# Containment (@>) searches on the item lists: diagnosis codes as stored,
+# symptom and medication names case-insensitively.
+Index(
+    "ix_health_records_diagnosis",
+    HealthRecord.diagnosis,
+    postgresql_using="gin",
+    postgresql_ops={"diagnosis": "jsonb_path_ops"},
+)
+for _column in ("symptoms", "medication"):
+    Index(
+        f"ix_health_records_{_column}_lower",
+        lowered(HealthRecord.__table__.c[_column]).label(_column),
+        postgresql_using="gin",
+        postgresql_ops={_column: "jsonb_path_ops"},
+    )
@@ -0,0 +1,39 @@
+import enum
+
+from sqlalchemy import Column, Integer, DateTime, String, Text, Enum, Float, Index
+
+from app.db.database import Base
+
+
+class JobRunStatus(enum.Enum):
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class SchedulerJobRun(Base):
+    __tablename__ = "scheduler_job_runs"
+    __table_args__ = (
+        Index("ix_scheduler_job_runs_job_started", "job_id", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    job_id = Column(String(100), nullable=False)
+    status = Column(Enum(JobRunStatus), nullable=False)
+
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration_seconds = Column(Float, nullable=False)
+
+    rows_scanned = Column(Integer, default=0, nullable=False)
+    emails_attempted = Column(Integer, default=0, nullable=False)
+    emails_sent = Column(Integer, default=0, nullable=False)
+    emails_failed = Column(Integer, default=0, nullable=False)
+
+    error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<SchedulerJobRun id={self.id} job={self.job_id} "
+            f"status={self.status.value} duration={self.duration_seconds:.3f}s>"
+        )
@@ -0,0 +1,47 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    DateTime,
+    ForeignKey,
+    CheckConstraint,
+    Index,
+)
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+# GiST exclusion constraint on (doctor_id, tstzrange(start_time, end_time)), so
+# two holds on overlapping slots of a doctor cannot coexist. Like the
+# appointment overlap constraint it needs btree_gist and is created by the
+# Alembic migration.
+HOLD_OVERLAP_CONSTRAINT = "ex_slot_holds_doctor_no_overlap"
+
+
+class SlotHold(Base):
+    """A short-lived reservation of a doctor's slot while a patient books it."""
+
+    __tablename__ = "slot_holds"
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="ck_slot_holds_time_order"),
+        Index("ix_slot_holds_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    doctor_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    patient_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<SlotHold id={self.id} doctor={self.doctor_id} patient={self.patient_id} "
+            f"start={self.start_time} expires={self.expires_at}>"
+        )
@@ -1,9 +1,22 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, Date, Boolean
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Enum,
+    Float,
+    Date,
+    Boolean,
+    Index,
+    text,
+)
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.database import Base
+from app.models.doctor_profile import DoctorProfile
 
 
 class UserRole(enum.Enum):
@@ -21,6 +34,17 @@ class Gender(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # The doctor directory: available doctors in name order. Trigram GIN
+        # indexes for substring search on specialization and name need the
+        # pg_trgm extension and are created by the Alembic migration.
+        Index(
+            "ix_users_available_doctors",
+            "last_name",
+            "first_name",
+            postgresql_where=text("role = 'doctor' AND is_available"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False)
@@ -43,6 +67,11 @@ class User(Base):
     qualifications = Column(String(200), nullable=True)
     is_available = Column(Boolean, default=True)
 
+    # Bumped whenever one of the user's appointments changes; drives calendar ETags.
+    appointments_version = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -51,40 +80,36 @@ class User(Base):
     def __repr__(self):
         return f"<User {self.username} ({self.role.value})>"
 
+    # Directory attributes of doctors. Load it explicitly (e.g. with
+    # joinedload) before reading the profile properties below.
+    profile = relationship(
+        DoctorProfile, uselist=False, lazy="raise_on_sql", passive_deletes=True
+    )
+
     @property
     def years_experience(self):
-
-        if self.role != UserRole.doctor:
-            return None
-        return (self.id * 3) % 15 + 1
+        return self.profile.years_experience if self.profile else None
 
     @property
     def bio(self):
-        if self.role != UserRole.doctor:
-            return None
-        spec = self.specialization or "General Medicine"
-        return f"Experienced physician specializing in {spec}. Committed to providing compassionate and comprehensive care."
+        return self.profile.bio if self.profile else None
 
     @property
     def rating(self):
-        if self.role != UserRole.doctor:
-            return None
+        return self.profile.rating if self.profile else None
 
-        return 4.0 + ((self.id % 10) / 10)
+    @property
+    def review_count(self):
+        return self.profile.rating_count if self.profile else None
 
     @property
-    def expertise_areas(self):
-        if not self.specialization or self.role != UserRole.doctor:
-            return []
+    def rating_histogram(self):
+        return list(self.profile.rating_histogram) if self.profile else None
 
-        base_expertise = self.specialization.split(", ")
-        if "Cardiology" in self.specialization:
-            return base_expertise + ["Heart Disease", "Hypertension Management"]
-        elif "Neurology" in self.specialization:
-            return base_expertise + ["Headache Disorders", "Movement Disorders"]
-        return base_expertise
+    @property
+    def expertise_areas(self):
+        return list(self.profile.expertise_areas) if self.profile else []
 
     @property
     def languages(self):
-
-        return ["English", "Spanish"] if self.role == UserRole.doctor else []
+        return list(self.profile.languages) if self.profile else []
@@ -0,0 +1,371 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Row,
+    case,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.api.pagination import encode_cursor
+from app.api.schemas.appointment import AppointmentDetailResponse
+from app.core.notifications import OutgoingEmail
+from app.models.appointment import (
+    DOCTOR_OVERLAP_CONSTRAINT,
+    Appointment,
+    AppointmentStatus,
+)
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User
+from app.services.availability import availability_engine
+from app.services.outbox import enqueue_emails
+from app.services.reminders import (
+    cancel_appointment_reminders,
+    reschedule_appointment_reminders,
+)
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE raised by Postgres when an exclusion constraint is violated.
+EXCLUSION_VIOLATION = "23P01"
+
+
+def is_double_booking(exc: IntegrityError) -> bool:
+    """True if `exc` comes from the doctor overlap exclusion constraint."""
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == EXCLUSION_VIOLATION or DOCTOR_OVERLAP_CONSTRAINT in str(orig)
+
+
+async def bump_appointments_version(db: AsyncSession, user_ids: Iterable[int]):
+    """
+    Mark the participants' appointment lists as changed, in the caller's
+    transaction. Calendar feeds use the counter as their ETag.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id.in_(set(user_ids)))
+        .values(appointments_version=User.appointments_version + 1)
+    )
+
+
+def _overlaps(start: datetime, end: datetime):
+    # Same expression and predicate as the exclusion constraint, so the planner
+    # can answer calendar queries from its GiST index.
+    return func.tstzrange(Appointment.start_time, Appointment.end_time).op("&&")(
+        func.tstzrange(literal(start), literal(end))
+    )
+
+
+async def get_doctor_busy_slots(
+    db: AsyncSession, doctor_id: int, start: datetime, end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """Scheduled (start, end) intervals of a doctor that overlap [start, end)."""
+    query = (
+        select(Appointment.start_time, Appointment.end_time)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.status == AppointmentStatus.scheduled,
+            _overlaps(start, end),
+        )
+        .order_by(Appointment.start_time)
+    )
+    result = await db.execute(query)
+    return [(row.start_time, row.end_time) for row in result]
+
+
+async def find_nearest_free_slots(
+    db: AsyncSession,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    count: int = 3,
+    search_window: timedelta = timedelta(days=1),
+    not_before: Optional[datetime] = None,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Suggest up to `count` free slots of the same length as [start, end) for a
+    doctor, closest to the requested start. Candidates start right after or end
+    right before an existing booking within `search_window` of the request.
+    """
+    duration = end - start
+    busy = await get_doctor_busy_slots(
+        db, doctor_id, start - search_window - duration, end + search_window
+    )
+
+    candidates = set()
+    for busy_start, busy_end in busy:
+        candidates.add(busy_end)
+        candidates.add(busy_start - duration)
+
+    def is_free(slot_start: datetime) -> bool:
+        slot_end = slot_start + duration
+        return all(
+            slot_end <= b_start or slot_start >= b_end for b_start, b_end in busy
+        )
+
+    slots = [
+        (slot_start, slot_start + duration)
+        for slot_start in candidates
+        if abs(slot_start - start) <= search_window
+        and (not_before is None or slot_start >= not_before)
+        and is_free(slot_start)
+    ]
+    slots.sort(key=lambda slot: (abs(slot[0] - start), slot[0]))
+    return slots[:count]
+
+
+def user_appointments_union(user_id: int, filters: list, limit: Optional[int] = None):
+    """
+    Subquery of a user's appointments as patient UNION ALL as doctor. Each
+    branch can use its own participant index; with `limit`, each branch is
+    ordered newest first and cut before the merge.
+    """
+
+    def branch(*conditions):
+        query = select(Appointment).where(*conditions, *filters)
+        if limit is not None:
+            query = query.order_by(
+                Appointment.start_time.desc(), Appointment.id.desc()
+            ).limit(limit)
+        return query
+
+    return union_all(
+        branch(Appointment.patient_id == user_id),
+        # A user booked with themselves is already covered by the first branch.
+        branch(Appointment.doctor_id == user_id, Appointment.patient_id != user_id),
+    ).subquery()
+
+
+def counterpart_id(combined, user_id: int):
+    """The other participant of each row of `user_appointments_union`."""
+    return case(
+        (combined.c.patient_id == user_id, combined.c.doctor_id),
+        else_=combined.c.patient_id,
+    )
+
+
+def display_name(user):
+    """SQL expression for "First Last", falling back to the username."""
+    return func.coalesce(
+        func.nullif(func.concat_ws(" ", user.first_name, user.last_name), ""),
+        user.username,
+    )
+
+
+async def list_user_appointments(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    status: Optional[AppointmentStatus] = None,
+    expand: bool = False,
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a user's appointments as patient or doctor, newest first.
+
+    The OR of the two roles is split into a UNION ALL so each branch can walk
+    its own (patient_id, start_time) or (doctor_id, start_time) index, and
+    each branch is limited before merging. Pages are keyset-based on
+    (start_time, id); returns the rows and the cursor for the next page.
+
+    With `expand`, each row also carries the counterpart's display name, role
+    and specialization and the latest triage record id, joined in the same
+    query so the client needs no follow-up lookups.
+    """
+    filters = []
+    if start_from is not None:
+        filters.append(Appointment.start_time >= start_from)
+    if start_to is not None:
+        filters.append(Appointment.start_time < start_to)
+    if status is not None:
+        filters.append(Appointment.status == status)
+    if after is not None:
+        filters.append(tuple_(Appointment.start_time, Appointment.id) < after)
+
+    combined = user_appointments_union(user_id, filters, limit=limit + 1)
+    row = aliased(Appointment, combined)
+    query = (
+        select(row)
+        .order_by(combined.c.start_time.desc(), combined.c.id.desc())
+        .limit(limit + 1)
+    )
+
+    if expand:
+        counterpart = aliased(User, name="counterpart")
+        latest_triage = (
+            select(HealthRecord.id)
+            .where(
+                HealthRecord.patient_id == combined.c.patient_id,
+                HealthRecord.doctor_id == combined.c.doctor_id,
+                HealthRecord.record_type == RecordType.at_triage,
+            )
+            .order_by(HealthRecord.created_at.desc(), HealthRecord.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = query.add_columns(
+            display_name(counterpart).label("counterpart_name"),
+            counterpart.role.label("counterpart_role"),
+            counterpart.specialization.label("counterpart_specialization"),
+            latest_triage.label("latest_triage_record_id"),
+        ).join(counterpart, counterpart.id == counterpart_id(combined, user_id))
+
+        result = await db.execute(query)
+        appointments = [
+            AppointmentDetailResponse.model_validate(
+                appointment, from_attributes=True
+            ).model_copy(
+                update={
+                    "counterpart_name": name,
+                    "counterpart_role": role.value,
+                    "counterpart_specialization": specialization,
+                    "latest_triage_record_id": triage_id,
+                }
+            )
+            for appointment, name, role, specialization, triage_id in result
+        ]
+    else:
+        result = await db.execute(query)
+        appointments = result.scalars().all()
+
+    next_cursor = None
+    if len(appointments) > limit:
+        appointments = appointments[:limit]
+        last = appointments[-1]
+        next_cursor = encode_cursor(last.start_time, last.id)
+    return appointments, next_cursor
+
+
+def _render_change_notice(
+    row: Row, shift: Optional[timedelta], reason: Optional[str]
+) -> OutgoingEmail:
+    """Email telling a patient their appointment was cancelled or moved."""
+    if shift is None:
+        subject = "Appointment Cancelled"
+        change = (
+            f"Your appointment with Dr. {row.doctor_name} on "
+            f"{row.start_time.strftime('%Y-%m-%d %H:%M %Z')} has been cancelled."
+        )
+    else:
+        old_start = row.start_time - shift
+        subject = "Appointment Rescheduled"
+        change = (
+            f"Your appointment with Dr. {row.doctor_name} on "
+            f"{old_start.strftime('%Y-%m-%d %H:%M %Z')} has been moved to "
+            f"{row.start_time.strftime('%Y-%m-%d %H:%M %Z')}."
+        )
+    body = f"""
+    Dear {row.patient_name},
+
+    {change}
+    {f"Reason: {reason}" if reason else ""}
+
+    You can review your appointments or book a new time in HealthSync AI.
+
+    Best regards,
+    HealthSync AI Team
+    """
+    return OutgoingEmail(row.patient_email, subject, body, row.id)
+
+
+async def change_scheduled_appointments(
+    db: AsyncSession,
+    conditions: list,
+    new_status: AppointmentStatus = AppointmentStatus.cancelled,
+    shift: Optional[timedelta] = None,
+    notify_patients: bool = True,
+    reason: Optional[str] = None,
+) -> List[Row]:
+    """
+    Cancel or complete (`new_status`), or move by `shift`, every scheduled
+    appointment matching `conditions`, in the caller's transaction.
+
+    The change is a single UPDATE ... RETURNING joined to the participants,
+    followed by set-based reminder updates and one multi-row insert of patient
+    notices into the email outbox. Returns the changed rows with their new
+    values; call `sync_availability` with them once the transaction commits.
+
+    A shift that would overlap other bookings raises the overlap constraint's
+    IntegrityError. The constraint is deferrable, so it is checked once the
+    whole statement has run: a block of back-to-back appointments can move
+    even though it collides with itself row by row.
+    """
+    if shift is not None:
+        values = {
+            "start_time": Appointment.start_time + shift,
+            "end_time": Appointment.end_time + shift,
+        }
+    else:
+        values = {"status": new_status}
+
+    changed = (
+        update(Appointment)
+        .where(Appointment.status == AppointmentStatus.scheduled, *conditions)
+        .values(**values)
+        .returning(
+            Appointment.id,
+            Appointment.patient_id,
+            Appointment.doctor_id,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+            Appointment.telemedicine_url,
+        )
+        .cte("changed")
+    )
+    patient = aliased(User, name="patient")
+    doctor = aliased(User, name="doctor")
+    query = (
+        select(
+            changed,
+            patient.email.label("patient_email"),
+            display_name(patient).label("patient_name"),
+            display_name(doctor).label("doctor_name"),
+        )
+        .join(patient, patient.id == changed.c.patient_id)
+        .join(doctor, doctor.id == changed.c.doctor_id)
+        .order_by(changed.c.start_time, changed.c.id)
+    )
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return rows
+
+    if shift is not None:
+        await reschedule_appointment_reminders(
+            db, [(row.id, row.start_time) for row in rows]
+        )
+    else:
+        await cancel_appointment_reminders(db, [row.id for row in rows])
+    await bump_appointments_version(
+        db, [row.patient_id for row in rows] + [row.doctor_id for row in rows]
+    )
+    if notify_patients:
+        await enqueue_emails(
+            db, (_render_change_notice(row, shift, reason) for row in rows)
+        )
+    return rows
+
+
+def sync_availability(rows: List[Row], shift: Optional[timedelta] = None):
+    """Apply committed changes from `change_scheduled_appointments` to the snapshot."""
+    moved_by = shift or timedelta(0)
+    for row in rows:
+        availability_engine.release(
+            row.doctor_id, row.start_time - moved_by, row.end_time - moved_by
+        )
+    if shift is not None:
+        # Book after releasing everything, as moved slots can overlap old ones.
+        for row in rows:
+            availability_engine.book(row.doctor_id, row.start_time, row.end_time)
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 import logging
 
 from fastapi import Depends, HTTPException, status
@@ -10,8 +10,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.schemas.auth import UserCreate, Token
 from app.core import security, config
 from app.core.email_service import EmailService
+from app.core.rate_limit import login_throttle
 from app.db.database import get_db_session
 from app.models.user import User
+from app.services.outbox import enqueue_email
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 logger = logging.getLogger(__name__)
@@ -68,15 +70,11 @@ class AuthService:
             await db_session.flush()
             await db_session.refresh(new_user)
 
-            try:
-                await self.email_service.send_registration_email(
-                    user_email=new_user.email, username=new_user.username
-                )
-            except Exception as email_exc:
-
-                logger.error(
-                    f"Failed to send registration email to {new_user.email}: {email_exc}"
-                )
+            # Delivered by the outbox dispatcher once this transaction commits.
+            subject, body = self.email_service.render_registration_email(
+                new_user.username
+            )
+            enqueue_email(db_session, new_user.email, subject, body)
 
             await db_session.commit()
             await db_session.refresh(new_user)
@@ -106,17 +104,22 @@ class AuthService:
             )
 
     async def login_user(
-        self, form_data: OAuth2PasswordRequestForm, db_session: AsyncSession
+        self,
+        form_data: OAuth2PasswordRequestForm,
+        db_session: AsyncSession,
+        client_ip: Optional[str] = None,
     ) -> Token:
-        """Logs in an existing user."""
+        """Logs in an existing user. Throttled per username and client IP."""
 
         try:
+            await login_throttle.check(form_data.username, client_ip)
+
             query = select(User).where(User.username == form_data.username)
             result = await db_session.execute(query)
             user = result.scalars().first()
 
-            if not user or not security.verify_password(
-                form_data.password, user.hashed_password
+            if not security.verify_password_or_dummy(
+                form_data.password, user.hashed_password if user else None
             ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+class FreeSlot(NamedTuple):
+    doctor_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+def _run_starts(mask: int, length: int) -> int:
+    """Bits of `mask` that start a run of at least `length` consecutive set bits."""
+    runs = mask
+    for shift in range(1, length):
+        runs &= mask >> shift
+    return runs
+
+
+class AvailabilityEngine:
+    """
+    Answers "when is a doctor free?" from memory.
+
+    Each day is a 96-bit int, one bit per 15-minute slot in the clinic
+    timezone. A doctor's free slots on a day are `working & ~booked`, so a
+    search across thousands of doctors is a few integer operations per doctor
+    and day, with no database round trip.
+
+    Bookings and cancellations handled by this process update the bitmaps
+    incrementally. Changes made by other workers are picked up by a full
+    rebuild once the snapshot is older than `ttl`. Results are advisory: the
+    exclusion constraint on appointments still guards against double booking.
+    """
+
+    def __init__(
+        self,
+        horizon_days: int = settings.AVAILABILITY_HORIZON_DAYS,
+        ttl: timedelta = timedelta(seconds=settings.AVAILABILITY_REFRESH_SECONDS),
+        day_start_hour: int = settings.AVAILABILITY_DAY_START_HOUR,
+        day_end_hour: int = settings.AVAILABILITY_DAY_END_HOUR,
+        working_weekdays: Iterable[int] = range(5),
+        tz: str = settings.CLINIC_TIMEZONE,
+    ):
+        self.horizon_days = horizon_days
+        self.ttl = ttl
+        self.tz = ZoneInfo(tz)
+        self.working_weekdays = frozenset(working_weekdays)
+
+        slots_per_hour = 60 // SLOT_MINUTES
+        self.working_mask = 0
+        for slot in range(
+            day_start_hour * slots_per_hour, day_end_hour * slots_per_hour
+        ):
+            self.working_mask |= 1 << slot
+
+        # specialization (lower-cased) -> doctor ids
+        self._doctors_by_specialization: Dict[str, List[int]] = {}
+        # doctor id -> day -> booked slot bitmap
+        self._booked: Dict[int, Dict[date, int]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    # --- Snapshot management ---
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl.total_seconds()
+        )
+
+    async def ensure_fresh(self, db: AsyncSession):
+        """Rebuild the snapshot if it is missing or older than the TTL."""
+        if not self.is_stale:
+            return
+        async with self._lock:
+            if self.is_stale:
+                await self.rebuild(db)
+
+    def invalidate(self):
+        """Force a rebuild on the next query, e.g. after doctor profile changes."""
+        self._loaded_at = None
+
+    async def rebuild(self, db: AsyncSession):
+        """Load available doctors and their scheduled appointments in the horizon."""
+        started = time.monotonic()
+        doctors_by_specialization = defaultdict(list)
+        booked: Dict[int, Dict[date, int]] = {}
+
+        result = await db.execute(
+            select(User.id, User.specialization)
+            .where(User.role == UserRole.doctor, User.is_available == True)
+            .order_by(User.id)
+        )
+        for doctor_id, specialization in result:
+            doctors_by_specialization[(specialization or "").lower()].append(doctor_id)
+            booked[doctor_id] = {}
+
+        now = datetime.now(timezone.utc)
+        result = await db.stream(
+            select(Appointment.doctor_id, Appointment.start_time, Appointment.end_time)
+            .where(
+                Appointment.status == AppointmentStatus.scheduled,
+                Appointment.end_time > now,
+                Appointment.start_time < now + timedelta(days=self.horizon_days + 1),
+            )
+            .execution_options(yield_per=1000)
+        )
+        async for doctor_id, start_time, end_time in result:
+            if doctor_id in booked:
+                self._mark(booked[doctor_id], start_time, end_time, busy=True)
+
+        self._doctors_by_specialization = dict(doctors_by_specialization)
+        self._booked = booked
+        self._loaded_at = time.monotonic()
+
+        duration = self._loaded_at - started
+        metrics.AVAILABILITY_REBUILD_SECONDS.observe(duration)
+        logger.info(
+            f"Availability snapshot rebuilt for {len(booked)} doctor(s) in {duration:.3f}s."
+        )
+
+    # --- Incremental updates ---
+
+    def add_doctor(self, doctor_id: int, specialization: Optional[str]):
+        """Start tracking a doctor with an empty calendar."""
+        if doctor_id not in self._booked:
+            key = (specialization or "").lower()
+            self._doctors_by_specialization.setdefault(key, []).append(doctor_id)
+            self._booked[doctor_id] = {}
+
+    def book(self, doctor_id: int, start_time: datetime, end_time: datetime):
+        """Mark [start_time, end_time) busy for a doctor."""
+        days = self._booked.get(doctor_id)
+        if days is not None:
+            self._mark(days, start_time, end_time, busy=True)
+
+    def release(self, doctor_id: int, start_time: datetime, end_time: datetime):
+        """
+        Free [start_time, end_time) again after a cancellation or reschedule.
+        A slot shared with a neighbouring booking that does not end on a slot
+        boundary is freed too, until the next rebuild.
+        """
+        days = self._booked.get(doctor_id)
+        if days is not None:
+            self._mark(days, start_time, end_time, busy=False)
+
+    def _slot_span(
+        self, start_time: datetime, end_time: datetime
+    ) -> Iterable[Tuple[date, int]]:
+        """Yield (local day, slot mask) pairs covered by [start_time, end_time)."""
+        start = start_time.astimezone(self.tz)
+        end = end_time.astimezone(self.tz)
+        day = start.date()
+        while datetime.combine(day, datetime.min.time(), self.tz) < end:
+            day_start = datetime.combine(day, datetime.min.time(), self.tz)
+            first = 0 if start <= day_start else self._slot_index(start, floor=True)
+            last = (
+                SLOTS_PER_DAY
+                if end >= day_start + timedelta(days=1)
+                else self._slot_index(end, floor=False)
+            )
+            if last > first:
+                yield day, ((1 << last) - 1) ^ ((1 << first) - 1)
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _slot_index(moment: datetime, floor: bool) -> int:
+        minutes = moment.hour * 60 + moment.minute
+        if floor:
+            return minutes // SLOT_MINUTES
+        if moment.second or moment.microsecond:
+            minutes += 1
+        return -(-minutes // SLOT_MINUTES)
+
+    def _mark(self, days: Dict[date, int], start_time, end_time, busy: bool):
+        for day, mask in self._slot_span(start_time, end_time):
+            bitmap = days.get(day, 0)
+            bitmap = bitmap | mask if busy else bitmap & ~mask
+            if bitmap:
+                days[day] = bitmap
+            else:
+                days.pop(day, None)
+
+    # --- Queries ---
+
+    def _doctor_ids(
+        self, specialization: Optional[str], doctor_id: Optional[int]
+    ) -> List[int]:
+        if doctor_id is not None:
+            return [doctor_id] if doctor_id in self._booked else []
+        if not specialization:
+            return [d for ids in self._doctors_by_specialization.values() for d in ids]
+        needle = specialization.lower()
+        return [
+            d
+            for key, ids in self._doctors_by_specialization.items()
+            if needle in key
+            for d in ids
+        ]
+
+    def find_free_slots(
+        self,
+        specialization: Optional[str] = None,
+        doctor_id: Optional[int] = None,
+        count: int = 10,
+        days: int = 14,
+        duration_minutes: int = SLOT_MINUTES,
+        now: Optional[datetime] = None,
+    ) -> List[FreeSlot]:
+        """
+        First `count` free slots of `duration_minutes` across matching doctors
+        within the next `days`, earliest first (ties broken by doctor id).
+        Slots start on 15-minute boundaries and never start in the past.
+        """
+        now = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        length = max(1, -(-duration_minutes // SLOT_MINUTES))
+        doctor_ids = self._doctor_ids(specialization, doctor_id)
+        days = min(days, self.horizon_days)
+        booked = self._booked
+
+        found: List[Tuple[int, int, date]] = []
+        for offset in range(days + 1):
+            day = now.date() + timedelta(days=offset)
+            if day.weekday() not in self.working_weekdays:
+                continue
+            window = self.working_mask
+            if offset == 0:
+                # Only slots that have not started yet.
+                window &= ~((1 << self._slot_index(now, floor=False)) - 1)
+            if offset == days:
+                window &= (1 << self._slot_index(now, floor=True)) - 1
+            if not window:
+                continue
+
+            free_by_doctor = []
+            any_free = 0
+            for d in doctor_ids:
+                free = window & ~booked[d].get(day, 0)
+                if free and length > 1:
+                    free = _run_starts(free, length)
+                if free:
+                    free_by_doctor.append((d, free))
+                    any_free |= free
+
+            # Walk the slots that are free for at least one doctor, earliest
+            # first; every slot visited yields a result, so this stops quickly.
+            while any_free and len(found) < count:
+                low = any_free & -any_free
+                any_free ^= low
+                slot = low.bit_length() - 1
+                for d, free in free_by_doctor:
+                    if free & low:
+                        found.append((slot, d, day))
+                        if len(found) >= count:
+                            break
+            if len(found) >= count:
+                break
+
+        slots = []
+        for slot, d, day in found:
+            start = datetime.combine(day, datetime.min.time(), self.tz) + timedelta(
+                minutes=slot * SLOT_MINUTES
+            )
+            slots.append(
+                FreeSlot(
+                    d,
+                    start.astimezone(timezone.utc),
+                    (start + timedelta(minutes=duration_minutes)).astimezone(
+                        timezone.utc
+                    ),
+                )
+            )
+        return slots
+
+
+availability_engine = AvailabilityEngine()
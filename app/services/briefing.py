@@ -0,0 +1,316 @@
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.briefing import (
+    BriefingAppointment,
+    BriefingPatient,
+    BriefingRecordDigest,
+    BriefingRecordHeader,
+    BriefingTriage,
+    DoctorBriefingOut,
+)
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.doctor_briefing import DoctorBriefing
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User
+from app.services.appointment import display_name
+
+logger = logging.getLogger(__name__)
+
+CLINIC_TZ = ZoneInfo(settings.CLINIC_TIMEZONE)
+# Record headers listed per patient; the full records stay one click away.
+BRIEFING_RECENT_RECORDS = 5
+
+
+def clinic_today() -> date:
+    return datetime.now(CLINIC_TZ).date()
+
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, time.min, tzinfo=CLINIC_TZ)
+    return start, datetime.combine(day + timedelta(days=1), time.min, tzinfo=CLINIC_TZ)
+
+
+async def _record_digests(
+    db: AsyncSession, patient_ids: Iterable[int]
+) -> Dict[int, dict]:
+    """
+    Latest triage record and record digest of each patient, in three queries
+    whatever the number of patients. Patients without records are absent.
+    """
+    patient_ids = list(set(patient_ids))
+    digests: Dict[int, dict] = {}
+    if not patient_ids:
+        return digests
+
+    counts = await db.execute(
+        select(
+            HealthRecord.patient_id,
+            func.count().label("total"),
+            func.count()
+            .filter(HealthRecord.record_type == RecordType.doctor_note)
+            .label("doctor_notes"),
+            func.max(HealthRecord.created_at).label("last_record_at"),
+        )
+        .where(HealthRecord.patient_id.in_(patient_ids))
+        .group_by(HealthRecord.patient_id)
+    )
+    for row in counts:
+        digests[row.patient_id] = {
+            "latest_triage": None,
+            "records": BriefingRecordDigest(
+                total=row.total,
+                doctor_notes=row.doctor_notes,
+                last_record_at=row.last_record_at,
+            ),
+        }
+
+    triages = await db.execute(
+        select(HealthRecord)
+        .where(
+            HealthRecord.patient_id.in_(patient_ids),
+            HealthRecord.record_type == RecordType.at_triage,
+        )
+        .distinct(HealthRecord.patient_id)
+        .order_by(
+            HealthRecord.patient_id,
+            HealthRecord.created_at.desc(),
+            HealthRecord.id.desc(),
+        )
+    )
+    for record in triages.scalars():
+        digests[record.patient_id]["latest_triage"] = BriefingTriage.model_validate(
+            record, from_attributes=True
+        )
+
+    position = (
+        func.row_number()
+        .over(
+            partition_by=HealthRecord.patient_id,
+            order_by=(HealthRecord.created_at.desc(), HealthRecord.id.desc()),
+        )
+        .label("position")
+    )
+    ranked = (
+        select(
+            HealthRecord.id,
+            HealthRecord.patient_id,
+            HealthRecord.record_type,
+            HealthRecord.title,
+            HealthRecord.created_at,
+            position,
+        )
+        .where(HealthRecord.patient_id.in_(patient_ids))
+        .subquery()
+    )
+    recent = await db.execute(
+        select(ranked)
+        .where(ranked.c.position <= BRIEFING_RECENT_RECORDS)
+        .order_by(ranked.c.patient_id, ranked.c.position)
+    )
+    for row in recent:
+        digests[row.patient_id]["records"].recent.append(
+            BriefingRecordHeader(
+                id=row.id,
+                record_type=row.record_type.value,
+                title=row.title,
+                created_at=row.created_at,
+            )
+        )
+    return digests
+
+
+def _with_digest(appointment: BriefingAppointment, digests: Dict[int, dict]):
+    digest = digests.get(appointment.patient.id)
+    appointment.latest_triage = digest["latest_triage"] if digest else None
+    appointment.records = digest["records"] if digest else BriefingRecordDigest()
+    return appointment
+
+
+async def build_briefings(
+    db: AsyncSession, day: date, doctor_ids: Optional[List[int]] = None
+) -> Dict[int, str]:
+    """
+    Build and store the briefings of `day` for `doctor_ids`, or for every
+    doctor with appointments that day, in the caller's transaction. Returns
+    the serialized documents by doctor id.
+    """
+    start, end = _day_bounds(day)
+    conditions = [
+        Appointment.status != AppointmentStatus.cancelled,
+        Appointment.start_time >= start,
+        Appointment.start_time < end,
+    ]
+    if doctor_ids is not None:
+        conditions.append(Appointment.doctor_id.in_(doctor_ids))
+    rows = (
+        await db.execute(
+            select(Appointment, User, display_name(User).label("patient_name"))
+            .join(User, User.id == Appointment.patient_id)
+            .where(*conditions)
+            .order_by(Appointment.doctor_id, Appointment.start_time)
+        )
+    ).all()
+    digests = await _record_digests(db, (row.User.id for row in rows))
+
+    by_doctor: Dict[int, List[BriefingAppointment]] = defaultdict(list)
+    for doctor_id in doctor_ids or []:
+        by_doctor[doctor_id] = []
+    for appointment, patient, patient_name in rows:
+        entry = BriefingAppointment(
+            appointment_id=appointment.id,
+            start_time=appointment.start_time,
+            end_time=appointment.end_time,
+            status=appointment.status.value,
+            telemedicine_url=appointment.telemedicine_url,
+            patient=BriefingPatient(
+                id=patient.id,
+                name=patient_name,
+                date_of_birth=patient.date_of_birth,
+                gender=patient.gender.value if patient.gender else None,
+                blood_type=patient.blood_type,
+                allergies=patient.allergies,
+                existing_conditions=patient.existing_conditions,
+            ),
+            records=BriefingRecordDigest(),
+        )
+        by_doctor[appointment.doctor_id].append(_with_digest(entry, digests))
+    if not by_doctor:
+        return {}
+
+    versions = dict(
+        (
+            await db.execute(
+                select(User.id, User.appointments_version).where(
+                    User.id.in_(list(by_doctor))
+                )
+            )
+        ).all()
+    )
+    generated_at = datetime.now(timezone.utc)
+    documents = {
+        doctor_id: DoctorBriefingOut(
+            doctor_id=doctor_id,
+            day=day,
+            generated_at=generated_at,
+            appointments=appointments,
+        ).model_dump_json()
+        for doctor_id, appointments in by_doctor.items()
+        if doctor_id in versions
+    }
+    if documents:
+        statement = insert(DoctorBriefing).values(
+            [
+                {
+                    "doctor_id": doctor_id,
+                    "day": day,
+                    "appointments_version": versions[doctor_id],
+                    "document": document,
+                }
+                for doctor_id, document in documents.items()
+            ]
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DoctorBriefing.doctor_id, DoctorBriefing.day],
+                set_={
+                    "appointments_version": statement.excluded.appointments_version,
+                    "document": statement.excluded.document,
+                    "generated_at": func.now(),
+                    "updated_at": func.now(),
+                },
+            )
+        )
+    return documents
+
+
+async def get_briefing(db: AsyncSession, doctor_id: int, day: date) -> str:
+    """
+    The stored briefing, rebuilt first if it is missing or the doctor's
+    appointments changed since it was built.
+    """
+    row = (
+        await db.execute(
+            select(DoctorBriefing.document, DoctorBriefing.appointments_version)
+            .join(User, User.id == DoctorBriefing.doctor_id)
+            .where(
+                DoctorBriefing.doctor_id == doctor_id,
+                DoctorBriefing.day == day,
+                DoctorBriefing.appointments_version == User.appointments_version,
+            )
+        )
+    ).first()
+    if row is not None:
+        return row.document
+
+    documents = await build_briefings(db, day, [doctor_id])
+    await db.commit()
+    return documents[doctor_id]
+
+
+async def refresh_patient_briefings(db: AsyncSession, patient_id: int) -> int:
+    """
+    Patch the patient's triage record and digest into the stored briefings
+    from today on that list one of their appointments, in the caller's
+    transaction. Called whenever a health record is added.
+    """
+    return await refresh_briefings_for_patients(db, [patient_id])
+
+
+async def refresh_briefings_for_patients(
+    db: AsyncSession, patient_ids: Iterable[int]
+) -> int:
+    """`refresh_patient_briefings` for many patients at once, e.g. after an import."""
+    patient_ids = set(patient_ids)
+    if not patient_ids:
+        return 0
+    appointment_day = cast(
+        func.timezone(settings.CLINIC_TIMEZONE, Appointment.start_time), Date
+    )
+    briefings = (
+        (
+            await db.execute(
+                select(DoctorBriefing)
+                .where(
+                    DoctorBriefing.day >= clinic_today(),
+                    select(Appointment.id)
+                    .where(
+                        Appointment.doctor_id == DoctorBriefing.doctor_id,
+                        Appointment.patient_id.in_(patient_ids),
+                        Appointment.status != AppointmentStatus.cancelled,
+                        appointment_day == DoctorBriefing.day,
+                    )
+                    .exists(),
+                )
+                .with_for_update()
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if not briefings:
+        return 0
+
+    digests = await _record_digests(db, list(patient_ids))
+    for briefing in briefings:
+        document = DoctorBriefingOut.model_validate(json.loads(briefing.document))
+        for appointment in document.appointments:
+            if appointment.patient.id in patient_ids:
+                _with_digest(appointment, digests)
+        briefing.document = document.model_dump_json()
+    await db.flush()
+    return len(briefings)
+
+
+async def prune_briefings(db: AsyncSession, before: date) -> int:
+    result = await db.execute(delete(DoctorBriefing).where(DoctorBriefing.day < before))
+    return result.rowcount
@@ -0,0 +1,189 @@
+import base64
+import hashlib
+import hmac
+import logging
+from datetime import datetime, time, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event, inspect, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User, UserRole
+from app.services.appointment import (
+    counterpart_id,
+    display_name,
+    user_appointments_union,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered output changes, so cached feeds are refetched.
+FEED_FORMAT_VERSION = 1
+# Past appointments older than this are left out of the feed.
+FEED_HISTORY = timedelta(days=90)
+# User columns rendered into other participants' feeds (see display_name).
+_FEED_NAME_FIELDS = ("first_name", "last_name", "username")
+
+
+def _feed_signature(user_id: int) -> str:
+    digest = hmac.new(
+        settings.secret_key.encode(), f"ics-feed:{user_id}".encode(), hashlib.sha256
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode()
+
+
+def create_feed_token(user_id: int) -> str:
+    """Unguessable token that identifies a user's calendar feed in its URL."""
+    return f"{user_id}.{_feed_signature(user_id)}"
+
+
+def parse_feed_token(token: str) -> Optional[int]:
+    """Return the user id of a valid feed token, or None."""
+    user_id, _, signature = token.partition(".")
+    if not user_id.isdigit():
+        return None
+    if not hmac.compare_digest(signature, _feed_signature(int(user_id))):
+        return None
+    return int(user_id)
+
+
+def feed_window_start() -> datetime:
+    """
+    Oldest start time listed in feeds: FEED_HISTORY before today's midnight
+    UTC, so the window, and with it the ETag, moves once a day.
+    """
+    today = datetime.now(timezone.utc).date()
+    return datetime.combine(today, time.min, tzinfo=timezone.utc) - FEED_HISTORY
+
+
+def feed_etag(user_id: int, appointments_version: int, since: datetime) -> str:
+    """
+    Strong ETag: the feed only changes when the user's appointments (or the
+    names of the other participants) do, or when the window moves.
+    """
+    return (
+        f'"ics-{FEED_FORMAT_VERSION}-{user_id}-{appointments_version}'
+        f'-{since:%Y%m%d}"'
+    )
+
+
+async def get_appointments_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    return await db.scalar(select(User.appointments_version).where(User.id == user_id))
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line to 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current = [], b""
+    for char in line:
+        char_bytes = char.encode()
+        limit = 75 if not parts else 74
+        if len(current) + len(char_bytes) > limit:
+            parts.append(current.decode())
+            current = b""
+        current += char_bytes
+    parts.append(current.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _render_event(row) -> str:
+    if row.counterpart_role == UserRole.doctor:
+        summary = f"Appointment with Dr. {row.counterpart_name}"
+    else:
+        summary = f"Appointment with {row.counterpart_name}"
+    updated = row.updated_at or row.created_at
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:appointment-{row.id}@healthsync",
+        f"DTSTAMP:{_timestamp(updated)}",
+        f"SEQUENCE:{int(updated.timestamp())}",
+        f"DTSTART:{_timestamp(row.start_time)}",
+        f"DTEND:{_timestamp(row.end_time)}",
+        f"SUMMARY:{_escape(summary)}",
+        "STATUS:"
+        + ("CANCELLED" if row.status == AppointmentStatus.cancelled else "CONFIRMED"),
+    ]
+    if row.telemedicine_url:
+        lines.append(f"URL:{row.telemedicine_url}")
+        lines.append(f"LOCATION:{_escape(row.telemedicine_url)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+async def render_feed(
+    db: AsyncSession, user_id: int, since: datetime
+) -> AsyncIterator[str]:
+    """
+    Stream a user's appointments starting from `since` as an iCalendar
+    document. Rows are read with a server-side cursor and rendered batch by
+    batch, so memory use does not grow with the size of the calendar.
+    """
+    combined = user_appointments_union(user_id, [Appointment.start_time >= since])
+    counterpart = aliased(User, name="counterpart")
+    query = (
+        select(
+            combined.c.id,
+            combined.c.start_time,
+            combined.c.end_time,
+            combined.c.status,
+            combined.c.telemedicine_url,
+            combined.c.created_at,
+            combined.c.updated_at,
+            display_name(counterpart).label("counterpart_name"),
+            counterpart.role.label("counterpart_role"),
+        )
+        .join(counterpart, counterpart.id == counterpart_id(combined, user_id))
+        .execution_options(yield_per=500)
+    )
+
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//HealthSync AI//Appointments//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        "X-WR-CALNAME:HealthSync appointments\r\n"
+    )
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield "".join(_render_event(row) for row in rows)
+    yield "END:VCALENDAR\r\n"
+
+
+@event.listens_for(User, "after_update")
+def _bump_counterpart_feeds(mapper, connection, user: User):
+    """
+    A user's name appears in the feeds of the people they have appointments
+    with; bump those feeds' versions in the same flush when it changes.
+    """
+    state = inspect(user)
+    if not any(state.attrs[field].history.has_changes() for field in _FEED_NAME_FIELDS):
+        return
+    listed = Appointment.start_time >= feed_window_start()
+    counterparts = union(
+        select(Appointment.doctor_id).where(Appointment.patient_id == user.id, listed),
+        select(Appointment.patient_id).where(Appointment.doctor_id == user.id, listed),
+    )
+    connection.execute(
+        update(User.__table__)
+        .where(User.id.in_(counterparts), User.id != user.id)
+        .values(appointments_version=User.appointments_version + 1)
+    )
@@ -1,27 +1,92 @@
 import logging
-from typing import List, Optional
-from sqlalchemy import select
+import time
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, literal_column, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
+from app.core import metrics
+from app.core.config import settings
+from app.models.doctor_profile import DoctorProfile
 from app.models.user import User, UserRole
 
 logger = logging.getLogger(__name__)
 
+# Literal constants rather than bind parameters, so the planner can match the
+# partial and expression indexes on users even with generic plans.
+_IS_DOCTOR = User.role == literal_column("'doctor'")
+# Same expression as the ix_users_doctor_name_trgm index.
+DOCTOR_SEARCH_NAME = (
+    func.coalesce(User.first_name, literal_column("''"))
+    + literal_column("' '")
+    + func.coalesce(User.last_name, literal_column("''"))
+)
+
+
+def _contains_pattern(term: str) -> str:
+    """ILIKE pattern matching `term` anywhere, with its wildcards escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# Directory orderings; name order is served by ix_users_available_doctors.
+DOCTOR_SORTS = {
+    "name": (User.last_name, User.first_name),
+    "rating": (
+        DoctorProfile.rating.desc().nulls_last(),
+        User.last_name,
+        User.first_name,
+    ),
+    "experience": (
+        DoctorProfile.years_experience.desc().nulls_last(),
+        User.last_name,
+        User.first_name,
+    ),
+}
+
 
 async def get_available_doctors(
-    db: AsyncSession, specialization: Optional[str] = None
+    db: AsyncSession,
+    specialization: Optional[str] = None,
+    name: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    min_experience: Optional[int] = None,
+    language: Optional[str] = None,
+    sort: str = "name",
 ) -> List[User]:
-    """Get a list of available doctors, optionally filtered by specialization."""
+    """
+    Get a list of available doctors with their profiles, optionally filtered
+    by a substring of their specialization or name and by profile attributes.
+    The substring filters are served by the pg_trgm GIN indexes on users, the
+    profile filters by the indexes on doctor_profiles.
+    """
     try:
-        query = select(User).where(
-            User.role == UserRole.doctor,
-            User.is_available == True,
+        query = (
+            select(User)
+            .outerjoin(DoctorProfile, DoctorProfile.doctor_id == User.id)
+            .options(contains_eager(User.profile))
+            .where(_IS_DOCTOR, User.is_available == true())
         )
 
         if specialization:
-            query = query.where(User.specialization.ilike(f"%{specialization}%"))
+            query = query.where(
+                User.specialization.ilike(_contains_pattern(specialization))
+            )
+        if name:
+            query = query.where(DOCTOR_SEARCH_NAME.ilike(_contains_pattern(name)))
+        if min_rating is not None:
+            query = query.where(DoctorProfile.rating >= min_rating)
+        if min_experience is not None:
+            query = query.where(DoctorProfile.years_experience >= min_experience)
+        if language:
+            query = query.where(
+                DoctorProfile.languages.contains([language.strip().title()])
+            )
 
-        query = query.order_by(User.last_name, User.first_name)
+        query = query.order_by(*DOCTOR_SORTS[sort])
 
         result = await db.execute(query)
         doctors = result.scalars().all()
@@ -36,7 +101,11 @@ async def get_available_doctors(
 async def get_doctor_by_id(db: AsyncSession, doctor_id: int) -> Optional[User]:
     """Get detailed information about a specific doctor."""
     try:
-        query = select(User).where(User.id == doctor_id, User.role == UserRole.doctor)
+        query = (
+            select(User)
+            .options(joinedload(User.profile))
+            .where(User.id == doctor_id, User.role == UserRole.doctor)
+        )
 
         result = await db.execute(query)
         doctor = result.scalar_one_or_none()
@@ -55,3 +124,163 @@ def calculate_experience(doctor: User) -> int:
         return doctor.years_in_practice
 
     return 0
+
+
+class DoctorDirectoryCache:
+    """
+    In-process cache of serialized `DoctorList` payloads, keyed by filter.
+    The directory changes rarely, so entries live for `ttl_seconds` and are
+    dropped as soon as a doctor's listed fields change in this process; the
+    TTL bounds staleness for changes made by other workers, so it should not
+    exceed how long presence takes to notice a doctor went offline.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, ...], Tuple[float, bytes]] = {}
+
+    @staticmethod
+    def key(*filters) -> Tuple[str, ...]:
+        return tuple(
+            "" if value is None else str(value).strip().lower() for value in filters
+        )
+
+    def get(self, key: Tuple[str, ...]) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            metrics.DOCTOR_DIRECTORY_CACHE.labels(result="miss").inc()
+            return None
+        metrics.DOCTOR_DIRECTORY_CACHE.labels(result="hit").inc()
+        return entry[1]
+
+    def set(self, key: Tuple[str, ...], payload: bytes):
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # Filters are free text; drop the oldest entry to stay bounded.
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic(), payload)
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+doctor_directory_cache = DoctorDirectoryCache(
+    min(settings.DOCTOR_DIRECTORY_CACHE_SECONDS, settings.PRESENCE_TTL_SECONDS)
+)
+
+# User columns that appear in the doctor directory.
+_DIRECTORY_FIELDS = (
+    "role",
+    "first_name",
+    "last_name",
+    "email",
+    "specialization",
+    "qualifications",
+    "is_available",
+)
+
+
+def _changes_directory(user: User) -> bool:
+    state = inspect(user)
+    if state.pending or state.deleted:
+        return user.role == UserRole.doctor
+    changed = any(
+        state.attrs[field].history.has_changes() for field in _DIRECTORY_FIELDS
+    )
+    return changed and (
+        user.role == UserRole.doctor
+        or UserRole.doctor in state.attrs.role.history.deleted
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_directory_changes(session, flush_context):
+    if any(
+        isinstance(obj, DoctorProfile)
+        or (isinstance(obj, User) and _changes_directory(obj))
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info["doctor_directory_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_directory(session):
+    # Invalidate only once the change is visible, so a concurrent request
+    # cannot cache the pre-commit directory again.
+    if session.info.pop("doctor_directory_changed", False):
+        doctor_directory_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_directory_changes(session):
+    session.info.pop("doctor_directory_changed", None)
+
+
+def default_profile_values(doctor_id: int, specialization: Optional[str]) -> dict:
+    """
+    Initial profile of a new doctor. Bio and expertise areas follow the
+    specialization; experience and languages stay unknown (NULL / empty),
+    so the directory filters leave the doctor out and sorts list them last.
+    The rating comes from patient reviews.
+    """
+    expertise = specialization.split(", ") if specialization else []
+    if specialization and "Cardiology" in specialization:
+        expertise += ["Heart Disease", "Hypertension Management"]
+    elif specialization and "Neurology" in specialization:
+        expertise += ["Headache Disorders", "Movement Disorders"]
+    return {
+        "doctor_id": doctor_id,
+        "years_experience": None,
+        "bio": (
+            "Experienced physician specializing in "
+            f"{specialization or 'General Medicine'}. "
+            "Committed to providing compassionate and comprehensive care."
+        ),
+        "expertise_areas": expertise,
+        "languages": [],
+    }
+
+
+def _upsert_profile(connection, user: User, refresh_specialization: bool):
+    values = default_profile_values(user.id, user.specialization)
+    statement = insert(DoctorProfile).values(**values)
+    if refresh_specialization:
+        statement = statement.on_conflict_do_update(
+            index_elements=[DoctorProfile.doctor_id],
+            set_={
+                "bio": statement.excluded.bio,
+                "expertise_areas": statement.excluded.expertise_areas,
+                "updated_at": func.now(),
+            },
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=[DoctorProfile.doctor_id]
+        )
+    connection.execute(statement)
+
+
+# Profiles are written in the same flush as the user row, so they stay in
+# sync however the user is created or updated.
+@event.listens_for(User, "after_insert")
+def _create_doctor_profile(mapper, connection, user: User):
+    if user.role == UserRole.doctor:
+        _upsert_profile(connection, user, refresh_specialization=False)
+
+
+@event.listens_for(User, "after_update")
+def _sync_doctor_profile(mapper, connection, user: User):
+    if user.role != UserRole.doctor:
+        return
+    state = inspect(user)
+    specialization_changed = state.attrs.specialization.history.has_changes()
+    if specialization_changed or state.attrs.role.history.has_changes():
+        _upsert_profile(connection, user, refresh_specialization=specialization_changed)
+
+
+def mark_directory_changed(db: AsyncSession):
+    """
+    Invalidate the directory cache when `db` commits, for changes made with
+    Core statements that the flush hooks above cannot see.
+    """
+    db.sync_session.info["doctor_directory_changed"] = True
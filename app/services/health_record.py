@@ -1,19 +1,23 @@
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from pydantic import BaseModel
+from app.api.pagination import encode_cursor
 from app.api.schemas.health_record import (
     HealthRecordCreate,
+    HealthRecordSummaryOut,
     SymptomItem,
     DiagnosisItem,
     TreatmentPlanItem,
     MedicationItem,
 )
-from app.models.health_record import HealthRecord, RecordType
+from app.models.health_record import HealthRecord, RecordType, lowered
 from app.models.chat_session import ChatSession
+from app.services.briefing import refresh_patient_briefings
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
@@ -55,6 +59,8 @@ async def create_health_record(
         )
 
         db.add(new_record)
+        await db.flush()
+        await refresh_patient_briefings(db, record_data.patient_id)
         await db.commit()
         await db.refresh(new_record)
 
@@ -75,29 +81,82 @@ async def create_health_record(
         )
 
 
-async def get_patient_health_records(
-    db: AsyncSession, patient_id: int, record_type: Optional[str] = None
-) -> List[HealthRecord]:
-    """Get all health records for a patient."""
-
+def parse_record_type(record_type: Optional[str]) -> Optional[RecordType]:
+    """The RecordType named by a filter value; raises 400 if there is none."""
+    if not record_type:
+        return None
     try:
-        query = select(HealthRecord).where(HealthRecord.patient_id == patient_id)
+        return RecordType(record_type.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid record_type '{record_type}'. Expected one of: "
+            + ", ".join(t.value for t in RecordType),
+        )
 
-        if record_type:
-            try:
-                record_type_enum = RecordType(record_type.lower())
-                query = query.where(HealthRecord.record_type == record_type_enum)
-            except ValueError:
 
-                logger.warning(f"Invalid record_type filter value: {record_type}")
+async def _page_of_records(
+    db: AsyncSession,
+    query,
+    limit: int,
+    after: Optional[Tuple[datetime, int]],
+    summary: bool,
+) -> Tuple[list, Optional[str]]:
+    """Run a health record query as one newest-first keyset page."""
+    if after is not None:
+        query = query.where(tuple_(HealthRecord.created_at, HealthRecord.id) < after)
+    if summary:
+        query = query.options(
+            defer(HealthRecord.symptoms),
+            defer(HealthRecord.diagnosis),
+            defer(HealthRecord.treatment_plan),
+            defer(HealthRecord.medication),
+        )
+    query = query.order_by(
+        HealthRecord.created_at.desc(), HealthRecord.id.desc()
+    ).limit(limit + 1)
 
-                pass
+    result = await db.execute(query)
+    records = result.scalars().all()
 
-        query = query.order_by(HealthRecord.created_at.desc())
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].created_at, records[-1].id)
+    if summary:
+        records = [
+            HealthRecordSummaryOut.model_validate(record, from_attributes=True)
+            for record in records
+        ]
+    return records, next_cursor
 
-        result = await db.execute(query)
-        return result.scalars().all()
 
+async def get_patient_health_records(
+    db: AsyncSession,
+    patient_id: int,
+    record_type: Optional[RecordType] = None,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    summary: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of a patient's health records, newest first, and the cursor of
+    the next page. Served by the ix_health_records_patient_*_recent indexes.
+    With `summary`, the JSON lists are neither loaded nor returned.
+    """
+    try:
+        query = select(HealthRecord).where(HealthRecord.patient_id == patient_id)
+
+        if record_type is not None:
+            query = query.where(HealthRecord.record_type == record_type)
+        if created_from is not None:
+            query = query.where(HealthRecord.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(HealthRecord.created_at < created_to)
+
+        return await _page_of_records(db, query, limit, after, summary)
     except Exception as exc:
         logger.error(f"Error retrieving health records for patient {patient_id}: {exc}")
         raise HTTPException(
@@ -106,6 +165,45 @@ async def get_patient_health_records(
         )
 
 
+async def search_health_records(
+    db: AsyncSession,
+    symptom: Optional[str] = None,
+    icd10_code: Optional[str] = None,
+    medication: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> Tuple[List[HealthRecordSummaryOut], Optional[str]]:
+    """
+    Summaries of the records, across patients, that list a symptom, a
+    diagnosis with an ICD-10 code and a medication with the given names
+    (whole values, names ignoring case; every given criterion must match).
+    Each criterion is a JSONB containment test answered by the
+    jsonb_path_ops GIN indexes, on the lower-cased lists for names.
+    """
+    query = select(HealthRecord)
+    if symptom:
+        query = query.where(
+            lowered(HealthRecord.symptoms).contains([{"name": symptom.lower()}])
+        )
+    if icd10_code:
+        query = query.where(
+            HealthRecord.diagnosis.contains([{"icd10_code": icd10_code.upper()}])
+        )
+    if medication:
+        query = query.where(
+            lowered(HealthRecord.medication).contains([{"name": medication.lower()}])
+        )
+
+    try:
+        return await _page_of_records(db, query, limit, after, summary=True)
+    except Exception as exc:
+        logger.error(f"Error searching health records: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search health records.",
+        )
+
+
 async def get_health_record_by_id(db: AsyncSession, record_id: int) -> HealthRecord:
     """Get a specific health record by ID."""
 
@@ -193,6 +291,8 @@ async def create_triage_record_from_chats(
         )
 
         db.add(health_record)
+        await db.flush()
+        await refresh_patient_briefings(db, patient_id)
         await db.commit()
         await db.refresh(health_record)
 
@@ -0,0 +1,203 @@
+import json
+import logging
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.health_record import (
+    HealthRecordCreate,
+    HealthRecordImportError,
+    HealthRecordImportReport,
+)
+from app.core.config import settings
+from app.models.chat_session import ChatSession
+from app.models.health_record import HealthRecord
+from app.models.user import User
+from app.services.briefing import refresh_briefings_for_patients
+from app.services.health_record import _serialize_list_items
+
+logger = logging.getLogger(__name__)
+
+# Per-row errors kept in a report; later ones are only counted.
+MAX_REPORTED_ERRORS = 1000
+
+
+async def ndjson_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: Optional[int] = None
+) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines without reading all of it first. Only
+    the bytes of the line in progress are kept; a line longer than
+    `max_line_bytes` is dropped as it arrives and yielded as None.
+    """
+    max_line_bytes = max_line_bytes or settings.HEALTH_RECORD_IMPORT_MAX_LINE_BYTES
+    parts: List[bytes] = []
+    size = 0
+    oversized = False
+    async for chunk in chunks:
+        *ends, rest = chunk.split(b"\n")
+        for end in ends:
+            if oversized or size + len(end) > max_line_bytes:
+                yield None
+            else:
+                yield b"".join(parts) + end
+            parts, size, oversized = [], 0, False
+        if oversized or size + len(rest) > max_line_bytes:
+            parts, size, oversized = [], 0, True
+        elif rest:
+            parts.append(rest)
+            size += len(rest)
+    if oversized:
+        yield None
+    elif parts:
+        yield b"".join(parts)
+
+
+def _error_message(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return str(exc)
+
+
+async def _missing_references(
+    db: AsyncSession, rows: List[Tuple[int, HealthRecordCreate]]
+) -> dict:
+    """Line -> error for rows naming a user or chat session that does not exist."""
+    user_ids = {record.patient_id for _, record in rows}
+    user_ids.update(record.doctor_id for _, record in rows if record.doctor_id)
+    session_ids = {record.chat_session_id for _, record in rows}
+    session_ids.discard(None)
+
+    known_users = set(
+        (await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars()
+    )
+    known_sessions = set()
+    if session_ids:
+        known_sessions = set(
+            (
+                await db.execute(
+                    select(ChatSession.id).where(ChatSession.id.in_(session_ids))
+                )
+            ).scalars()
+        )
+
+    missing = {}
+    for line, record in rows:
+        if record.patient_id not in known_users:
+            missing[line] = f"patient_id: unknown user {record.patient_id}"
+        elif record.doctor_id and record.doctor_id not in known_users:
+            missing[line] = f"doctor_id: unknown user {record.doctor_id}"
+        elif record.chat_session_id and record.chat_session_id not in known_sessions:
+            missing[line] = f"chat_session_id: unknown session {record.chat_session_id}"
+    return missing
+
+
+def _row_values(record: HealthRecordCreate, creator_id: int) -> dict:
+    return {
+        "patient_id": record.patient_id,
+        "doctor_id": (record.doctor_id if record.doctor_id is not None else creator_id),
+        "chat_session_id": record.chat_session_id,
+        "record_type": record.record_type,
+        "title": record.title,
+        "summary": record.summary,
+        "symptoms": _serialize_list_items(record.symptoms),
+        "diagnosis": _serialize_list_items(record.diagnosis),
+        "treatment_plan": _serialize_list_items(record.treatment_plan),
+        "medication": _serialize_list_items(record.medication),
+        "triage_recommendation": record.triage_recommendation,
+        "confidence_score": record.confidence_score,
+    }
+
+
+async def import_health_records(
+    db: AsyncSession,
+    lines: AsyncIterable[Optional[bytes]],
+    creator_id: int,
+    start_line: int = 0,
+    chunk_size: Optional[int] = None,
+    on_checkpoint: Optional[Callable[[int], None]] = None,
+) -> HealthRecordImportReport:
+    """
+    Import NDJSON health records, one HealthRecordCreate object per line;
+    a None line is one `ndjson_lines` found too long.
+
+    Lines are validated and written in chunks, each with a batched
+    multi-row INSERT in its own transaction, so memory stays bounded by the
+    chunk size. Invalid rows are reported by line number and skipped. The
+    report's checkpoint is the last line whose outcome is committed: lines
+    up to `start_line` are skipped, so re-sending the same input with the
+    checkpoint resumes an interrupted import without duplicates.
+    """
+    chunk_size = chunk_size or settings.HEALTH_RECORD_IMPORT_CHUNK_SIZE
+    report = HealthRecordImportReport(checkpoint=start_line)
+    chunk: List[Tuple[int, HealthRecordCreate]] = []
+    chunk_errors: List[HealthRecordImportError] = []
+
+    async def write_chunk(last_line: int) -> bool:
+        try:
+            missing = await _missing_references(db, chunk) if chunk else {}
+            values = [
+                _row_values(record, creator_id)
+                for line, record in chunk
+                if line not in missing
+            ]
+            if values:
+                await db.execute(insert(HealthRecord), values)
+                await refresh_briefings_for_patients(
+                    db, {row["patient_id"] for row in values}
+                )
+            await db.commit()
+        except Exception as exc:
+            logger.error(
+                f"Health record import stopped after line {report.checkpoint}: {exc}"
+            )
+            await db.rollback()
+            return False
+
+        chunk_errors.extend(
+            HealthRecordImportError(line=line, error=error)
+            for line, error in missing.items()
+        )
+        chunk_errors.sort(key=lambda error: error.line)
+        report.inserted += len(values)
+        report.failed += len(chunk_errors)
+        room = MAX_REPORTED_ERRORS - len(report.errors)
+        report.errors.extend(chunk_errors[: max(room, 0)])
+        report.checkpoint = last_line
+        chunk.clear()
+        chunk_errors.clear()
+        if on_checkpoint:
+            on_checkpoint(last_line)
+        return True
+
+    line_number = 0
+    async for raw in lines:
+        line_number += 1
+        if line_number <= start_line or (raw is not None and not raw.strip()):
+            continue
+        try:
+            if raw is None:
+                raise ValueError("Line is too long")
+            record = HealthRecordCreate.model_validate(json.loads(raw))
+        except (ValueError, ValidationError) as exc:
+            chunk_errors.append(
+                HealthRecordImportError(line=line_number, error=_error_message(exc))
+            )
+        else:
+            chunk.append((line_number, record))
+        if len(chunk) + len(chunk_errors) >= chunk_size:
+            if not await write_chunk(line_number):
+                return report
+
+    if not await write_chunk(max(line_number, start_line)):
+        return report
+    report.completed = True
+    logger.info(
+        f"Imported {report.inserted} health record(s), {report.failed} rejected"
+    )
+    return report
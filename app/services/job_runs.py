@@ -0,0 +1,169 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core import metrics
+from app.core.notifications import DeliveryStats
+from app.db.database import AsyncSessionLocal
+from app.models.scheduler_job_run import JobRunStatus, SchedulerJobRun
+
+logger = logging.getLogger(__name__)
+
+
+class JobRun:
+    """Counters for one job execution, filled in by the job as it works."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.started_at = datetime.now(timezone.utc)
+        self.started_monotonic = time.monotonic()
+        self.rows_scanned = 0
+        self.emails_attempted = 0
+        self.emails_sent = 0
+        self.emails_failed = 0
+        self.error: Optional[str] = None
+
+    def record_delivery(self, stats: DeliveryStats):
+        self.emails_attempted += stats.attempted
+        self.emails_sent += stats.sent
+        self.emails_failed += stats.failed
+
+    def fail(self, exc: BaseException):
+        """Mark the run as failed without propagating the error."""
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def idle(self) -> bool:
+        """Succeeded without finding anything to do."""
+        return (
+            self.error is None and self.rows_scanned == 0 and self.emails_attempted == 0
+        )
+
+    @property
+    def status(self) -> JobRunStatus:
+        return JobRunStatus.failed if self.error else JobRunStatus.succeeded
+
+
+class JobRunRecorder:
+    """
+    Records every scheduler job execution to `scheduler_job_runs` and to the
+    Prometheus scheduler metrics.
+
+    The record is written in its own session after the job finishes, so a job
+    that rolls back (or fails outright) is still recorded. Idle runs of polling
+    jobs only go to the metrics, unless tracked with `record_idle`. Recording
+    problems are logged and never break the job itself.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    @asynccontextmanager
+    async def track(self, job_id: str, record_idle: bool = False):
+        run = JobRun(job_id)
+        try:
+            yield run
+        except BaseException as exc:
+            run.fail(exc)
+            raise
+        finally:
+            await self._finish(run, record_idle)
+
+    async def _finish(self, run: JobRun, record_idle: bool = False):
+        duration = time.monotonic() - run.started_monotonic
+        status = run.status
+
+        metrics.SCHEDULER_JOB_RUNS.labels(run.job_id, status.value).inc()
+        metrics.SCHEDULER_JOB_DURATION.labels(run.job_id).observe(duration)
+        metrics.SCHEDULER_JOB_ROWS_SCANNED.labels(run.job_id).inc(run.rows_scanned)
+        metrics.SCHEDULER_JOB_EMAILS.labels(run.job_id, "sent").inc(run.emails_sent)
+        metrics.SCHEDULER_JOB_EMAILS.labels(run.job_id, "failed").inc(run.emails_failed)
+        if status == JobRunStatus.succeeded:
+            metrics.SCHEDULER_JOB_LAST_SUCCESS.labels(run.job_id).set_to_current_time()
+        if run.idle and not record_idle:
+            return
+
+        try:
+            async with self.session_factory() as db:
+                db.add(
+                    SchedulerJobRun(
+                        job_id=run.job_id,
+                        status=status,
+                        started_at=run.started_at,
+                        finished_at=datetime.now(timezone.utc),
+                        duration_seconds=duration,
+                        rows_scanned=run.rows_scanned,
+                        emails_attempted=run.emails_attempted,
+                        emails_sent=run.emails_sent,
+                        emails_failed=run.emails_failed,
+                        error=run.error,
+                    )
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.error(f"Could not record run of job {run.job_id}: {exc}")
+
+
+async def list_job_runs(
+    db: AsyncSession,
+    job_id: Optional[str] = None,
+    status: Optional[JobRunStatus] = None,
+    limit: int = 50,
+) -> List[SchedulerJobRun]:
+    """Most recent job runs first, optionally filtered by job and status."""
+    query = select(SchedulerJobRun)
+    if job_id:
+        query = query.where(SchedulerJobRun.job_id == job_id)
+    if status:
+        query = query.where(SchedulerJobRun.status == status)
+    query = query.order_by(SchedulerJobRun.started_at.desc()).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def summarize_job_runs(db: AsyncSession, since: datetime) -> List[dict]:
+    """Per-job run counts, duration percentiles and email totals since `since`."""
+    duration = SchedulerJobRun.duration_seconds
+    query = (
+        select(
+            SchedulerJobRun.job_id,
+            func.count().label("runs"),
+            func.count()
+            .filter(SchedulerJobRun.status == JobRunStatus.failed)
+            .label("failures"),
+            func.percentile_cont(0.5).within_group(duration).label("p50_seconds"),
+            func.percentile_cont(0.95).within_group(duration).label("p95_seconds"),
+            func.max(duration).label("max_seconds"),
+            func.coalesce(func.sum(SchedulerJobRun.rows_scanned), 0).label(
+                "rows_scanned"
+            ),
+            func.coalesce(func.sum(SchedulerJobRun.emails_sent), 0).label(
+                "emails_sent"
+            ),
+            func.coalesce(func.sum(SchedulerJobRun.emails_failed), 0).label(
+                "emails_failed"
+            ),
+            func.max(SchedulerJobRun.started_at).label("last_started_at"),
+        )
+        .where(SchedulerJobRun.started_at >= since)
+        .group_by(SchedulerJobRun.job_id)
+        .order_by(SchedulerJobRun.job_id)
+    )
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
+
+async def prune_job_runs(db: AsyncSession, retention: timedelta) -> int:
+    """Delete run records older than `retention`. Returns the number removed."""
+    cutoff = datetime.now(timezone.utc) - retention
+    result = await db.execute(
+        delete(SchedulerJobRun).where(SchedulerJobRun.started_at < cutoff)
+    )
+    await db.commit()
+    return result.rowcount
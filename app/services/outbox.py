@@ -0,0 +1,184 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.email_service import EmailService
+from app.core.notifications import OutgoingEmail
+from app.db.database import get_db_session
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.services.job_runs import JobRun
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(db: AsyncSession, to: str, subject: str, body: str) -> EmailOutbox:
+    """
+    Stage an email in the outbox as part of the caller's transaction.
+    It is only delivered if that transaction commits.
+    """
+    message = EmailOutbox(recipient=to, subject=subject, body=body)
+    db.add(message)
+    return message
+
+
+async def enqueue_emails(db: AsyncSession, emails: Iterable[OutgoingEmail]) -> int:
+    """
+    Stage many emails with a single multi-row insert in the caller's
+    transaction. Returns the number of emails queued.
+    """
+    rows = [
+        {"recipient": email.to, "subject": email.subject, "body": email.body}
+        for email in emails
+    ]
+    if rows:
+        await db.execute(insert(EmailOutbox), rows)
+    return len(rows)
+
+
+class OutboxDispatcher:
+    """Delivers outbox rows in batches, retrying failures with exponential backoff."""
+
+    def __init__(
+        self,
+        email_service: Optional[EmailService] = None,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        base_backoff: timedelta = timedelta(seconds=30),
+        max_backoff: timedelta = timedelta(hours=1),
+        claim_timeout: timedelta = timedelta(minutes=10),
+    ):
+        self.email_service = email_service or EmailService()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # Messages not sent within this time of their claim are handed back.
+        self.claim_timeout = claim_timeout
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return min(self.base_backoff * (2 ** (attempts - 1)), self.max_backoff)
+
+    async def _claim_due(self, db: AsyncSession, now: datetime) -> List[Row]:
+        """
+        Claim up to `batch_size` due rows by counting the attempt and pushing
+        `next_attempt_at` past `claim_timeout`, and commit the claim so no row
+        lock is held while emails go out. A row whose dispatcher dies
+        mid-send becomes due again once the claim expires.
+        """
+        outbox = EmailOutbox.__table__
+        due = (
+            select(outbox.c.id)
+            .where(
+                outbox.c.status == OutboxStatus.pending,
+                outbox.c.next_attempt_at <= now,
+            )
+            .order_by(outbox.c.next_attempt_at, outbox.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(outbox)
+            .where(outbox.c.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=outbox.c.attempts + 1,
+                next_attempt_at=now + self.claim_timeout,
+            )
+            .returning(
+                outbox.c.id,
+                outbox.c.recipient,
+                outbox.c.subject,
+                outbox.c.body,
+                outbox.c.attempts,
+            )
+        )
+        rows = sorted(result.all(), key=lambda row: row.id)
+        await db.commit()
+        return rows
+
+    async def dispatch_batch(
+        self, db: AsyncSession, run: Optional[JobRun] = None
+    ) -> int:
+        """
+        Claim up to `batch_size` due rows and send them. Rows are claimed with
+        SKIP LOCKED in a transaction of their own, so several dispatchers never
+        pick up the same message, and each outcome is committed as soon as
+        the message has been sent, so a crash cannot undo delivered marks.
+        Returns the number of rows processed; `run`, if given, is updated with
+        the rows scanned and delivery outcomes.
+        """
+        now = datetime.now(timezone.utc)
+        messages = await self._claim_due(db, now)
+        if run is not None:
+            run.rows_scanned += len(messages)
+
+        outbox = EmailOutbox.__table__
+        claim_expires = now + self.claim_timeout
+        for index, message in enumerate(messages):
+            if datetime.now(timezone.utc) >= claim_expires:
+                # Another dispatcher may pick these up now; hand them back.
+                unsent = [row.id for row in messages[index:]]
+                await db.execute(
+                    update(outbox)
+                    .where(outbox.c.id.in_(unsent))
+                    .values(attempts=outbox.c.attempts - 1, next_attempt_at=now)
+                )
+                await db.commit()
+                logger.warning(
+                    f"Outbox claim expired, released {len(unsent)} unsent message(s)."
+                )
+                break
+            try:
+                sent = await self.email_service.send_email(
+                    message.recipient, message.subject, message.body
+                )
+                error = None if sent else "SMTP delivery failed"
+            except Exception as exc:
+                sent, error = False, str(exc)
+            if run is not None:
+                run.emails_attempted += 1
+                if sent:
+                    run.emails_sent += 1
+                else:
+                    run.emails_failed += 1
+
+            if sent:
+                values = dict(
+                    status=OutboxStatus.sent,
+                    sent_at=datetime.now(timezone.utc),
+                    last_error=None,
+                )
+            elif message.attempts >= self.max_attempts:
+                values = dict(status=OutboxStatus.failed, last_error=error)
+                logger.error(
+                    f"Giving up on outbox message {message.id} after {message.attempts} attempts: {error}"
+                )
+            else:
+                retry_at = datetime.now(timezone.utc) + self._backoff(message.attempts)
+                values = dict(last_error=error, next_attempt_at=retry_at)
+                logger.warning(
+                    f"Outbox message {message.id} failed (attempt {message.attempts}), retrying at {retry_at}"
+                )
+            await db.execute(
+                update(outbox).where(outbox.c.id == message.id).values(**values)
+            )
+            await db.commit()
+
+        if messages:
+            logger.info(f"Outbox dispatcher processed {len(messages)} message(s).")
+        return len(messages)
+
+    async def dispatch_pending(self, run: Optional[JobRun] = None):
+        """Scheduler entry point: drain due messages batch by batch."""
+        async for db in get_db_session():
+            try:
+                while await self.dispatch_batch(db, run) == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Error during outbox dispatch: {e}")
+                logger.exception(e)
+                await db.rollback()
+                if run is not None:
+                    run.fail(e)
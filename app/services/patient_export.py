@@ -0,0 +1,365 @@
+import html
+import json
+import logging
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Table, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.chat_session import ChatSession
+from app.models.health_record import HealthRecord
+from app.models.user import Gender, User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursors.
+EXPORT_BATCH_SIZE = 500
+EXTENSION_URL = "urn:healthsync:fhir:extension"
+
+FHIR_GENDER = {
+    Gender.male: "male",
+    Gender.female: "female",
+    Gender.other: "other",
+    Gender.prefer_not_to_say: "unknown",
+}
+FHIR_APPOINTMENT_STATUS = {
+    AppointmentStatus.scheduled: "booked",
+    AppointmentStatus.completed: "fulfilled",
+    AppointmentStatus.cancelled: "cancelled",
+}
+
+
+def _compact(resource: dict) -> dict:
+    return {key: value for key, value in resource.items() if value not in (None, [])}
+
+
+def _instant(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment else None
+
+
+def _reference(resource_type: str, resource_id: Optional[int]) -> Optional[dict]:
+    if resource_id is None:
+        return None
+    return {"reference": f"{resource_type}/{resource_id}"}
+
+
+def _patient_resource(row) -> dict:
+    name = _compact(
+        {"family": row.last_name, "given": [row.first_name] if row.first_name else []}
+    )
+    extensions = [
+        {"url": f"{EXTENSION_URL}:{field}", value_key: getattr(row, field)}
+        for field, value_key in (
+            ("height_cm", "valueDecimal"),
+            ("weight_kg", "valueDecimal"),
+            ("blood_type", "valueString"),
+            ("allergies", "valueString"),
+            ("existing_conditions", "valueString"),
+        )
+        if getattr(row, field) is not None
+    ]
+    return _compact(
+        {
+            "resourceType": "Patient",
+            "id": str(row.id),
+            "name": [name] if name else [],
+            "telecom": [{"system": "email", "value": row.email}],
+            "gender": FHIR_GENDER.get(row.gender),
+            "birthDate": row.date_of_birth.isoformat() if row.date_of_birth else None,
+            "extension": extensions,
+        }
+    )
+
+
+def _communication_resource(row) -> dict:
+    payload = [
+        {"contentString": text}
+        for text in (row.input_text, row.voice_transcription, row.model_response)
+        if text
+    ]
+    return _compact(
+        {
+            "resourceType": "Communication",
+            "id": str(row.id),
+            "status": "completed",
+            "subject": _reference("Patient", row.patient_id),
+            "identifier": [
+                {"system": f"{EXTENSION_URL}:chat-room", "value": str(row.chat_room_id)}
+            ],
+            "sent": _instant(row.created_at),
+            "payload": payload,
+            "note": [{"text": row.triage_advice}] if row.triage_advice else [],
+        }
+    )
+
+
+def _appointment_resource(row) -> dict:
+    return _compact(
+        {
+            "resourceType": "Appointment",
+            "id": str(row.id),
+            "status": FHIR_APPOINTMENT_STATUS.get(row.status),
+            "start": _instant(row.start_time),
+            "end": _instant(row.end_time),
+            "created": _instant(row.created_at),
+            "participant": [
+                {"actor": _reference("Patient", row.patient_id), "status": "accepted"},
+                {
+                    "actor": _reference("Practitioner", row.doctor_id),
+                    "status": "accepted",
+                },
+            ],
+            "virtualService": (
+                [{"addressUrl": row.telemedicine_url}] if row.telemedicine_url else []
+            ),
+        }
+    )
+
+
+def _composition_resource(row) -> dict:
+    """
+    A health record as a Composition. The summary is the narrative; the
+    symptom, diagnosis, treatment and medication lists are kept verbatim as
+    the `items` of their sections.
+    """
+    sections = []
+    if row.summary:
+        sections.append(
+            {
+                "title": "Summary",
+                "text": {
+                    "status": "generated",
+                    "div": '<div xmlns="http://www.w3.org/1999/xhtml">'
+                    f"{html.escape(row.summary)}</div>",
+                },
+            }
+        )
+    for title, items in (
+        ("Symptoms", row.symptoms),
+        ("Diagnosis", row.diagnosis),
+        ("Treatment plan", row.treatment_plan),
+        ("Medication", row.medication),
+    ):
+        if items:
+            sections.append({"title": title, "items": items})
+    if row.triage_recommendation:
+        sections.append(
+            {
+                "title": "Triage",
+                "items": [
+                    _compact(
+                        {
+                            "recommendation": row.triage_recommendation,
+                            "confidence_score": row.confidence_score,
+                        }
+                    )
+                ],
+            }
+        )
+    return _compact(
+        {
+            "resourceType": "Composition",
+            "id": str(row.id),
+            "status": "final",
+            "type": {"text": row.record_type.value},
+            "subject": _reference("Patient", row.patient_id),
+            "date": _instant(row.updated_at or row.created_at),
+            "author": [_reference("Practitioner", row.doctor_id)],
+            "title": row.title,
+            "relatesTo": (
+                [
+                    {
+                        "type": "derived-from",
+                        "resourceReference": _reference(
+                            "Communication", row.chat_session_id
+                        ),
+                    }
+                ]
+                if row.chat_session_id
+                else []
+            ),
+            "section": sections,
+        }
+    )
+
+
+class ExportSection(NamedTuple):
+    resource_type: str
+    table: Table
+    time_column: str
+    to_resource: Callable[..., dict]
+
+
+# Exported in this order, each oldest first by (time, id).
+EXPORT_SECTIONS = (
+    ExportSection(
+        "Communication", ChatSession.__table__, "created_at", _communication_resource
+    ),
+    ExportSection(
+        "Appointment", Appointment.__table__, "start_time", _appointment_resource
+    ),
+    ExportSection(
+        "Composition", HealthRecord.__table__, "created_at", _composition_resource
+    ),
+)
+SECTION_INDEX = {
+    section.resource_type: index for index, section in enumerate(EXPORT_SECTIONS)
+}
+
+
+class ExportPosition(NamedTuple):
+    """
+    The last exported resource: its section, sort time and id. Without a
+    time and id, the export continues at the start of the section.
+    """
+
+    section: int
+    time: Optional[datetime] = None
+    id: Optional[int] = None
+
+
+async def get_export_patient(db: AsyncSession, patient_id: int):
+    row = (
+        await db.execute(
+            select(*User.__table__.c).where(
+                User.id == patient_id, User.role == UserRole.patient
+            )
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+        )
+    return row
+
+
+async def resolve_resume_point(
+    db: AsyncSession, patient_id: int, resume_after: Optional[str]
+) -> Optional[ExportPosition]:
+    """
+    Where to continue an export given the reference of the last resource
+    received, e.g. "Appointment/42"; None to start from scratch. Raises 400
+    for references that are not part of this patient's export.
+    """
+    if not resume_after:
+        return None
+    resource_type, _, resource_id = resume_after.partition("/")
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Invalid resume_after '{resume_after}'",
+    )
+    if not resource_id.isdigit():
+        raise invalid
+    if resource_type == "Patient" and int(resource_id) == patient_id:
+        return ExportPosition(0)
+    if resource_type not in SECTION_INDEX:
+        raise invalid
+
+    section_index = SECTION_INDEX[resource_type]
+    table = EXPORT_SECTIONS[section_index].table
+    time_column = EXPORT_SECTIONS[section_index].time_column
+    moment = await db.scalar(
+        select(table.c[time_column]).where(
+            table.c.id == int(resource_id), table.c.patient_id == patient_id
+        )
+    )
+    if moment is None:
+        raise invalid
+    return ExportPosition(section_index, moment, int(resource_id))
+
+
+async def export_patient_resources(
+    db: AsyncSession,
+    patient,
+    resume: Optional[ExportPosition] = None,
+) -> AsyncIterator[Tuple[str, List[dict]]]:
+    """
+    Yield (resource type, batch of resources) for everything stored about a
+    patient: the Patient itself, then chat messages, appointments and health
+    records. Each section is read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE, so memory does not grow with the patient's history.
+    """
+    if resume is None:
+        yield "Patient", [_patient_resource(patient)]
+
+    for index, section in enumerate(EXPORT_SECTIONS):
+        if resume is not None and index < resume.section:
+            continue
+        table = section.table
+        sort_time = table.c[section.time_column]
+        query = select(*table.c).where(table.c.patient_id == patient.id)
+        if resume is not None and index == resume.section and resume.id:
+            query = query.where(
+                tuple_(sort_time, table.c.id) > (resume.time, resume.id)
+            )
+        query = query.order_by(sort_time, table.c.id).execution_options(
+            yield_per=EXPORT_BATCH_SIZE
+        )
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield section.resource_type, [section.to_resource(row) for row in rows]
+
+
+def _ndjson(resources: List[dict]) -> str:
+    return "".join(
+        json.dumps(resource, separators=(",", ":")) + "\n" for resource in resources
+    )
+
+
+async def render_ndjson_export(
+    batches: AsyncIterator[Tuple[str, List[dict]]],
+) -> AsyncIterator[str]:
+    async for _, resources in batches:
+        yield _ndjson(resources)
+
+
+class _DrainedBuffer:
+    """Write-only, unseekable file for zipfile that is emptied after each write."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def render_zip_export(
+    batches: AsyncIterator[Tuple[str, List[dict]]],
+) -> AsyncIterator[bytes]:
+    """
+    Stream the export as a zip with one <ResourceType>.ndjson member per
+    section, as in FHIR bulk data exports. Members are written with data
+    descriptors, so nothing has to be seeked back to or held in memory.
+    """
+    buffer = _DrainedBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        member, member_type = None, None
+        async for resource_type, resources in batches:
+            if resource_type != member_type:
+                if member is not None:
+                    member.close()
+                member = archive.open(f"{resource_type}.ndjson", "w", force_zip64=True)
+                member_type = resource_type
+            member.write(_ndjson(resources).encode())
+            yield buffer.drain()
+        if member is not None:
+            member.close()
+    yield buffer.drain()
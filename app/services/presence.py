@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import false, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.user import User, UserRole
+from app.services.doctor import mark_directory_changed
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceBackend:
+    """Stores when each doctor's presence expires. Operations must be atomic."""
+
+    # Whether every worker sees the same entries, so one sweeper covers all.
+    shared = False
+
+    async def touch(self, doctor_id: int, ttl_seconds: float) -> bool:
+        """Extend the doctor's presence; True if they were offline before."""
+        raise NotImplementedError
+
+    async def remove(self, doctor_id: int) -> bool:
+        """Drop the doctor's presence; True if they were online."""
+        raise NotImplementedError
+
+    async def expire(self) -> List[int]:
+        """Drop expired entries and return their doctor ids."""
+        raise NotImplementedError
+
+    async def online(self) -> Set[int]:
+        raise NotImplementedError
+
+
+class InMemoryPresenceBackend(PresenceBackend):
+    """Per-process registry. No method awaits, so each is atomic on the event loop."""
+
+    def __init__(self):
+        self._expires: Dict[int, float] = {}
+
+    def _is_online(self, doctor_id: int, now: float) -> bool:
+        return self._expires.get(doctor_id, 0) > now
+
+    async def touch(self, doctor_id: int, ttl_seconds: float) -> bool:
+        now = time.monotonic()
+        was_online = self._is_online(doctor_id, now)
+        self._expires[doctor_id] = now + ttl_seconds
+        return not was_online
+
+    async def remove(self, doctor_id: int) -> bool:
+        was_online = self._is_online(doctor_id, time.monotonic())
+        self._expires.pop(doctor_id, None)
+        return was_online
+
+    async def expire(self) -> List[int]:
+        now = time.monotonic()
+        expired = [d for d, expires in self._expires.items() if expires <= now]
+        for doctor_id in expired:
+            del self._expires[doctor_id]
+        return expired
+
+    async def online(self) -> Set[int]:
+        now = time.monotonic()
+        return {d for d, expires in self._expires.items() if expires > now}
+
+    def reset(self):
+        self._expires.clear()
+
+
+class RedisPresenceBackend(PresenceBackend):
+    """Registry shared by every worker: a sorted set of doctor ids by expiry."""
+
+    shared = True
+
+    _TOUCH = """
+    local previous = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+    if previous and previous > tonumber(ARGV[2]) then return 0 end
+    return 1
+    """
+    _REMOVE = """
+    local previous = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    if previous and previous > tonumber(ARGV[2]) then return 1 end
+    return 0
+    """
+    _EXPIRE = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    if #expired > 0 then
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    end
+    return expired
+    """
+
+    def __init__(self, url: str, key: str = "healthsync:presence"):
+        # Imported lazily so the in-memory default needs no extra dependency.
+        from redis import asyncio as redis_asyncio
+
+        self.key = key
+        self._client = redis_asyncio.from_url(url)
+        self._touch = self._client.register_script(self._TOUCH)
+        self._remove = self._client.register_script(self._REMOVE)
+        self._expire = self._client.register_script(self._EXPIRE)
+
+    async def touch(self, doctor_id: int, ttl_seconds: float) -> bool:
+        now = time.time()
+        came_online = await self._touch(
+            keys=[self.key], args=[doctor_id, now, now + ttl_seconds]
+        )
+        return bool(came_online)
+
+    async def remove(self, doctor_id: int) -> bool:
+        return bool(await self._remove(keys=[self.key], args=[doctor_id, time.time()]))
+
+    async def expire(self) -> List[int]:
+        expired = await self._expire(keys=[self.key], args=[time.time()])
+        return [int(doctor_id) for doctor_id in expired]
+
+    async def online(self) -> Set[int]:
+        members = await self._client.zrangebyscore(self.key, f"({time.time()}", "+inf")
+        return {int(doctor_id) for doctor_id in members}
+
+
+def build_presence_backend(redis_url: Optional[str] = None) -> PresenceBackend:
+    """Use Redis when configured so every worker sees the same doctors online."""
+    if redis_url:
+        logger.info("Using Redis presence backend.")
+        return RedisPresenceBackend(redis_url)
+    return InMemoryPresenceBackend()
+
+
+async def _persist_availability(
+    db: AsyncSession, doctor_ids: Iterable[int], online_ids: Set[int]
+) -> int:
+    """
+    Store `is_available` for `doctor_ids` (online if in `online_ids`) and
+    commit. Rows already holding the right value are not written.
+    """
+    doctor_ids = list(doctor_ids)
+    if not doctor_ids:
+        return 0
+    available = User.id.in_(online_ids) if online_ids else false()
+    result = await db.execute(
+        update(User)
+        .where(
+            User.id.in_(doctor_ids),
+            User.role == UserRole.doctor,
+            User.is_available.is_distinct_from(available),
+        )
+        .values(is_available=available)
+        .returning(User.is_available)
+        .execution_options(synchronize_session=False)
+    )
+    changed = result.scalars().all()
+    if changed:
+        mark_directory_changed(db)
+        went_online = sum(changed)
+        metrics.PRESENCE_TRANSITIONS.labels(state="online").inc(went_online)
+        metrics.PRESENCE_TRANSITIONS.labels(state="offline").inc(
+            len(changed) - went_online
+        )
+    await db.commit()
+    return len(changed)
+
+
+class PresenceRegistry:
+    """
+    Tracks which doctors have a client open from their heartbeats. Heartbeats
+    only refresh an expiry in the backend; `users.is_available`, which the
+    doctor directory and slot search filter on, is written only when a
+    doctor comes online, signs off or times out. Doctors whose clients never
+    send heartbeats keep their stored availability.
+    """
+
+    def __init__(
+        self,
+        backend: PresenceBackend,
+        ttl_seconds: float,
+        session_factory: sessionmaker = AsyncSessionLocal,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def heartbeat(self, db: AsyncSession, doctor_id: int):
+        metrics.PRESENCE_HEARTBEATS.inc()
+        if await self.backend.touch(doctor_id, self.ttl_seconds):
+            await _persist_availability(db, [doctor_id], {doctor_id})
+
+    async def sign_off(self, db: AsyncSession, doctor_id: int):
+        if await self.backend.remove(doctor_id):
+            await _persist_availability(db, [doctor_id], set())
+
+    async def sweep(self, db: AsyncSession) -> int:
+        """
+        Mark doctors whose heartbeats stopped as unavailable. Online doctors
+        are reconciled too, which repairs a transition lost to a heartbeat
+        racing the sweep. Returns the number of rows changed.
+        """
+        expired = await self.backend.expire()
+        online = await self.backend.online()
+        changed = await _persist_availability(db, set(expired) | online, online)
+        if changed:
+            logger.info(
+                f"Presence sweep changed the availability of {changed} doctor(s)"
+            )
+        return changed
+
+    async def _sweep_locally(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with self.session_factory() as db:
+                    await self.sweep(db)
+            except Exception as exc:
+                logger.error(f"Error sweeping this worker's doctor presence: {exc}")
+
+    def start_local_sweeper(self, interval_seconds: float, workers: int = 1):
+        """
+        A per-process backend only holds the heartbeats that reached this
+        worker, so the single worker expires its own entries. A shared
+        backend is swept by the scheduler leader instead. With several
+        workers a per-process backend is refused: a worker would mark a
+        doctor offline while their heartbeats reach another one.
+        """
+        if self.backend.shared or self._sweeper is not None:
+            return
+        if workers > 1:
+            raise RuntimeError(
+                f"Doctor presence needs REDIS_URL with {workers} workers; "
+                "per-process heartbeats would flip availability between them."
+            )
+        self._sweeper = asyncio.create_task(self._sweep_locally(interval_seconds))
+
+    async def stop_local_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+
+presence_registry = PresenceRegistry(
+    build_presence_backend(settings.REDIS_URL), settings.PRESENCE_TTL_SECONDS
+)
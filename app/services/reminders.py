@@ -0,0 +1,290 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Row, bindparam, case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.notifications import DeliveryStats, EmailFanout, OutgoingEmail
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.appointment_reminder import AppointmentReminder, ReminderKind
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+REMINDER_OFFSETS = {
+    ReminderKind.day_before: timedelta(hours=24),
+    ReminderKind.hour_before: timedelta(hours=1),
+}
+
+REMINDER_WHEN = {
+    ReminderKind.day_before: "tomorrow",
+    ReminderKind.hour_before: "in about an hour",
+}
+
+
+def create_appointment_reminders(
+    db: AsyncSession, appointment: Appointment
+) -> List[AppointmentReminder]:
+    """
+    Queue the reminders for a newly booked appointment in the caller's
+    transaction. Reminders whose due time has already passed are skipped.
+    """
+    now = datetime.now(timezone.utc)
+    reminders = [
+        AppointmentReminder(
+            appointment_id=appointment.id,
+            kind=kind,
+            due_at=appointment.start_time - offset,
+        )
+        for kind, offset in REMINDER_OFFSETS.items()
+        if appointment.start_time - offset > now
+    ]
+    db.add_all(reminders)
+    return reminders
+
+
+async def cancel_appointment_reminders(db: AsyncSession, appointment_ids: List[int]):
+    """Drop the unsent reminders of appointments that are no longer scheduled."""
+    await db.execute(
+        delete(AppointmentReminder).where(
+            AppointmentReminder.appointment_id.in_(appointment_ids),
+            AppointmentReminder.sent_at.is_(None),
+        )
+    )
+
+
+async def reschedule_appointment_reminders(
+    db: AsyncSession, appointments: List[Tuple[int, datetime]]
+):
+    """
+    Replace the reminders of moved appointments, given as (id, new start)
+    pairs. Reminders already sent for the old time are replaced as well, so
+    patients are reminded again about the new one.
+    """
+    if not appointments:
+        return
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        delete(AppointmentReminder).where(
+            AppointmentReminder.appointment_id.in_(
+                [appointment_id for appointment_id, _ in appointments]
+            )
+        )
+    )
+    rows = [
+        {"appointment_id": appointment_id, "kind": kind, "due_at": start - offset}
+        for appointment_id, start in appointments
+        for kind, offset in REMINDER_OFFSETS.items()
+        if start - offset > now
+    ]
+    if rows:
+        await db.execute(insert(AppointmentReminder), rows)
+
+
+def render_appointment_reminders(
+    appointment: Row, when: str = "today", key: Optional[int] = None
+) -> List[OutgoingEmail]:
+    """
+    Renders the patient reminder and the doctor notification for one
+    appointment row carrying patient_* and doctor_* contact fields. With a
+    `key`, messages are keyed (key, "patient") and (key, "doctor").
+    """
+    patient_name = appointment.patient_first_name or appointment.patient_username
+    doctor_name = appointment.doctor_first_name or appointment.doctor_username
+
+    patient_body = f"""
+    Dear {patient_name},
+
+    This is a reminder about your upcoming appointment with Dr. {doctor_name} {when}.
+
+    Appointment Details:
+    - Doctor: Dr. {doctor_name}
+    - Time: {appointment.start_time.strftime("%Y-%m-%d %H:%M %Z")}
+    - Telemedicine Link (if available): {appointment.telemedicine_url or 'N/A'}
+
+    Please be ready for your appointment. If you need to reschedule or cancel, please do so as soon as possible.
+
+    Best regards,
+    HealthSync AI Team
+    """
+
+    doctor_body = f"""
+    Dear Dr. {appointment.doctor_last_name or appointment.doctor_username},
+
+    This is a notification for your appointment with patient {patient_name} {when}.
+
+    Appointment Details:
+    - Patient: {patient_name}
+    - Time: {appointment.start_time.strftime("%Y-%m-%d %H:%M %Z")}
+    - Telemedicine Link (if available): {appointment.telemedicine_url or 'N/A'}
+
+    Please be prepared for your appointment.
+
+    Best regards,
+    HealthSync AI Team
+    """
+
+    return [
+        OutgoingEmail(
+            appointment.patient_email,
+            "Appointment Reminder",
+            patient_body,
+            None if key is None else (key, "patient"),
+        ),
+        OutgoingEmail(
+            appointment.doctor_email,
+            "Appointment Notification",
+            doctor_body,
+            None if key is None else (key, "doctor"),
+        ),
+    ]
+
+
+class ReminderDispatcher:
+    """
+    Sends due reminders from the `appointment_reminders` queue.
+
+    Reminders are claimed by stamping `sent_at` in the same statement that
+    selects them (FOR UPDATE SKIP LOCKED), and the claim is committed before any
+    email goes out. A reminder is therefore never sent twice, even with
+    concurrent pollers or a crash mid-batch. If any of its emails fails, the
+    reminder is released for retry with a backoff, remembering who already
+    got it so only the others are emailed again. After `max_attempts` it is
+    marked failed and leaves the queue.
+    """
+
+    def __init__(
+        self,
+        fanout: EmailFanout,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retry_backoff: timedelta = timedelta(minutes=2),
+    ):
+        self.fanout = fanout
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    async def _claim_due(self, db: AsyncSession, now: datetime) -> List[Row]:
+        reminders = AppointmentReminder.__table__
+        due = (
+            select(reminders.c.id)
+            .join(Appointment, Appointment.id == reminders.c.appointment_id)
+            .where(
+                reminders.c.sent_at.is_(None),
+                reminders.c.failed_at.is_(None),
+                reminders.c.due_at <= now,
+                reminders.c.attempts < self.max_attempts,
+                Appointment.status == AppointmentStatus.scheduled,
+            )
+            .order_by(reminders.c.due_at)
+            .limit(self.batch_size)
+            .with_for_update(of=reminders, skip_locked=True)
+        )
+        claimed = (
+            update(reminders)
+            .where(reminders.c.id.in_(due.scalar_subquery()))
+            .where(reminders.c.sent_at.is_(None))
+            .values(sent_at=now, attempts=reminders.c.attempts + 1)
+            .returning(
+                reminders.c.id,
+                reminders.c.appointment_id,
+                reminders.c.kind,
+                reminders.c.attempts,
+                reminders.c.delivered_to,
+            )
+            .cte("claimed")
+        )
+
+        patient = aliased(User, name="patient")
+        doctor = aliased(User, name="doctor")
+        query = (
+            select(
+                claimed.c.id.label("reminder_id"),
+                claimed.c.kind,
+                claimed.c.attempts,
+                claimed.c.delivered_to,
+                Appointment.id,
+                Appointment.start_time,
+                Appointment.telemedicine_url,
+                patient.email.label("patient_email"),
+                patient.username.label("patient_username"),
+                patient.first_name.label("patient_first_name"),
+                doctor.email.label("doctor_email"),
+                doctor.username.label("doctor_username"),
+                doctor.first_name.label("doctor_first_name"),
+                doctor.last_name.label("doctor_last_name"),
+            )
+            .join(Appointment, Appointment.id == claimed.c.appointment_id)
+            .join(patient, patient.id == Appointment.patient_id)
+            .join(doctor, doctor.id == Appointment.doctor_id)
+        )
+        result = await db.execute(query)
+        rows = result.all()
+        await db.commit()
+        return rows
+
+    async def dispatch_due(self, db: AsyncSession) -> Tuple[int, DeliveryStats]:
+        """
+        Claim one batch of due reminders and deliver them.
+        Returns the number of reminders claimed and the delivery stats.
+        """
+        now = datetime.now(timezone.utc)
+        rows = await self._claim_due(db, now)
+
+        messages = [
+            message
+            for row in rows
+            for message in render_appointment_reminders(
+                row, REMINDER_WHEN[row.kind], key=row.reminder_id
+            )
+            if message.key[1] not in row.delivered_to
+        ]
+        stats = await self.fanout.deliver(messages)
+
+        failed = {reminder_id for reminder_id, _ in stats.failed_keys}
+        if failed:
+            delivered = {
+                row.reminder_id: set(row.delivered_to)
+                for row in rows
+                if row.reminder_id in failed
+            }
+            for reminder_id, recipient in stats.sent_keys:
+                if reminder_id in failed:
+                    delivered[reminder_id].add(recipient)
+
+            reminders = AppointmentReminder.__table__
+            await db.execute(
+                update(reminders)
+                .where(reminders.c.id == bindparam("b_id"))
+                .values(
+                    sent_at=None,
+                    failed_at=case(
+                        (reminders.c.attempts >= self.max_attempts, func.now())
+                    ),
+                    due_at=func.now() + self.retry_backoff * reminders.c.attempts,
+                    last_error="SMTP delivery failed",
+                    delivered_to=bindparam("b_delivered"),
+                ),
+                [
+                    {"b_id": reminder_id, "b_delivered": sorted(recipients)}
+                    for reminder_id, recipients in delivered.items()
+                ],
+            )
+            await db.commit()
+            exhausted = [
+                row.reminder_id
+                for row in rows
+                if row.reminder_id in failed and row.attempts >= self.max_attempts
+            ]
+            if exhausted:
+                logger.error(
+                    f"Giving up on reminder(s) {exhausted} after {self.max_attempts} attempts."
+                )
+            logger.warning(
+                f"Released {len(failed) - len(exhausted)} reminder(s) for retry after delivery failures."
+            )
+
+        return len(rows), stats
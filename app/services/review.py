@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import encode_cursor
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.doctor_profile import DoctorProfile
+from app.models.doctor_review import DoctorReview
+from app.services.doctor import mark_directory_changed
+
+logger = logging.getLogger(__name__)
+
+RATING_VALUES = range(1, 6)
+
+
+async def get_reviewable_appointment(
+    db: AsyncSession, appointment_id: int, patient_id: int
+) -> Optional[Appointment]:
+    """The patient's appointment with this id, if it exists and is completed."""
+    result = await db.execute(
+        select(Appointment).where(
+            Appointment.id == appointment_id,
+            Appointment.patient_id == patient_id,
+            Appointment.status == AppointmentStatus.completed,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def add_review(
+    db: AsyncSession, appointment: Appointment, rating: int, comment: Optional[str]
+) -> DoctorReview:
+    """
+    Insert a review and fold it into the doctor's aggregates, in the caller's
+    transaction. The aggregates are bumped with a single UPDATE, so directory
+    reads never need to scan the reviews. A second review of the same
+    appointment raises IntegrityError on flush.
+    """
+    review = DoctorReview(
+        appointment_id=appointment.id,
+        doctor_id=appointment.doctor_id,
+        patient_id=appointment.patient_id,
+        rating=rating,
+        comment=comment,
+    )
+    db.add(review)
+    await db.flush()
+
+    result = await db.execute(
+        update(DoctorProfile)
+        .where(DoctorProfile.doctor_id == appointment.doctor_id)
+        .values(
+            {
+                DoctorProfile.rating_count: DoctorProfile.rating_count + 1,
+                DoctorProfile.rating_sum: DoctorProfile.rating_sum + rating,
+                DoctorProfile.rating_histogram[rating]: (
+                    DoctorProfile.rating_histogram[rating] + 1
+                ),
+                DoctorProfile.rating: cast(DoctorProfile.rating_sum + rating, Float)
+                / (DoctorProfile.rating_count + 1),
+            }
+        )
+    )
+    if not result.rowcount:
+        logger.warning(
+            f"Doctor {appointment.doctor_id} has no profile; review {review.id} "
+            "is not counted until the rating aggregates are rebuilt."
+        )
+    mark_directory_changed(db)
+    return review
+
+
+async def list_doctor_reviews(
+    db: AsyncSession,
+    doctor_id: int,
+    limit: int = 20,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> Tuple[List[DoctorReview], Optional[str]]:
+    """One page of a doctor's reviews, newest first, and the next page cursor."""
+    query = select(DoctorReview).where(DoctorReview.doctor_id == doctor_id)
+    if after is not None:
+        query = query.where(tuple_(DoctorReview.created_at, DoctorReview.id) < after)
+    query = query.order_by(
+        DoctorReview.created_at.desc(), DoctorReview.id.desc()
+    ).limit(limit + 1)
+    reviews = (await db.execute(query)).scalars().all()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_cursor(reviews[-1].created_at, reviews[-1].id)
+    return reviews, next_cursor
+
+
+async def rebuild_rating_aggregates(db: AsyncSession) -> int:
+    """
+    Recompute every doctor's rating aggregates from the raw reviews and
+    commit. New reviews are blocked while this runs, so no increment is lost.
+    Returns the number of doctors with at least one review.
+    """
+    await db.execute(text("LOCK TABLE doctor_reviews IN SHARE MODE"))
+    totals = (
+        select(
+            DoctorReview.doctor_id,
+            func.count().label("count"),
+            func.sum(DoctorReview.rating).label("total"),
+            array(
+                [
+                    func.count().filter(DoctorReview.rating == value)
+                    for value in RATING_VALUES
+                ]
+            ).label("histogram"),
+        )
+        .group_by(DoctorReview.doctor_id)
+        .subquery()
+    )
+    await db.execute(
+        update(DoctorProfile).values(
+            rating=None,
+            rating_count=0,
+            rating_sum=0,
+            rating_histogram=[0] * len(RATING_VALUES),
+        )
+    )
+    result = await db.execute(
+        update(DoctorProfile)
+        .where(DoctorProfile.doctor_id == totals.c.doctor_id)
+        .values(
+            rating=cast(totals.c.total, Float) / totals.c.count,
+            rating_count=totals.c.count,
+            rating_sum=totals.c.total,
+            rating_histogram=totals.c.histogram,
+        )
+    )
+    mark_directory_changed(db)
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.models.slot_hold import HOLD_OVERLAP_CONSTRAINT, SlotHold
+from app.services.appointment import EXCLUSION_VIOLATION, get_doctor_busy_slots
+
+logger = logging.getLogger(__name__)
+
+
+def _overlaps(start: datetime, end: datetime):
+    # Matches the exclusion constraint, so lookups can use its GiST index.
+    return func.tstzrange(SlotHold.start_time, SlotHold.end_time).op("&&")(
+        func.tstzrange(literal(start), literal(end))
+    )
+
+
+def _is_hold_conflict(exc: IntegrityError) -> bool:
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == EXCLUSION_VIOLATION or HOLD_OVERLAP_CONSTRAINT in str(orig)
+
+
+async def place_hold(
+    db: AsyncSession,
+    patient_id: int,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    ttl: timedelta,
+) -> Optional[SlotHold]:
+    """
+    Reserve a doctor's slot for a patient for `ttl`. Returns None, with the
+    transaction rolled back, if the slot is already booked or held by someone
+    else; the caller commits a granted hold.
+
+    A patient books one slot at a time, so their previous holds are dropped.
+    Expired holds on the slot are dropped too, and the exclusion constraint
+    settles concurrent requests for the same slot: exactly one insert wins.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        delete(SlotHold).where(
+            or_(
+                SlotHold.patient_id == patient_id,
+                and_(
+                    SlotHold.doctor_id == doctor_id,
+                    SlotHold.expires_at <= now,
+                    _overlaps(start, end),
+                ),
+            )
+        )
+    )
+    if await get_doctor_busy_slots(db, doctor_id, start, end):
+        await db.rollback()
+        metrics.SLOT_HOLDS.labels(outcome="booked").inc()
+        return None
+
+    hold = SlotHold(
+        doctor_id=doctor_id,
+        patient_id=patient_id,
+        start_time=start,
+        end_time=end,
+        expires_at=now + ttl,
+    )
+    db.add(hold)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        if not _is_hold_conflict(exc):
+            raise
+        await db.rollback()
+        metrics.SLOT_HOLDS.labels(outcome="conflict").inc()
+        return None
+    metrics.SLOT_HOLDS.labels(outcome="granted").inc()
+    return hold
+
+
+async def is_slot_held(
+    db: AsyncSession,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_patient_id: Optional[int] = None,
+) -> bool:
+    """True if another patient holds an unexpired slot overlapping [start, end)."""
+    query = select(SlotHold.id).where(
+        SlotHold.doctor_id == doctor_id,
+        SlotHold.expires_at > datetime.now(timezone.utc),
+        _overlaps(start, end),
+    )
+    if exclude_patient_id is not None:
+        query = query.where(SlotHold.patient_id != exclude_patient_id)
+    return await db.scalar(query.limit(1)) is not None
+
+
+async def confirm_hold(
+    db: AsyncSession,
+    hold_id: int,
+    patient_id: int,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+) -> bool:
+    """
+    Consume a patient's unexpired hold on exactly this slot, in the caller's
+    transaction, so the hold is only gone if the booking commits.
+    """
+    consumed = await db.scalar(
+        delete(SlotHold)
+        .where(
+            SlotHold.id == hold_id,
+            SlotHold.patient_id == patient_id,
+            SlotHold.doctor_id == doctor_id,
+            SlotHold.start_time == start,
+            SlotHold.end_time == end,
+            SlotHold.expires_at > datetime.now(timezone.utc),
+        )
+        .returning(SlotHold.id)
+    )
+    if consumed is None:
+        metrics.SLOT_HOLDS.labels(outcome="invalid").inc()
+        return False
+    metrics.SLOT_HOLDS.labels(outcome="confirmed").inc()
+    return True
+
+
+async def release_hold(db: AsyncSession, hold_id: int, patient_id: int) -> bool:
+    """Give up a patient's hold early. Returns False if they had no such hold."""
+    result = await db.execute(
+        delete(SlotHold).where(
+            SlotHold.id == hold_id, SlotHold.patient_id == patient_id
+        )
+    )
+    await db.commit()
+    if result.rowcount:
+        metrics.SLOT_HOLDS.labels(outcome="released").inc()
+    return bool(result.rowcount)
+
+
+async def sweep_expired_holds(db: AsyncSession) -> int:
+    """Delete holds past their expiry; returns how many were removed."""
+    result = await db.execute(
+        delete(SlotHold).where(SlotHold.expires_at <= datetime.now(timezone.utc))
+    )
+    await db.commit()
+    if result.rowcount:
+        metrics.SLOT_HOLDS.labels(outcome="expired").inc(result.rowcount)
+    return result.rowcount
@@ -0,0 +1,166 @@
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from sqlalchemy import String, Text, cast, func, literal, literal_column, select
+from sqlalchemy import tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import encode_cursor
+from app.models.appointment import Appointment
+from app.models.chat_session import ChatSession
+from app.models.health_record import HealthRecord
+
+logger = logging.getLogger(__name__)
+
+# Entries fetched per round trip while streaming.
+TIMELINE_PAGE_SIZE = 100
+TIMELINE_KINDS = ("appointment", "chat", "health_record")
+
+
+def _json_object(**fields):
+    """json_build_object over constant keys, so Postgres renders the JSON."""
+    args = []
+    for key, value in fields.items():
+        args.extend([literal_column(f"'{key}'"), value])
+    return func.json_build_object(*args)
+
+
+def _branch(
+    kind: str,
+    row_id,
+    occurred_at,
+    data,
+    conditions: list,
+    after: Optional[Tuple[datetime, str, int]],
+    limit: int,
+):
+    """
+    One source of the timeline, ordered and cut to `limit` on its own so it
+    is read from its (patient, time) index. Entries are ordered by
+    (occurred_at, kind, id) descending, so the keyset condition reduces to
+    a time comparison plus the id for the cursor's own kind.
+    """
+    if after is not None:
+        after_at, after_kind, after_id = after
+        if kind < after_kind:
+            conditions = [*conditions, occurred_at <= after_at]
+        elif kind == after_kind:
+            conditions = [
+                *conditions,
+                tuple_(occurred_at, row_id) < (after_at, after_id),
+            ]
+        else:
+            conditions = [*conditions, occurred_at < after_at]
+    line = _json_object(
+        type=literal(kind, String), id=row_id, at=occurred_at, data=data
+    )
+    return (
+        select(
+            literal(kind, String).label("kind"),
+            row_id.label("id"),
+            occurred_at.label("occurred_at"),
+            cast(line, Text).label("line"),
+        )
+        .where(*conditions)
+        .order_by(occurred_at.desc(), row_id.desc())
+        .limit(limit)
+    )
+
+
+def timeline_page_query(
+    patient_id: int, after: Optional[Tuple[datetime, str, int]], limit: int
+):
+    """
+    The next `limit` timeline entries of a patient: chat messages,
+    appointments (at their start time) and health records merged newest
+    first by a UNION ALL in the database. Each row carries its NDJSON line.
+    """
+    combined = union_all(
+        _branch(
+            "appointment",
+            Appointment.id,
+            Appointment.start_time,
+            _json_object(
+                doctor_id=Appointment.doctor_id,
+                end_time=Appointment.end_time,
+                status=Appointment.status,
+                telemedicine_url=Appointment.telemedicine_url,
+            ),
+            [Appointment.patient_id == patient_id],
+            after,
+            limit,
+        ),
+        _branch(
+            "chat",
+            ChatSession.id,
+            ChatSession.created_at,
+            _json_object(
+                chat_room_id=ChatSession.chat_room_id,
+                input_text=ChatSession.input_text,
+                model_response=ChatSession.model_response,
+                triage_advice=ChatSession.triage_advice,
+            ),
+            [ChatSession.patient_id == patient_id],
+            after,
+            limit,
+        ),
+        _branch(
+            "health_record",
+            HealthRecord.id,
+            HealthRecord.created_at,
+            _json_object(
+                record_type=HealthRecord.record_type,
+                title=HealthRecord.title,
+                summary=HealthRecord.summary,
+                doctor_id=HealthRecord.doctor_id,
+                triage_recommendation=HealthRecord.triage_recommendation,
+            ),
+            [HealthRecord.patient_id == patient_id],
+            after,
+            limit,
+        ),
+    ).subquery()
+    return (
+        select(combined)
+        .order_by(
+            combined.c.occurred_at.desc(), combined.c.kind.desc(), combined.c.id.desc()
+        )
+        .limit(limit)
+    )
+
+
+async def stream_timeline(
+    db: AsyncSession,
+    patient_id: int,
+    after: Optional[Tuple[datetime, str, int]] = None,
+    limit: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield the patient's timeline as NDJSON, one chunk per page, so clients
+    can render the first entries while later pages are still being read.
+    With `limit`, stops after that many entries and, if more remain, ends
+    with a {"type": "next_cursor"} line to resume from.
+    """
+    remaining = limit
+    while True:
+        size = TIMELINE_PAGE_SIZE
+        if remaining is not None:
+            size = min(size, remaining)
+        result = await db.execute(timeline_page_query(patient_id, after, size + 1))
+        rows = result.all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if rows:
+            yield "".join(row.line + "\n" for row in rows)
+            last = rows[-1]
+            after = (last.occurred_at, last.kind, last.id)
+        if not has_more:
+            return
+        if remaining is not None:
+            remaining -= len(rows)
+            if remaining <= 0:
+                cursor = encode_cursor(*after)
+                yield json.dumps({"type": "next_cursor", "cursor": cursor}) + "\n"
+                return
@@ -0,0 +1,111 @@
+"""
+Benchmark the reminder fan-out against a local SMTP sink.
+
+Renders reminders for N synthetic appointments and delivers them through the
+same EmailFanout + SMTP pool used by the scheduler, then prints the run stats.
+
+    export PYTHONPATH="."
+    python benchmarks/reminder_fanout.py --appointments 10000 --concurrency 8 --rate 0
+"""
+
+import argparse
+import asyncio
+import datetime
+import socket
+from typing import NamedTuple, Optional
+
+from aiosmtpd.controller import Controller
+
+from app.core.email_service import EmailService
+from app.core.notifications import EmailFanout
+from app.core.smtp_pool import SMTPConnectionPool
+from app.services.reminders import render_appointment_reminders
+
+
+class SyntheticAppointment(NamedTuple):
+    id: int
+    start_time: datetime.datetime
+    telemedicine_url: Optional[str]
+    patient_email: str
+    patient_username: str
+    patient_first_name: Optional[str]
+    doctor_email: str
+    doctor_username: str
+    doctor_first_name: Optional[str]
+    doctor_last_name: Optional[str]
+
+
+class CountingSink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def synthetic_appointments(count: int):
+    start = datetime.datetime.now(datetime.timezone.utc).replace(
+        hour=8, minute=0, second=0, microsecond=0
+    )
+    for i in range(count):
+        yield SyntheticAppointment(
+            id=i,
+            start_time=start + datetime.timedelta(minutes=15 * (i % 40)),
+            telemedicine_url=f"https://meet.example/{i}",
+            patient_email=f"patient{i}@example.com",
+            patient_username=f"patient{i}",
+            patient_first_name="Pat",
+            doctor_email=f"doctor{i % 200}@example.com",
+            doctor_username=f"doctor{i % 200}",
+            doctor_first_name="Doc",
+            doctor_last_name=f"Number{i % 200}",
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(appointments: int, concurrency: int, rate: float):
+    sink = CountingSink()
+    controller = Controller(sink, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        pool = SMTPConnectionPool(
+            hostname="127.0.0.1",
+            port=controller.port,
+            start_tls=False,
+            size=concurrency,
+        )
+        fanout = EmailFanout(
+            EmailService(pool=pool), concurrency=concurrency, rate_per_second=rate
+        )
+        messages = (
+            message
+            for appointment in synthetic_appointments(appointments)
+            for message in render_appointment_reminders(appointment)
+        )
+        stats = await fanout.deliver(messages)
+        await pool.close()
+    finally:
+        controller.stop()
+
+    print(f"Appointments:        {appointments}")
+    print(f"Concurrency:         {concurrency}")
+    print(f"SMTP connections:    {pool.connections_opened}")
+    print(f"Stats:               {stats.as_dict()}")
+    print(f"Received by sink:    {sink.received}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appointments", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=0, help="Emails per second, 0 for unlimited"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.appointments, args.concurrency, args.rate))
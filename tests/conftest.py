@@ -16,6 +16,13 @@ import app.models.user  # noqa
 import app.models.chat_session  # noqa
 import app.models.appointment  # noqa
 import app.models.health_record  # noqa
+import app.models.email_outbox  # noqa
+import app.models.appointment_reminder  # noqa
+import app.models.scheduler_job_run  # noqa
+import app.models.slot_hold  # noqa
+import app.models.doctor_profile  # noqa
+import app.models.doctor_review  # noqa
+import app.models.doctor_briefing  # noqa
 
 
 @pytest_asyncio.fixture(autouse=True, scope="session")
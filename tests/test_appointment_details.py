@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_expanded_appointment_list():
+    """
+    With expand=true the appointment list carries the counterpart's display
+    fields and the latest triage record id, fetched in a single query.
+    """
+    start = datetime(2030, 3, 4, 10, 0, tzinfo=timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        patient = User(
+            username="detail_patient",
+            email="detail_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+            first_name="Pat",
+            last_name="Ient",
+        )
+        doctor = User(
+            username="detail_doctor",
+            email="detail_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            first_name="Doc",
+            last_name="Tor",
+            specialization="Cardiology",
+        )
+        nameless_doctor = User(
+            username="detail_nameless",
+            email="detail_nameless@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        session.add_all([patient, doctor, nameless_doctor])
+        await session.flush()
+
+        session.add_all(
+            [
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    start_time=start,
+                    end_time=start + timedelta(minutes=30),
+                    status=AppointmentStatus.scheduled,
+                ),
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=nameless_doctor.id,
+                    start_time=start - timedelta(days=1),
+                    end_time=start - timedelta(days=1) + timedelta(minutes=30),
+                    status=AppointmentStatus.completed,
+                ),
+            ]
+        )
+        older_triage = HealthRecord(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            record_type=RecordType.at_triage,
+            title="Older triage",
+            created_at=start - timedelta(days=10),
+        )
+        latest_triage = HealthRecord(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            record_type=RecordType.at_triage,
+            title="Latest triage",
+            created_at=start - timedelta(days=1),
+        )
+        note = HealthRecord(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            record_type=RecordType.doctor_note,
+            title="Not a triage record",
+            created_at=start,
+        )
+        session.add_all([older_triage, latest_triage, note])
+        await session.commit()
+        patient_id, doctor_id = patient.id, doctor.id
+        latest_triage_id = latest_triage.id
+
+    selects = []
+
+    def count_selects(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            _dummy_auth_service.user_id = patient_id
+            selects.clear()
+            response = await client.get(
+                "/api/appointment/my-appointments",
+                params={"expand": "true"},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            assert len(selects) == 1, f"Expected one query, got {len(selects)}"
+            upcoming, past = response.json()
+            print(f"Patient view: {upcoming}")
+            assert upcoming["counterpart_name"] == "Doc Tor"
+            assert upcoming["counterpart_role"] == "doctor"
+            assert upcoming["counterpart_specialization"] == "Cardiology"
+            assert upcoming["latest_triage_record_id"] == latest_triage_id
+            assert past["counterpart_name"] == "detail_nameless"
+            assert past["latest_triage_record_id"] is None
+
+            _dummy_auth_service.user_id = doctor_id
+            response = await client.get(
+                "/api/appointment/my-appointments",
+                params={"expand": "true"},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            (appointment,) = response.json()
+            assert appointment["counterpart_name"] == "Pat Ient"
+            assert appointment["counterpart_role"] == "patient"
+            assert appointment["counterpart_specialization"] is None
+            assert appointment["latest_triage_record_id"] == latest_triage_id
+
+            response = await client.get(
+                "/api/appointment/my-appointments", headers=headers
+            )
+            assert response.status_code == 200, response.text
+            (plain,) = response.json()
+            assert "counterpart_name" not in plain, "Plain list keeps its shape"
+            print("Expanded list rendered from a single query.")
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_selects)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
@@ -0,0 +1,170 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.db.database import TestAsyncSessionLocal
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.availability import AvailabilityEngine, availability_engine
+
+
+class DummyAuthService:
+    async def get_current_user(self, token: str = None):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_availability_engine():
+    """
+    Builds the availability snapshot from the DB, checks the earliest free slots
+    across doctors, keeps it in sync incrementally, and times a search across
+    thousands of doctors.
+    """
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    monday = today + timedelta(days=7 - today.weekday())
+    now = monday + timedelta(hours=8)
+
+    def at(hour, minute=0):
+        return monday + timedelta(hours=hour, minutes=minute)
+
+    async with TestAsyncSessionLocal() as session:
+        cardiologist_a = User(
+            username="avail_a",
+            email="avail_a@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            specialization="Cardiology",
+        )
+        cardiologist_b = User(
+            username="avail_b",
+            email="avail_b@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            specialization="Interventional Cardiology",
+        )
+        on_leave = User(
+            username="avail_c",
+            email="avail_c@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            specialization="Cardiology",
+            is_available=False,
+        )
+        neurologist = User(
+            username="avail_d",
+            email="avail_d@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            specialization="Neurology",
+        )
+        patient = User(
+            username="avail_patient",
+            email="avail_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all(
+            [cardiologist_a, cardiologist_b, on_leave, neurologist, patient]
+        )
+        await session.flush()
+        session.add_all(
+            [
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=cardiologist_a.id,
+                    start_time=at(9),
+                    end_time=at(10),
+                    status=AppointmentStatus.scheduled,
+                ),
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=cardiologist_b.id,
+                    start_time=at(9),
+                    end_time=at(12),
+                    status=AppointmentStatus.cancelled,
+                ),
+            ]
+        )
+        await session.commit()
+        a_id, b_id = cardiologist_a.id, cardiologist_b.id
+
+        engine = AvailabilityEngine(tz="UTC")
+        await engine.rebuild(session)
+
+    slots = engine.find_free_slots("cardio", count=5, duration_minutes=30, now=now)
+    assert [(s.doctor_id, s.start_time) for s in slots] == [
+        (b_id, at(9)),
+        (b_id, at(9, 15)),
+        (b_id, at(9, 30)),
+        (b_id, at(9, 45)),
+        (a_id, at(10)),
+    ], "Busy, cancelled and unavailable doctors must be handled"
+    assert slots[0].end_time == at(9, 30)
+    print(f"Earliest cardiology slots: {slots}")
+
+    engine.book(b_id, at(9), at(12))
+    slots = engine.find_free_slots("cardio", count=1, duration_minutes=30, now=now)
+    assert [(s.doctor_id, s.start_time) for s in slots] == [(a_id, at(10))]
+
+    engine.release(a_id, at(9), at(10))
+    slots = engine.find_free_slots("cardio", count=1, duration_minutes=30, now=now)
+    assert [(s.doctor_id, s.start_time) for s in slots] == [(a_id, at(9))]
+
+    # Working hours end at 17:00, so a 90 minute slot cannot start after 15:30.
+    engine.book(a_id, at(9), at(15, 45))
+    slots = engine.find_free_slots(
+        doctor_id=a_id, count=1, duration_minutes=90, now=now
+    )
+    assert slots[0].start_time == at(9) + timedelta(days=1)
+    print("Incremental bookings and releases are reflected immediately.")
+
+    availability_engine.invalidate()
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = DummyAuthService
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            response = await client.get(
+                "/api/appointment/availability",
+                params={"specialization": "neuro", "count": 3},
+                headers={"Authorization": "Bearer dummy_token"},
+            )
+            assert response.status_code == 200, response.text
+            assert len(response.json()) == 3
+            assert {slot["doctor_id"] for slot in response.json()} == {neurologist.id}
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    # Thousands of doctors, most of them fully booked for the first week.
+    big = AvailabilityEngine(tz="UTC")
+    rng = random.Random(7)
+    for doctor_id in range(1, 5001):
+        big.add_doctor(
+            doctor_id, rng.choice(["Cardiology", "Neurology", "Dermatology"])
+        )
+        for day in range(7):
+            big.book(
+                doctor_id, at(9) + timedelta(days=day), at(17) + timedelta(days=day)
+            )
+        slot_day = at(9) + timedelta(days=7 + rng.randrange(7))
+        big.book(doctor_id, slot_day, slot_day + timedelta(hours=rng.randrange(1, 8)))
+
+    started = time.perf_counter()
+    slots = big.find_free_slots("neuro", count=10, duration_minutes=30, now=now)
+    elapsed = time.perf_counter() - started
+    print(f"Searched 5000 doctors in {elapsed * 1000:.2f} ms")
+    assert len(slots) == 10
+    assert all(s.start_time >= at(9) + timedelta(days=7) for s in slots)
+    assert elapsed < 0.25
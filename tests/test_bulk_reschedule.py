@@ -0,0 +1,293 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, func, select, text
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import (
+    DOCTOR_OVERLAP_CONSTRAINT,
+    Appointment,
+    AppointmentStatus,
+)
+from app.models.appointment_reminder import AppointmentReminder
+from app.models.email_outbox import EmailOutbox
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.availability import availability_engine
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+    role = UserRole.doctor
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id, self.role)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+async def create_overlap_constraint():
+    """Add the migration's (deferrable) exclusion constraint to the test schema."""
+    async with test_engine.connect() as conn:
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            await conn.commit()
+            doctor_expr = "doctor_id WITH ="
+        except Exception:
+            await conn.rollback()
+            doctor_expr = "int4range(doctor_id, doctor_id, '[]') WITH ="
+        await conn.execute(text(f"""
+                ALTER TABLE appointments
+                ADD CONSTRAINT {DOCTOR_OVERLAP_CONSTRAINT}
+                EXCLUDE USING gist (
+                    {doctor_expr},
+                    tstzrange(start_time, end_time) WITH &&
+                )
+                WHERE (status = 'scheduled')
+                DEFERRABLE INITIALLY IMMEDIATE
+                """))
+        await conn.commit()
+
+
+@pytest.mark.asyncio
+async def test_bulk_shift_and_cancel_for_doctor_leave():
+    """
+    Shifts a doctor's back-to-back day by 30 minutes with one UPDATE, rejects
+    a shift onto another booking, cancels the rest of the leave range, and
+    checks reminders, outbox notices, feed versions and availability follow.
+    """
+    await create_overlap_constraint()
+    day = (datetime.now(timezone.utc) + timedelta(days=5)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    while day.weekday() >= 5:  # a working day for the availability snapshot
+        day += timedelta(days=1)
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="leave_doctor",
+            email="leave_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            first_name="Doc",
+            last_name="Tor",
+        )
+        other_doctor = User(
+            username="leave_other",
+            email="leave_other@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        patients = [
+            User(
+                username=f"leave_patient_{i}",
+                email=f"leave_patient_{i}@example.com",
+                hashed_password="x",
+                role=UserRole.patient,
+            )
+            for i in range(6)
+        ]
+        session.add_all([doctor, other_doctor, *patients])
+        await session.flush()
+
+        # Six back-to-back 30 minute visits, 09:00 to 12:00.
+        appointments = [
+            Appointment(
+                patient_id=patient.id,
+                doctor_id=doctor.id,
+                start_time=day + timedelta(minutes=30 * i),
+                end_time=day + timedelta(minutes=30 * (i + 1)),
+                status=AppointmentStatus.scheduled,
+            )
+            for i, patient in enumerate(patients)
+        ]
+        # Next day, 09:00 and 10:00; the first one is cancelled already.
+        appointments += [
+            Appointment(
+                patient_id=patients[0].id,
+                doctor_id=doctor.id,
+                start_time=day + timedelta(days=1, hours=hour),
+                end_time=day + timedelta(days=1, hours=hour, minutes=30),
+                status=(
+                    AppointmentStatus.cancelled
+                    if hour == 0
+                    else AppointmentStatus.scheduled
+                ),
+            )
+            for hour in (0, 1)
+        ]
+        # Another doctor's visit in the same range is never touched.
+        appointments.append(
+            Appointment(
+                patient_id=patients[1].id,
+                doctor_id=other_doctor.id,
+                start_time=day,
+                end_time=day + timedelta(minutes=30),
+                status=AppointmentStatus.scheduled,
+            )
+        )
+        session.add_all(appointments)
+        await session.flush()
+        session.add_all(
+            AppointmentReminder(
+                appointment_id=appointment.id,
+                kind=kind,
+                due_at=appointment.start_time - offset,
+            )
+            for appointment in appointments
+            for kind, offset in (
+                ("day_before", timedelta(hours=24)),
+                ("hour_before", timedelta(hours=1)),
+            )
+        )
+        await session.commit()
+        doctor_id, other_doctor_id = doctor.id, other_doctor.id
+        patient_ids = [patient.id for patient in patients]
+        first_id = appointments[0].id
+
+    async with TestAsyncSessionLocal() as session:
+        await availability_engine.rebuild(session)
+    updates = []
+
+    def capture_updates(conn, cursor, statement, *args):
+        if "UPDATE appointments" in statement:
+            updates.append(statement)
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            url = f"/api/appointment/doctors/{doctor_id}/bulk-change"
+            morning = {
+                "start": day.isoformat(),
+                "end": (day + timedelta(hours=12)).isoformat(),
+            }
+
+            _dummy_auth_service.user_id = other_doctor_id
+            response = await client.post(
+                url, json={"action": "cancel", **morning}, headers=headers
+            )
+            assert response.status_code == 403
+
+            _dummy_auth_service.user_id = doctor_id
+            response = await client.post(
+                url, json={"action": "shift", **morning}, headers=headers
+            )
+            assert response.status_code == 422, "shift_minutes is required"
+
+            event.listen(
+                test_engine.sync_engine, "before_cursor_execute", capture_updates
+            )
+            try:
+                response = await client.post(
+                    url,
+                    json={"action": "shift", "shift_minutes": 30, **morning},
+                    headers=headers,
+                )
+            finally:
+                event.remove(
+                    test_engine.sync_engine, "before_cursor_execute", capture_updates
+                )
+            assert response.status_code == 200, response.text
+            result = response.json()
+            assert result["affected"] == 6 and result["notified_patients"] == 6
+            assert len(updates) == 1, "One set-based UPDATE for the whole range"
+            starts = [a["start_time"] for a in result["appointments"]]
+            assert datetime.fromisoformat(starts[0]) == day + timedelta(minutes=30)
+            print(f"Shifted {result['affected']} back-to-back appointments.")
+
+            free = availability_engine.find_free_slots(
+                doctor_id=doctor_id, count=1, duration_minutes=30, now=day
+            )
+            assert free and free[0].start_time == day, "09:00 was released"
+
+            # Moving the morning block a day later lands on the next day's
+            # 10:00 visit, which the overlap constraint rejects.
+            response = await client.post(
+                url,
+                json={"action": "shift", "shift_minutes": 24 * 60, **morning},
+                headers=headers,
+            )
+            assert response.status_code == 409, response.text
+
+            _dummy_auth_service.role = UserRole.admin
+            response = await client.post(
+                url,
+                json={
+                    "action": "cancel",
+                    "start": (day + timedelta(days=1)).isoformat(),
+                    "end": (day + timedelta(days=2)).isoformat(),
+                    "reason": "Doctor on leave",
+                },
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            assert response.json()["affected"] == 1, "Only the scheduled visit"
+
+            _dummy_auth_service.role = UserRole.patient
+            _dummy_auth_service.user_id = patient_ids[0]
+            status_url = f"/api/appointment/{first_id}/status"
+            response = await client.patch(
+                status_url, json={"status": "completed"}, headers=headers
+            )
+            assert response.status_code == 403
+            response = await client.patch(
+                status_url, json={"status": "cancelled"}, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            assert response.json()["status"] == "cancelled"
+            response = await client.patch(
+                status_url, json={"status": "cancelled"}, headers=headers
+            )
+            assert response.status_code == 409
+    finally:
+        _dummy_auth_service.role = UserRole.doctor
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with TestAsyncSessionLocal() as session:
+        notices = (await session.execute(select(EmailOutbox.subject))).scalars().all()
+        assert (
+            sorted(notices)
+            == ["Appointment Cancelled"] + ["Appointment Rescheduled"] * 6
+        ), "The patient's own cancellation sends no notice"
+
+        reminders = dict(
+            (
+                await session.execute(
+                    select(
+                        AppointmentReminder.appointment_id,
+                        func.min(AppointmentReminder.due_at),
+                    ).group_by(AppointmentReminder.appointment_id)
+                )
+            ).all()
+        )
+        shifted = await session.scalar(
+            select(Appointment.start_time).where(Appointment.id == first_id + 1)
+        )
+        assert reminders[first_id + 1] == shifted - timedelta(hours=24)
+        assert first_id not in reminders, "Cancelled visits lose their reminders"
+
+        versions = dict(
+            (await session.execute(select(User.id, User.appointments_version))).all()
+        )
+        assert versions[doctor_id] == 3
+        assert versions[other_doctor_id] == 0
+        assert versions[patient_ids[0]] == 3
+        assert versions[patient_ids[5]] == 1
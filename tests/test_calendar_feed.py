@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.api.routers import appointment as appointment_router
+from app.api.routers import calendar as calendar_router
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+async def no_triage_record(*args, **kwargs):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_calendar_feed_conditional_get(monkeypatch):
+    """
+    Subscribes to a patient's ICS feed, revalidates it with If-None-Match
+    (304 without reading appointments), and sees a new ETag after a booking,
+    when the other participant is renamed and when the history window moves.
+    """
+    async with TestAsyncSessionLocal() as session:
+        patient = User(
+            username="ics_patient",
+            email="ics_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+            first_name="Ada",
+            last_name="Lovelace, Countess of Lovelace; Mathematician and Writer",
+        )
+        doctor = User(
+            username="ics_doctor",
+            email="ics_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            first_name="Doc",
+            last_name="Tor",
+        )
+        session.add_all([patient, doctor])
+        await session.commit()
+        patient_id, doctor_id = patient.id, doctor.id
+
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+    def booking(offset_hours):
+        return {
+            "doctor_id": doctor_id,
+            "start_time": (start + timedelta(hours=offset_hours)).isoformat(),
+            "end_time": (start + timedelta(hours=offset_hours, minutes=30)).isoformat(),
+            "telemedicine_url": "https://meet.example/ics",
+        }
+
+    appointment_reads = []
+
+    def track_reads(conn, cursor, statement, *args):
+        if "FROM appointments" in statement:
+            appointment_reads.append(statement)
+
+    monkeypatch.setattr(
+        appointment_router, "create_triage_record_from_chats", no_triage_record
+    )
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            _dummy_auth_service.user_id = patient_id
+
+            response = await client.post(
+                "/api/appointment/", json=booking(0), headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+            response = await client.get("/api/calendar/feed-url", headers=headers)
+            assert response.status_code == 200, response.text
+            feed_url = response.json()["url"]
+            assert feed_url.endswith(".ics")
+
+            response = await client.get(feed_url)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"].startswith("text/calendar")
+            etag = response.headers["etag"]
+            body = response.text
+            assert body.startswith("BEGIN:VCALENDAR\r\n")
+            assert body.count("BEGIN:VEVENT") == 1
+            assert "SUMMARY:Appointment with Dr. Doc Tor" in body
+            assert all(len(line.encode()) <= 75 for line in body.split("\r\n"))
+            print(f"Feed ETag {etag}:\n{body}")
+
+            event.listen(test_engine.sync_engine, "before_cursor_execute", track_reads)
+            try:
+                response = await client.get(feed_url, headers={"If-None-Match": etag})
+            finally:
+                event.remove(
+                    test_engine.sync_engine, "before_cursor_execute", track_reads
+                )
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+            assert appointment_reads == [], "304 must not read appointment rows"
+            print("Unchanged feed revalidated with a 304.")
+
+            response = await client.post(
+                "/api/appointment/", json=booking(2), headers=headers
+            )
+            assert response.status_code == 201, response.text
+
+            response = await client.get(feed_url, headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
+            assert response.text.count("BEGIN:VEVENT") == 2
+
+            _dummy_auth_service.user_id = doctor_id
+            response = await client.get("/api/calendar/feed-url", headers=headers)
+            doctor_feed = await client.get(response.json()["url"])
+            assert doctor_feed.status_code == 200
+            assert doctor_feed.text.count("BEGIN:VEVENT") == 2
+            assert (
+                "SUMMARY:Appointment with Ada Lovelace\\, Countess" in doctor_feed.text
+            )
+
+            doctor_etag = doctor_feed.headers["etag"]
+            async with TestAsyncSessionLocal() as session:
+                renamed = await session.get(User, patient_id)
+                renamed.last_name = "King"
+                await session.commit()
+            doctor_feed = await client.get(
+                doctor_feed.url, headers={"If-None-Match": doctor_etag}
+            )
+            assert doctor_feed.status_code == 200, "Renames change the feed"
+            assert "SUMMARY:Appointment with Ada King" in doctor_feed.text
+
+            doctor_etag = doctor_feed.headers["etag"]
+            window_start = calendar_router.feed_window_start()
+            monkeypatch.setattr(
+                calendar_router,
+                "feed_window_start",
+                lambda: window_start + timedelta(days=1),
+            )
+            doctor_feed = await client.get(
+                doctor_feed.url, headers={"If-None-Match": doctor_etag}
+            )
+            assert doctor_feed.status_code == 200, "The next day's window is new"
+            assert doctor_feed.headers["etag"] != doctor_etag
+
+            forged = feed_url.replace(f"/{patient_id}.", f"/{doctor_id}.")
+            response = await client.get(forged)
+            assert response.status_code == 404, "Tokens are bound to their user"
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
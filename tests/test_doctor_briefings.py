@@ -0,0 +1,212 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.api.schemas.health_record import HealthRecordCreate
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User, UserRole
+from app.services.appointment import bump_appointments_version
+from app.services.auth import AuthService
+from app.services.briefing import CLINIC_TZ, build_briefings, clinic_today
+from app.services.health_record import create_health_record
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user = None
+
+    async def get_current_user(self, token: str = None):
+        return self.user
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_nightly_briefing_served_and_patched():
+    """
+    Tomorrow's briefing is built in bulk, served in one query, patched in
+    place when a patient gets a new record and rebuilt when the doctor's
+    appointments change. Days other than today and tomorrow are refused.
+    """
+    tomorrow = clinic_today() + timedelta(days=1)
+    morning = datetime.combine(tomorrow, time(9), tzinfo=CLINIC_TZ)
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="brief_doctor",
+            email="brief_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        colleague = User(
+            username="brief_colleague",
+            email="brief_colleague@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        anna = User(
+            username="brief_anna",
+            email="brief_anna@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+            first_name="Anna",
+            last_name="Triaged",
+            allergies="Penicillin",
+        )
+        ben = User(
+            username="brief_ben",
+            email="brief_ben@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([doctor, colleague, anna, ben])
+        await session.flush()
+
+        def appointment(patient, owner, hour, status=AppointmentStatus.scheduled):
+            return Appointment(
+                patient_id=patient.id,
+                doctor_id=owner.id,
+                start_time=morning + timedelta(hours=hour),
+                end_time=morning + timedelta(hours=hour, minutes=30),
+                status=status,
+            )
+
+        session.add_all(
+            [
+                appointment(ben, doctor, 2),
+                appointment(anna, doctor, 0),
+                appointment(ben, doctor, 4, AppointmentStatus.cancelled),
+                appointment(anna, colleague, 1),
+            ]
+        )
+        for days_ago, record_type, title in [
+            (20, RecordType.at_triage, "Old triage"),
+            (10, RecordType.doctor_note, "Follow-up note"),
+            (2, RecordType.at_triage, "Recent triage"),
+        ]:
+            session.add(
+                HealthRecord(
+                    patient_id=anna.id,
+                    doctor_id=doctor.id,
+                    record_type=record_type,
+                    title=title,
+                    created_at=morning - timedelta(days=days_ago),
+                )
+            )
+        await session.commit()
+        doctor_id, colleague_id = doctor.id, colleague.id
+        anna_id, ben_id = anna.id, ben.id
+
+    async with TestAsyncSessionLocal() as session:
+        documents = await build_briefings(session, tomorrow)
+        await session.commit()
+    assert doctor_id in documents and colleague_id in documents
+
+    selects = []
+
+    def count_selects(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            _dummy_auth_service.user = DummyUser(doctor_id, UserRole.doctor)
+
+            async def briefing():
+                selects.clear()
+                response = await client.get(
+                    "/api/appointment/briefing",
+                    params={"day": tomorrow.isoformat()},
+                    headers=headers,
+                )
+                assert response.status_code == 200, response.text
+                return response.json()
+
+            document = await briefing()
+            assert len(selects) == 1, "Served straight from the stored document"
+            print(f"Briefing: {document}")
+            first, second = document["appointments"]
+            assert [first["patient"]["id"], second["patient"]["id"]] == [
+                anna_id,
+                ben_id,
+            ]
+            assert first["patient"]["name"] == "Anna Triaged"
+            assert first["patient"]["allergies"] == "Penicillin"
+            assert first["latest_triage"]["title"] == "Recent triage"
+            assert first["records"]["total"] == 3
+            assert first["records"]["doctor_notes"] == 1
+            assert [r["title"] for r in first["records"]["recent"]] == [
+                "Recent triage",
+                "Follow-up note",
+                "Old triage",
+            ]
+            assert second["latest_triage"] is None
+            assert second["records"]["total"] == 0
+
+            async with TestAsyncSessionLocal() as session:
+                await create_health_record(
+                    session,
+                    HealthRecordCreate(
+                        record_type=RecordType.doctor_note,
+                        patient_id=ben_id,
+                        title="Pre-visit labs",
+                    ),
+                    doctor_id,
+                )
+
+            patched = await briefing()
+            assert len(selects) == 1, "Patched in place, not rebuilt"
+            assert patched["generated_at"] == document["generated_at"]
+            ben_entry = patched["appointments"][1]
+            assert ben_entry["records"]["total"] == 1
+            assert ben_entry["records"]["recent"][0]["title"] == "Pre-visit labs"
+            assert patched["appointments"][0] == first
+
+            async with TestAsyncSessionLocal() as session:
+                await bump_appointments_version(session, [doctor_id])
+                await session.commit()
+            rebuilt = await briefing()
+            assert len(selects) > 1, "A changed appointment list is rebuilt"
+            assert rebuilt["appointments"] == patched["appointments"]
+            print("Briefing rebuilt after the appointment list changed.")
+
+            response = await client.get("/api/appointment/briefing", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["appointments"] == []
+
+            for day in [tomorrow + timedelta(days=1), tomorrow - timedelta(days=2)]:
+                response = await client.get(
+                    "/api/appointment/briefing",
+                    params={"day": day.isoformat()},
+                    headers=headers,
+                )
+                assert response.status_code == 400, "Only today and tomorrow"
+
+            _dummy_auth_service.user = DummyUser(anna_id, UserRole.patient)
+            response = await client.get("/api/appointment/briefing", headers=headers)
+            assert response.status_code == 403
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_selects)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
@@ -0,0 +1,163 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select, text
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.doctor import doctor_directory_cache
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    async def get_current_user(self, token: str = None):
+        return DummyUser(1)
+
+
+async def create_trigram_indexes() -> bool:
+    """Add the migration's trigram indexes, if pg_trgm is available here."""
+    async with test_engine.connect() as conn:
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception:
+            await conn.rollback()
+            return False
+        await conn.execute(text("""
+                CREATE INDEX ix_users_doctor_specialization_trgm
+                ON users USING gin (specialization gin_trgm_ops)
+                WHERE role = 'doctor'
+                """))
+        await conn.execute(text("""
+                CREATE INDEX ix_users_doctor_name_trgm
+                ON users USING gin (
+                    (coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops
+                )
+                WHERE role = 'doctor'
+                """))
+        await conn.commit()
+        return True
+
+
+def doctor(username, first_name, last_name, specialization, is_available=True):
+    return User(
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password="x",
+        role=UserRole.doctor,
+        first_name=first_name,
+        last_name=last_name,
+        specialization=specialization,
+        is_available=is_available,
+    )
+
+
+@pytest.mark.asyncio
+async def test_doctor_directory_cache_and_indexes():
+    """
+    Filters the doctor directory by specialization and name substrings,
+    serves repeat requests from the cache without touching the database,
+    invalidates the cache when a doctor changes, and checks the directory
+    query plans use the partial and trigram indexes.
+    """
+    has_trigram = await create_trigram_indexes()
+    doctor_directory_cache.invalidate()
+    async with TestAsyncSessionLocal() as session:
+        session.add_all(
+            [
+                doctor("dir_heart", "Ada", "Hart", "Cardiology"),
+                doctor("dir_child", "Bob", "Young", "Pediatric Cardiology"),
+                doctor("dir_brain", "Cy", "Nerve", "Neurology"),
+                doctor("dir_away", "Di", "Gone", "Cardiology", is_available=False),
+                User(
+                    username="dir_patient",
+                    email="dir_patient@example.com",
+                    hashed_password="x",
+                    role=UserRole.patient,
+                    specialization="Cardiology",
+                ),
+            ]
+        )
+        await session.commit()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append((statement, parameters))
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = DummyAuthService
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            async def directory(**params):
+                response = await client.get(
+                    "/api/appointment/doctors", params=params, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                return [d["last_name"] for d in response.json()]
+
+            assert await directory(specialization="cardio") == ["Hart", "Young"]
+            assert await directory(specialization="CARDIO") == ["Hart", "Young"]
+            assert len(statements) == 1, "Filters are cached case-insensitively"
+            assert await directory(name="ada h") == ["Hart"]
+            assert await directory(specialization="100%") == []
+            assert await directory() == ["Hart", "Nerve", "Young"]
+            print(f"Directory queries issued: {len(statements)}")
+
+            async with TestAsyncSessionLocal() as session:
+                session.add(doctor("dir_new", "Ed", "Aorta", "Cardiology"))
+                await session.commit()
+            assert await directory(specialization="cardio") == [
+                "Aorta",
+                "Hart",
+                "Young",
+            ], "A new doctor invalidates the cache"
+
+            async with TestAsyncSessionLocal() as session:
+                away = await session.scalar(
+                    select(User).where(User.username == "dir_away")
+                )
+                away.is_available = True
+                await session.commit()
+            assert "Gone" in await directory(specialization="cardio")
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    def find(fragment):
+        return next(s for s in statements if fragment in s[0])
+
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plans = {}
+        for label, fragment in (
+            ("all", "ORDER BY"),
+            ("specialization", "specialization ILIKE"),
+            ("name", "coalesce(users.first_name"),
+        ):
+            statement, parameters = find(fragment)
+            plan = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            plans[label] = "\n".join(row[0] for row in plan)
+            print(f"{label}:\n{plans[label]}")
+    assert "ix_users_available_doctors" in plans["all"]
+    if has_trigram:
+        assert "ix_users_doctor_specialization_trgm" in plans["specialization"]
+        assert "ix_users_doctor_name_trgm" in plans["name"]
+    else:
+        print("pg_trgm is not available; trigram plans not checked.")
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.doctor import doctor_directory_cache
+from app.services.presence import presence_registry
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user = None
+
+    async def get_current_user(self, token: str = None):
+        return self.user
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_presence_heartbeats_drive_availability(monkeypatch):
+    """
+    A doctor's first heartbeat lists them in the directory; later heartbeats
+    write nothing; they drop out once heartbeats stop, also through the
+    single worker's sweeper, or they sign off. Several workers need a shared
+    backend.
+    """
+    presence_registry.backend.reset()
+    doctor_directory_cache.invalidate()
+    assert (
+        doctor_directory_cache.ttl_seconds <= presence_registry.ttl_seconds
+    ), "Other workers' cached directories expire within the presence TTL"
+    monkeypatch.setattr(presence_registry, "ttl_seconds", 0.2)
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="presence_doctor",
+            email="presence_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            first_name="Doc",
+            last_name="Present",
+            is_available=False,
+        )
+        patient = User(
+            username="presence_patient",
+            email="presence_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([doctor, patient])
+        await session.commit()
+        doctor_id, patient_id = doctor.id, patient.id
+
+    async def is_available():
+        async with TestAsyncSessionLocal() as session:
+            return await session.scalar(
+                select(User.is_available).where(User.id == doctor_id)
+            )
+
+    writes = []
+
+    def count_writes(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            writes.append(statement)
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_writes)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            async def listed():
+                response = await client.get(
+                    "/api/appointment/doctors",
+                    params={"name": "present"},
+                    headers=headers,
+                )
+                assert response.status_code == 200, response.text
+                return [d["id"] for d in response.json()]
+
+            async def beat():
+                _dummy_auth_service.user = DummyUser(doctor_id, UserRole.doctor)
+                response = await client.post("/api/presence/heartbeat", headers=headers)
+                assert response.status_code == 204, response.text
+
+            assert await listed() == []
+
+            await beat()
+            assert len(writes) == 1, "Coming online is persisted"
+            assert await is_available() is True
+            assert await listed() == [doctor_id], "Directory cache was invalidated"
+
+            writes.clear()
+            for _ in range(5):
+                await beat()
+            assert writes == [], "Heartbeats of an online doctor write nothing"
+
+            async with TestAsyncSessionLocal() as session:
+                changed = await presence_registry.sweep(session)
+            assert changed == 0, "Nothing to persist while heartbeats arrive"
+
+            await asyncio.sleep(0.3)
+            async with TestAsyncSessionLocal() as session:
+                assert await presence_registry.sweep(session) == 1
+            assert await is_available() is False
+            assert await listed() == []
+            print("Doctor went offline once heartbeats stopped.")
+
+            await beat()
+            assert await is_available() is True
+            response = await client.delete("/api/presence/heartbeat", headers=headers)
+            assert response.status_code == 204
+            assert await is_available() is False
+
+            await beat()
+            assert await is_available() is True
+            monkeypatch.setattr(
+                presence_registry, "session_factory", TestAsyncSessionLocal
+            )
+            with pytest.raises(RuntimeError, match="REDIS_URL"):
+                presence_registry.start_local_sweeper(0.05, workers=2)
+            presence_registry.start_local_sweeper(0.05)
+            try:
+                await asyncio.sleep(0.5)
+            finally:
+                await presence_registry.stop_local_sweeper()
+            assert await is_available() is False
+            print("The worker's own sweeper expired its in-memory heartbeat.")
+
+            _dummy_auth_service.user = DummyUser(patient_id, UserRole.patient)
+            response = await client.post("/api/presence/heartbeat", headers=headers)
+            assert response.status_code == 403
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_writes)
+        presence_registry.backend.reset()
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
@@ -0,0 +1,167 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select, update
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.doctor_profile import DoctorProfile
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.doctor import doctor_directory_cache
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    async def get_current_user(self, token: str = None):
+        return DummyUser(1)
+
+
+@pytest.mark.asyncio
+async def test_doctor_profiles_filter_and_sort():
+    """
+    New doctors get a stored profile, specialization changes refresh it,
+    and the directory filters and sorts by profile columns in one query.
+    """
+    doctor_directory_cache.invalidate()
+    async with TestAsyncSessionLocal() as session:
+        doctors = [
+            User(
+                username=f"profile_doctor_{i}",
+                email=f"profile_doctor_{i}@example.com",
+                hashed_password="x",
+                role=UserRole.doctor,
+                first_name="Doc",
+                last_name=last_name,
+                specialization=specialization,
+            )
+            for i, (last_name, specialization) in enumerate(
+                [
+                    ("Alpha", "Cardiology"),
+                    ("Bravo", "Neurology"),
+                    ("Charlie", "Dermatology"),
+                ]
+            )
+        ]
+        patient = User(
+            username="profile_patient",
+            email="profile_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([*doctors, patient])
+        await session.commit()
+        ids = {doctor.last_name: doctor.id for doctor in doctors}
+
+        profiles = {
+            profile.doctor_id: profile
+            for profile in (await session.execute(select(DoctorProfile))).scalars()
+        }
+        assert set(profiles) == set(ids.values()), "Only doctors get profiles"
+        alpha = profiles[ids["Alpha"]]
+        assert "Hypertension Management" in alpha.expertise_areas
+        assert alpha.years_experience is None, "Unknown until entered"
+        assert alpha.languages == []
+
+        doctors[2].specialization = "Neurology"
+        await session.commit()
+        await session.refresh(profiles[ids["Charlie"]])
+        assert "Movement Disorders" in profiles[ids["Charlie"]].expertise_areas
+
+        await session.execute(
+            update(DoctorProfile)
+            .where(DoctorProfile.doctor_id == ids["Alpha"])
+            .values(rating=3.2, years_experience=30, languages=["English", "French"])
+        )
+        await session.execute(
+            update(DoctorProfile)
+            .where(DoctorProfile.doctor_id != ids["Alpha"])
+            .values(rating=4.8, years_experience=5)
+        )
+        await session.execute(
+            update(DoctorProfile)
+            .where(DoctorProfile.doctor_id == ids["Charlie"])
+            .values(rating=4.5, years_experience=None)
+        )
+        await session.commit()
+    doctor_directory_cache.invalidate()
+
+    selects = []
+
+    def count_selects(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = DummyAuthService
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            async def directory(**params):
+                response = await client.get(
+                    "/api/appointment/doctors", params=params, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                return response.json()
+
+            selects.clear()
+            by_rating = await directory(sort="rating")
+            assert len(selects) == 1, "Profiles are loaded with the doctors"
+            assert [d["last_name"] for d in by_rating] == ["Bravo", "Charlie", "Alpha"]
+            assert by_rating[0]["rating"] == 4.8
+            assert by_rating[2]["years_experience"] == 30
+
+            by_experience = await directory(sort="experience")
+            assert [d["last_name"] for d in by_experience] == [
+                "Alpha",
+                "Bravo",
+                "Charlie",
+            ], "Unknown experience sorts last"
+
+            rated = await directory(min_rating=4.6)
+            assert [d["last_name"] for d in rated] == ["Bravo"]
+            french = await directory(language="french")
+            assert [d["last_name"] for d in french] == ["Alpha"]
+            seasoned = await directory(min_experience=10)
+            assert [d["last_name"] for d in seasoned] == ["Alpha"]
+            assert len(await directory(min_experience=0)) == 2
+
+            response = await client.get(
+                f"/api/appointment/doctors/{ids['Charlie']}", headers=headers
+            )
+            assert response.status_code == 200, response.text
+            detail = response.json()
+            assert detail["rating"] == 4.5
+            assert "Movement Disorders" in detail["expertise_areas"]
+            print(f"Doctor detail: {detail}")
+
+            response = await client.get(
+                "/api/appointment/doctors", params={"sort": "age"}, headers=headers
+            )
+            assert response.status_code == 422
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_selects)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = await conn.exec_driver_sql(
+            "EXPLAIN SELECT doctor_id FROM doctor_profiles "
+            "WHERE languages @> ARRAY['French']::varchar[]"
+        )
+        plan_text = "\n".join(row[0] for row in plan)
+    print(plan_text)
+    assert "ix_doctor_profiles_languages" in plan_text
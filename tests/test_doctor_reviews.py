@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, update
+
+from app.db.database import TestAsyncSessionLocal
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.doctor_profile import DoctorProfile
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.doctor import doctor_directory_cache
+from app.services.review import rebuild_rating_aggregates
+
+
+class DummyUser:
+    def __init__(self, id, role=UserRole.patient):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user = None
+
+    async def get_current_user(self, token: str = None):
+        return self.user
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_reviews_update_rating_aggregates():
+    """
+    Patients review completed appointments once each; the doctor's rating,
+    count and histogram follow every review, and a rebuild from the raw
+    reviews gives the same aggregates.
+    """
+    base = datetime(2030, 5, 6, 9, 0, tzinfo=timezone.utc)
+    doctor_directory_cache.invalidate()
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="review_doctor",
+            email="review_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            first_name="Doc",
+            last_name="Reviewed",
+        )
+        patients = [
+            User(
+                username=f"review_patient_{i}",
+                email=f"review_patient_{i}@example.com",
+                hashed_password="x",
+                role=UserRole.patient,
+            )
+            for i in range(2)
+        ]
+        session.add_all([doctor, *patients])
+        await session.flush()
+
+        appointments = [
+            Appointment(
+                patient_id=patients[i % 2].id,
+                doctor_id=doctor.id,
+                start_time=base + timedelta(hours=i),
+                end_time=base + timedelta(hours=i, minutes=30),
+                status=(
+                    AppointmentStatus.scheduled
+                    if i == 3
+                    else AppointmentStatus.completed
+                ),
+            )
+            for i in range(4)
+        ]
+        session.add_all(appointments)
+        await session.commit()
+        doctor_id = doctor.id
+        patient_ids = [patient.id for patient in patients]
+        appointment_ids = [appointment.id for appointment in appointments]
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            async def doctor_detail():
+                response = await client.get(
+                    f"/api/appointment/doctors/{doctor_id}", headers=headers
+                )
+                assert response.status_code == 200, response.text
+                return response.json()
+
+            async def review(patient_id, appointment_id, rating):
+                _dummy_auth_service.user = DummyUser(patient_ids[patient_id])
+                return await client.post(
+                    "/api/reviews/",
+                    json={
+                        "appointment_id": appointment_id,
+                        "rating": rating,
+                        "comment": "Thorough and kind.",
+                    },
+                    headers=headers,
+                )
+
+            _dummy_auth_service.user = DummyUser(patient_ids[0])
+            detail = await doctor_detail()
+            assert detail["rating"] is None and detail["review_count"] == 0
+
+            response = await review(0, appointment_ids[0], 5)
+            assert response.status_code == 201, response.text
+            assert response.json()["doctor_id"] == doctor_id
+
+            detail = await doctor_detail()
+            assert detail["rating"] == 5.0, "Directory cache was invalidated"
+            assert detail["rating_histogram"] == [0, 0, 0, 0, 1]
+
+            assert (await review(1, appointment_ids[1], 2)).status_code == 201
+            assert (await review(0, appointment_ids[2], 4)).status_code == 201
+
+            response = await review(0, appointment_ids[0], 1)
+            assert response.status_code == 409, "One review per appointment"
+            response = await review(0, appointment_ids[1], 1)
+            assert response.status_code == 404, "Not this patient's appointment"
+            response = await review(1, appointment_ids[3], 1)
+            assert response.status_code == 404, "Appointment not completed"
+            response = await review(0, appointment_ids[2], 6)
+            assert response.status_code == 422
+
+            _dummy_auth_service.user = DummyUser(doctor_id, UserRole.doctor)
+            response = await client.post(
+                "/api/reviews/",
+                json={"appointment_id": appointment_ids[2], "rating": 5},
+                headers=headers,
+            )
+            assert response.status_code == 403, "Doctors cannot review"
+            detail = await doctor_detail()
+            print(f"Aggregates after three reviews: {detail}")
+            assert detail["review_count"] == 3
+            assert detail["rating"] == pytest.approx(11 / 3)
+            assert detail["rating_histogram"] == [0, 1, 0, 1, 1]
+
+            response = await client.get(
+                f"/api/reviews/doctors/{doctor_id}", params={"limit": 2}
+            )
+            assert response.status_code == 401, "Listing requires authentication"
+            response = await client.get(
+                f"/api/reviews/doctors/{doctor_id}",
+                params={"limit": 2},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            first_page = response.json()
+            assert [r["rating"] for r in first_page] == [4, 2], "Newest first"
+            assert "patient_id" not in first_page[0], "Reviewers stay anonymous"
+            response = await client.get(
+                f"/api/reviews/doctors/{doctor_id}",
+                params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+                headers=headers,
+            )
+            assert [r["rating"] for r in response.json()] == [5]
+            assert "X-Next-Cursor" not in response.headers
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with TestAsyncSessionLocal() as session:
+        await session.execute(
+            update(DoctorProfile)
+            .where(DoctorProfile.doctor_id == doctor_id)
+            .values(rating=1.0, rating_count=99, rating_histogram=[99, 0, 0, 0, 0])
+        )
+        await session.commit()
+        assert await rebuild_rating_aggregates(session) >= 1
+        profile = await session.scalar(
+            select(DoctorProfile).where(DoctorProfile.doctor_id == doctor_id)
+        )
+        assert profile.rating_count == 3 and profile.rating_sum == 11
+        assert profile.rating_histogram == [0, 1, 0, 1, 1]
+        assert profile.rating == pytest.approx(11 / 3)
@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text, update
+
+from app.api.routers import appointment as appointment_router
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import (
+    DOCTOR_OVERLAP_CONSTRAINT,
+    Appointment,
+    AppointmentStatus,
+)
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+async def no_triage_record(*args, **kwargs):
+    return None
+
+
+async def create_overlap_constraint():
+    """
+    Add the migration's exclusion constraint to the test schema. Without the
+    btree_gist extension, fall back to an equivalent range-equality form for
+    the doctor column; both raise the same exclusion violation.
+    """
+    async with test_engine.connect() as conn:
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            await conn.commit()
+            doctor_expr = "doctor_id WITH ="
+        except Exception:
+            await conn.rollback()
+            doctor_expr = "int4range(doctor_id, doctor_id, '[]') WITH ="
+        await conn.execute(text(f"""
+                ALTER TABLE appointments
+                ADD CONSTRAINT {DOCTOR_OVERLAP_CONSTRAINT}
+                EXCLUDE USING gist (
+                    {doctor_expr},
+                    tstzrange(start_time, end_time) WITH &&
+                )
+                WHERE (status = 'scheduled')
+                DEFERRABLE INITIALLY IMMEDIATE
+                """))
+        await conn.commit()
+
+
+@pytest.mark.asyncio
+async def test_double_booking_rejected(monkeypatch):
+    """
+    Overlapping bookings for the same doctor get a 409 listing the nearest free
+    slots, also when given without a UTC offset, while adjacent, other-doctor
+    and post-cancellation bookings succeed.
+    """
+    await create_overlap_constraint()
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="dbl_doctor",
+            email="dbl_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        other_doctor = User(
+            username="dbl_doctor2",
+            email="dbl_doctor2@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        patient = User(
+            username="dbl_patient",
+            email="dbl_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([doctor, other_doctor, patient])
+        await session.commit()
+        doctor_id, other_doctor_id = doctor.id, other_doctor.id
+        _dummy_auth_service.user_id = patient.id
+
+    day = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    def at(hour, minute=0):
+        return (day + timedelta(hours=hour, minutes=minute)).isoformat()
+
+    def booking(doc_id, start, end):
+        return {"doctor_id": doc_id, "start_time": start, "end_time": end}
+
+    monkeypatch.setattr(
+        appointment_router, "create_triage_record_from_chats", no_triage_record
+    )
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(doctor_id, at(10), at(10, 30)),
+                headers=headers,
+            )
+            assert response.status_code == 201, response.text
+            first_id = response.json()["id"]
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(doctor_id, at(10, 15), at(10, 45)),
+                headers=headers,
+            )
+            assert response.status_code == 409, response.text
+            free_slots = response.json()["detail"]["nearest_free_slots"]
+            print(f"Conflict suggested: {free_slots}")
+            assert [
+                datetime.fromisoformat(slot["start_time"]) for slot in free_slots
+            ] == [
+                day + timedelta(hours=10, minutes=30),
+                day + timedelta(hours=9, minutes=30),
+            ]
+
+            naive = {
+                "doctor_id": doctor_id,
+                "start_time": at(10, 15).removesuffix("+00:00"),
+                "end_time": at(10, 45).removesuffix("+00:00"),
+            }
+            response = await client.post(
+                "/api/appointment/", json=naive, headers=headers
+            )
+            assert response.status_code == 409, "Times without offset are UTC"
+            assert response.json()["detail"]["nearest_free_slots"] == free_slots
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(doctor_id, at(10, 30), at(11)),
+                headers=headers,
+            )
+            assert response.status_code == 201, "Back-to-back slots must not conflict"
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(other_doctor_id, at(10), at(10, 30)),
+                headers=headers,
+            )
+            assert response.status_code == 201, "Other doctors are unaffected"
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(doctor_id, at(12), at(11)),
+                headers=headers,
+            )
+            assert response.status_code == 422, "end_time must be after start_time"
+
+            async with TestAsyncSessionLocal() as session:
+                await session.execute(
+                    update(Appointment)
+                    .where(Appointment.id == first_id)
+                    .values(status=AppointmentStatus.cancelled)
+                )
+                await session.commit()
+
+            response = await client.post(
+                "/api/appointment/",
+                json=booking(doctor_id, at(10), at(10, 30)),
+                headers=headers,
+            )
+            assert response.status_code == 201, "Cancelled slots can be rebooked"
+            print("Overlaps rejected; adjacent and rebooked slots accepted.")
+
+            response = await client.get(
+                f"/api/appointment/doctors/{doctor_id}/calendar",
+                params={"start": at(9), "end": at(12)},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            calendar = [
+                datetime.fromisoformat(slot["start_time"]) for slot in response.json()
+            ]
+            assert calendar == [
+                day + timedelta(hours=10),
+                day + timedelta(hours=10, minutes=30),
+            ]
+
+            response = await client.get(
+                f"/api/appointment/doctors/{doctor_id}/calendar",
+                params={"start": at(12), "end": at(9)},
+                headers=headers,
+            )
+            assert response.status_code == 400
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with test_engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        plan = await conn.execute(
+            text(
+                "EXPLAIN SELECT start_time, end_time FROM appointments "
+                "WHERE doctor_id = :doctor_id AND status = 'scheduled' "
+                "AND tstzrange(start_time, end_time) && tstzrange(:start, :end)"
+            ),
+            {
+                "doctor_id": doctor_id,
+                "start": day + timedelta(hours=9),
+                "end": day + timedelta(hours=12),
+            },
+        )
+        plan_text = "\n".join(row[0] for row in plan)
+    print(plan_text)
+    assert DOCTOR_OVERLAP_CONSTRAINT in plan_text, "Calendar query should use the index"
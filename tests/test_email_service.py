@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.email_service import EmailService
+from app.core.smtp_pool import SMTPConnectionPool
+
+
+class SinkHandler:
+    """Collects every message the local SMTP sink receives."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_pooled_smtp_delivery():
+    """
+    Sends several emails through the pool to a local SMTP sink and checks that
+    sessions are reused, and that a dropped session is transparently replaced.
+    """
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        pool = SMTPConnectionPool(
+            hostname="127.0.0.1", port=controller.port, start_tls=False, size=2
+        )
+        email_service = EmailService(pool=pool)
+
+        for i in range(5):
+            sent = await email_service.send_email(
+                f"patient{i}@example.com", "Subject", f"Body {i}"
+            )
+            assert sent is True
+
+        assert len(handler.messages) == 5
+        assert pool.connections_opened == 1, "Sequential sends should reuse a session"
+        print("Five emails delivered over a single pooled SMTP session.")
+
+        for smtp, _ in pool._idle:
+            smtp.close()
+
+        sent = await email_service.send_email("late@example.com", "Subject", "Body")
+        assert sent is True
+        assert len(handler.messages) == 6
+        assert pool.connections_opened == 2
+        print("Dropped session was replaced and the email still delivered.")
+
+        await pool.close()
+    finally:
+        controller.stop()
+
+    sent = await email_service.send_email("nobody@example.com", "Subject", "Body")
+    assert sent is False, "Delivery to a stopped server should report failure"
+    print("Delivery failure reported without raising.")
@@ -0,0 +1,203 @@
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, func, select
+
+from app.core.config import settings
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.health_record import HealthRecord
+from app.models.user import User, UserRole
+from app.services import health_record_import
+from app.services.health_record_import import ndjson_lines
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+    role = UserRole.doctor
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id, self.role)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_bulk_health_record_import(monkeypatch):
+    """
+    Imports NDJSON records in chunks with one INSERT each, reports invalid
+    and dangling rows by line, and resumes an interrupted import from its
+    checkpoint without duplicating rows. Overlong lines are dropped as they
+    stream in and reported.
+    """
+
+    async def stream(*chunks):
+        for chunk in chunks:
+            yield chunk
+
+    split = [
+        line
+        async for line in ndjson_lines(
+            stream(b'{"a"', b": 1}\n" + b"x" * 15, b"y" * 15 + b"\nok\n", b"tail"),
+            max_line_bytes=20,
+        )
+    ]
+    assert split == [b'{"a": 1}', None, b"ok", b"tail"]
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="import_doctor",
+            email="import_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        patient = User(
+            username="import_patient",
+            email="import_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([doctor, patient])
+        await session.commit()
+        doctor_id, patient_id = doctor.id, patient.id
+
+    def record(n, **overrides):
+        row = {
+            "title": f"Imported {n}",
+            "record_type": "doctor_note",
+            "patient_id": patient_id,
+            "symptoms": [{"name": "cough"}],
+        }
+        row.update(overrides)
+        return json.dumps(row)
+
+    lines = [record(n) for n in range(1, 11)]
+    lines[2] = "{not json"
+    lines[4] = record(5, record_type="x_ray")
+    lines[6] = record(7, patient_id=999999)
+    lines.insert(8, "")
+    body = "\n".join(lines) + "\n"
+
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO health_records"):
+            inserts.append(statement)
+
+    monkeypatch.setattr(settings, "HEALTH_RECORD_IMPORT_CHUNK_SIZE", 4)
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_inserts)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {
+                "Authorization": "Bearer dummy_token",
+                "Content-Type": "application/x-ndjson",
+            }
+            _dummy_auth_service.user_id = doctor_id
+
+            original_refresh = health_record_import.refresh_briefings_for_patients
+            calls = []
+
+            async def fail_second_chunk(db, patient_ids):
+                calls.append(patient_ids)
+                if len(calls) == 2:
+                    raise RuntimeError("connection lost")
+                return await original_refresh(db, patient_ids)
+
+            monkeypatch.setattr(
+                health_record_import,
+                "refresh_briefings_for_patients",
+                fail_second_chunk,
+            )
+            response = await client.post(
+                "/api/health-record/bulk", content=body, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            partial = response.json()
+            print(f"Interrupted import: {partial}")
+            assert partial["completed"] is False
+            assert partial["checkpoint"] == 4
+            assert partial["inserted"] == 3
+            assert [e["line"] for e in partial["errors"]] == [3]
+
+            monkeypatch.setattr(
+                health_record_import,
+                "refresh_briefings_for_patients",
+                original_refresh,
+            )
+            inserts.clear()
+            response = await client.post(
+                "/api/health-record/bulk",
+                params={"start_line": partial["checkpoint"]},
+                content=body,
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            report = response.json()
+            print(f"Resumed import: {report}")
+            assert report["completed"] is True
+            assert report["checkpoint"] == 11
+            assert report["inserted"] == 4
+            assert report["failed"] == 2
+            errors = {e["line"]: e["error"] for e in report["errors"]}
+            assert set(errors) == {5, 7}
+            assert errors[5].startswith("record_type")
+            assert "unknown user" in errors[7]
+            assert len(inserts) == 2, "One multi-row INSERT per chunk"
+
+            monkeypatch.setattr(settings, "HEALTH_RECORD_IMPORT_MAX_LINE_BYTES", 200)
+            response = await client.post(
+                "/api/health-record/bulk",
+                content=record(11, summary="x" * 300) + "\n",
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            assert response.json()["errors"] == [
+                {"line": 1, "error": "Line is too long"}
+            ]
+
+            _dummy_auth_service.role = UserRole.patient
+            response = await client.post(
+                "/api/health-record/bulk", content=body, headers=headers
+            )
+            assert response.status_code == 403
+            _dummy_auth_service.role = UserRole.doctor
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_inserts)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with TestAsyncSessionLocal() as session:
+        titles = (
+            (
+                await session.execute(
+                    select(HealthRecord.title)
+                    .where(HealthRecord.patient_id == patient_id)
+                    .order_by(HealthRecord.id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        doctors = await session.scalar(
+            select(func.count(func.distinct(HealthRecord.doctor_id))).where(
+                HealthRecord.patient_id == patient_id
+            )
+        )
+    assert titles == [f"Imported {n}" for n in (1, 2, 4, 6, 8, 9, 10)]
+    assert doctors == 1
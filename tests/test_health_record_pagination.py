@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_health_record_keyset_pagination():
+    """
+    Pages through a patient's records with the keyset cursor, applies type
+    and date filters, lists summaries without the JSON lists, rejects an
+    unknown record_type, and checks the listing is served by its index.
+    """
+    base = datetime(2030, 2, 1, 8, 0, tzinfo=timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        patient = User(
+            username="hr_page_patient",
+            email="hr_page_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        other = User(
+            username="hr_page_other",
+            email="hr_page_other@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([patient, other])
+        await session.flush()
+
+        for day in range(7):
+            session.add(
+                HealthRecord(
+                    patient_id=patient.id,
+                    record_type=(
+                        RecordType.doctor_note if day % 2 else RecordType.at_triage
+                    ),
+                    title=f"Record {day}",
+                    symptoms=[{"name": "cough", "severity": day}],
+                    # Two records share a timestamp; the id breaks the tie.
+                    created_at=base + timedelta(days=min(day, 5)),
+                )
+            )
+        session.add(
+            HealthRecord(
+                patient_id=other.id,
+                record_type=RecordType.at_triage,
+                title="Someone else's",
+                created_at=base,
+            )
+        )
+        await session.commit()
+        _dummy_auth_service.user_id = patient.id
+        url = f"/api/health-record/patient/{patient.id}"
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM health_records" in statement:
+            statements.append((statement, parameters))
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            seen, cursor, pages = [], None, 0
+            while True:
+                params = {"limit": 3}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get(url, params=params, headers=headers)
+                assert response.status_code == 200, response.text
+                seen.extend(response.json())
+                pages += 1
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+
+            assert pages == 3
+            assert [r["title"] for r in seen] == [
+                "Record 6",
+                "Record 5",
+                "Record 4",
+                "Record 3",
+                "Record 2",
+                "Record 1",
+                "Record 0",
+            ]
+            assert seen[0]["symptoms"] == [{"name": "cough", "severity": 6}]
+            print(f"Paged through {len(seen)} records in {pages} pages.")
+
+            response = await client.get(
+                url,
+                params={
+                    "record_type": "DOCTOR_NOTE",
+                    "created_from": (base + timedelta(days=2)).isoformat(),
+                    "created_to": (base + timedelta(days=5)).isoformat(),
+                    "summary": "true",
+                },
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            (note,) = response.json()
+            assert note["title"] == "Record 3"
+            assert "symptoms" not in note and "medication" not in note
+            assert note["record_type"] == "doctor_note"
+
+            response = await client.get(
+                url, params={"record_type": "x-ray"}, headers=headers
+            )
+            assert response.status_code == 400
+            assert "at_triage" in response.json()["detail"]
+
+            response = await client.get(
+                url, params={"cursor": "not-a-cursor"}, headers=headers
+            )
+            assert response.status_code == 400
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    statement, parameters = statements[1]
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+        plan_text = "\n".join(row[0] for row in plan)
+    print(plan_text)
+    assert "ix_health_records_patient_recent" in plan_text
+    assert "Sort" not in plan_text, "Rows come out of the index in page order"
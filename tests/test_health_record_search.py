@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user = None
+
+    async def get_current_user(self, token: str = None):
+        return self.user
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+def note(patient, day, symptoms=(), codes=(), medications=()):
+    return HealthRecord(
+        patient_id=patient.id,
+        record_type=RecordType.doctor_note,
+        title=f"Visit {day}",
+        symptoms=[{"name": name, "severity": 3} for name in symptoms],
+        diagnosis=[{"name": f"Condition {code}", "icd10_code": code} for code in codes],
+        medication=[
+            {"name": name, "dosage": "10 mg", "frequency": "daily"}
+            for name in medications
+        ],
+        created_at=datetime(2030, 4, 1, tzinfo=timezone.utc) + timedelta(days=day),
+    )
+
+
+@pytest.mark.asyncio
+async def test_health_record_containment_search():
+    """
+    Doctors find records by symptom name, ICD-10 code and medication name,
+    alone or combined, through the jsonb_path_ops GIN indexes; names match
+    in any case.
+    """
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="search_doctor",
+            email="search_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        asthma, diabetes = [
+            User(
+                username=f"search_patient_{i}",
+                email=f"search_patient_{i}@example.com",
+                hashed_password="x",
+                role=UserRole.patient,
+            )
+            for i in range(2)
+        ]
+        session.add_all([doctor, asthma, diabetes])
+        await session.flush()
+        session.add_all(
+            [
+                note(asthma, 1, ["Wheezing", "Cough"], ["J45.909"], ["Albuterol"]),
+                note(asthma, 5, ["Cough"], ["J45.909"], ["Albuterol", "Fluticasone"]),
+                note(diabetes, 3, ["Fatigue"], ["E11.9"], ["Metformin"]),
+                note(diabetes, 4, ["Cough"], ["J06.9"]),
+            ]
+        )
+        await session.commit()
+        doctor_id, asthma_id = doctor.id, asthma.id
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM health_records" in statement:
+            statements.append((statement, parameters))
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            _dummy_auth_service.user = DummyUser(doctor_id, UserRole.doctor)
+
+            async def search(**params):
+                response = await client.get(
+                    "/api/health-record/search", params=params, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                return response.json()
+
+            by_code = await search(icd10_code="j45.909")
+            assert [r["title"] for r in by_code] == ["Visit 5", "Visit 1"]
+            assert {r["patient_id"] for r in by_code} == {asthma_id}
+            assert "diagnosis" not in by_code[0], "Search returns summaries"
+            print(f"ICD-10 J45.909: {by_code}")
+
+            coughs = await search(symptom="Cough")
+            assert [r["title"] for r in coughs] == ["Visit 5", "Visit 4", "Visit 1"]
+            response = await client.get(
+                "/api/health-record/search",
+                params={"symptom": "Cough", "limit": 2},
+                headers=headers,
+            )
+            assert len(response.json()) == 2
+            assert response.headers["X-Next-Cursor"]
+
+            combined = await search(symptom="Cough", medication="Fluticasone")
+            assert [r["title"] for r in combined] == ["Visit 5"]
+            assert await search(symptom="cOUGH", medication="fluticasone") == combined
+            assert await search(symptom="Coug") == []
+            assert await search(medication="Metformin", icd10_code="J45.909") == []
+
+            response = await client.get("/api/health-record/search", headers=headers)
+            assert response.status_code == 400
+
+            _dummy_auth_service.user = DummyUser(asthma_id, UserRole.patient)
+            response = await client.get(
+                "/api/health-record/search",
+                params={"medication": "Albuterol"},
+                headers=headers,
+            )
+            assert response.status_code == 403
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for (statement, parameters), index in [
+            (statements[0], "ix_health_records_diagnosis"),
+            (statements[1], "ix_health_records_symptoms_lower"),
+        ]:
+            plan = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            plan_text = "\n".join(row[0] for row in plan)
+            print(plan_text)
+            assert index in plan_text
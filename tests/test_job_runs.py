@@ -0,0 +1,120 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.core import metrics
+from app.core.notifications import DeliveryStats
+from app.db.database import TestAsyncSessionLocal
+from app.main import app
+from app.models.user import UserRole
+from app.services.auth import AuthService
+from app.services.job_runs import JobRunRecorder
+
+
+class DummyUser:
+    def __init__(self, role: UserRole):
+        self.id = 1
+        self.role = role
+        self.username = "job_runs_tester"
+
+
+class DummyAuthService:
+    role = UserRole.admin
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.role)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_job_runs_recorded_and_listed():
+    """
+    Records a successful, a handled-failure and a crashing job run, then reads
+    them back through the admin endpoints and the Prometheus metrics. An idle
+    run is only counted in the metrics.
+    """
+    recorder = JobRunRecorder(TestAsyncSessionLocal)
+    runs_before = metrics.SCHEDULER_JOB_RUNS.labels("test_job", "failed")._value.get()
+
+    async with recorder.track("test_job") as run:
+        stats = DeliveryStats()
+        stats.attempted, stats.sent, stats.failed = 5, 4, 1
+        run.rows_scanned += 3
+        run.record_delivery(stats)
+
+    async with recorder.track("test_job") as run:
+        run.fail(RuntimeError("SMTP down"))
+
+    succeeded_before = metrics.SCHEDULER_JOB_RUNS.labels(
+        "idle_job", "succeeded"
+    )._value.get()
+    async with recorder.track("idle_job"):
+        pass
+    assert (
+        metrics.SCHEDULER_JOB_RUNS.labels("idle_job", "succeeded")._value.get()
+        == succeeded_before + 1
+    ), "Idle runs still count in the metrics"
+
+    with pytest.raises(ValueError):
+        async with recorder.track("other_job"):
+            raise ValueError("boom")
+
+    assert (
+        metrics.SCHEDULER_JOB_RUNS.labels("test_job", "failed")._value.get()
+        == runs_before + 1
+    )
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            response = await client.get("/api/scheduler/runs", headers=headers)
+            assert response.status_code == 200, response.text
+            runs = response.json()
+            assert len(runs) == 3
+            assert runs[0]["job_id"] == "other_job"
+            assert runs[0]["status"] == "failed"
+            assert runs[0]["error"] == "ValueError: boom"
+
+            response = await client.get(
+                "/api/scheduler/runs",
+                params={"job_id": "test_job", "status": "succeeded"},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            (succeeded,) = response.json()
+            assert succeeded["rows_scanned"] == 3
+            assert succeeded["emails_attempted"] == 5
+            assert succeeded["emails_sent"] == 4
+            assert succeeded["emails_failed"] == 1
+            assert succeeded["duration_seconds"] >= 0
+            print(f"Recorded run: {succeeded}")
+
+            response = await client.get("/api/scheduler/runs/summary", headers=headers)
+            assert response.status_code == 200, response.text
+            summary = {row["job_id"]: row for row in response.json()}
+            assert summary["test_job"]["runs"] == 2
+            assert summary["test_job"]["failures"] == 1
+            assert summary["test_job"]["emails_sent"] == 4
+            assert summary["other_job"]["failures"] == 1
+            print(f"Summary: {summary}")
+
+            response = await client.get("/metrics/")
+            assert "healthsync_scheduler_job_duration_seconds_bucket" in response.text
+
+            _dummy_auth_service.role = UserRole.doctor
+            response = await client.get("/api/scheduler/runs", headers=headers)
+            assert response.status_code == 403
+            print("Non-admins cannot read job runs.")
+    finally:
+        _dummy_auth_service.role = UserRole.admin
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
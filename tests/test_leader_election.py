@@ -0,0 +1,57 @@
+import pytest
+
+from app.core.leader import AdvisoryLockLeaderElection
+from app.db.database import test_engine
+
+
+class Candidate:
+    """Records leadership transitions for one simulated worker."""
+
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+
+    async def on_elected(self):
+        self.events.append("elected")
+
+    async def on_demoted(self):
+        self.events.append("demoted")
+
+
+@pytest.mark.asyncio
+async def test_single_leader_with_failover():
+    """
+    Two workers campaign for the same advisory lock: only one leads, and the
+    other takes over once the leader releases the lock.
+    """
+    lock_key = 424242
+    first, second = Candidate("first"), Candidate("second")
+    first_election = AdvisoryLockLeaderElection(
+        test_engine, lock_key, first.on_elected, first.on_demoted
+    )
+    second_election = AdvisoryLockLeaderElection(
+        test_engine, lock_key, second.on_elected, second.on_demoted
+    )
+
+    try:
+        await first_election.step()
+        await second_election.step()
+        assert first_election.is_leader and not second_election.is_leader
+        assert first.events == ["elected"] and second.events == []
+        print("Only the first worker became leader.")
+
+        await first_election.step()
+        await second_election.step()
+        assert first_election.is_leader and not second_election.is_leader
+        print("Leadership is stable across heartbeats.")
+
+        await first_election.stop()
+        assert first.events == ["elected", "demoted"]
+
+        await second_election.step()
+        assert second_election.is_leader
+        assert second.events == ["elected"]
+        print("Second worker took over after the leader stepped down.")
+    finally:
+        await first_election.stop()
+        await second_election.stop()
@@ -0,0 +1,118 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from starlette.requests import Request
+
+from app.main import app
+from app.core.config import settings
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    NO_REFILL_RETRY_AFTER,
+    LoginThrottle,
+    client_ip,
+    login_throttle,
+)
+
+
+@pytest.mark.asyncio
+async def test_login_throttled_before_hashing(monkeypatch):
+    """
+    Checks the token bucket itself, then exhausts the per-username bucket and
+    checks that further attempts, including ones with the right password, get a
+    429 and show up in the metrics. Behind trusted proxies the IP bucket is
+    keyed by the forwarded client address.
+    """
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    results = [
+        await backend.consume("k", capacity=3, refill_per_second=0) for _ in range(4)
+    ]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    await backend.consume("a", capacity=3, refill_per_second=0)
+    await backend.consume("b", capacity=3, refill_per_second=0)
+    assert len(backend._buckets) <= 2
+    print("Token bucket burst, rejection and pruning behave as expected.")
+
+    disabled = LoginThrottle(
+        InMemoryRateLimitBackend(),
+        username_burst=0,
+        username_per_minute=0,
+    )
+    with pytest.raises(HTTPException) as rejected:
+        await disabled.check("anyone")
+    assert rejected.value.status_code == 429
+    assert rejected.value.headers["Retry-After"] == str(NO_REFILL_RETRY_AFTER)
+    print("A zero limit disables logins without dividing by zero.")
+
+    proxied = Request(
+        {
+            "type": "http",
+            "client": ("10.0.0.2", 4321),
+            "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7, 10.0.0.1")],
+        }
+    )
+    assert client_ip(proxied, 0) == "10.0.0.2"
+    assert client_ip(proxied, 2) == "203.0.113.7", "Spoofed entries are skipped"
+    assert client_ip(proxied, 5) == "6.6.6.6"
+    print("Client IP is read past the trusted proxies only.")
+
+    throttle = LoginThrottle(
+        InMemoryRateLimitBackend(),
+        username_burst=2,
+        username_per_minute=1,
+        ip_burst=100,
+        ip_per_minute=100,
+    )
+    monkeypatch.setattr(login_throttle, "backend", throttle.backend)
+    monkeypatch.setattr(login_throttle, "limits", throttle.limits)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        register_payload = {
+            "username": "throttled_user",
+            "email": "throttled_user@example.com",
+            "password": "SecretPassword123!",
+        }
+        reg_response = await client.post("/api/auth/register", json=register_payload)
+        assert reg_response.status_code == 201, reg_response.text
+
+        bad_login = {"username": "throttled_user", "password": "WrongPassword!"}
+        for _ in range(2):
+            response = await client.post("/api/auth/login", data=bad_login)
+            assert response.status_code == 400, response.text
+
+        good_login = {"username": "throttled_user", "password": "SecretPassword123!"}
+        response = await client.post("/api/auth/login", data=good_login)
+        assert response.status_code == 429, response.text
+        assert "Retry-After" in response.headers
+        print("Login correctly throttled after the burst was used up.")
+
+        unknown_login = {"username": "no_such_user", "password": "whatever123"}
+        response = await client.post("/api/auth/login", data=unknown_login)
+        assert response.status_code == 400, response.text
+        print("Unknown usernames go through the dummy-hash path.")
+
+        throttle = LoginThrottle(
+            InMemoryRateLimitBackend(), username_burst=100, ip_burst=1
+        )
+        monkeypatch.setattr(login_throttle, "backend", throttle.backend)
+        monkeypatch.setattr(login_throttle, "limits", throttle.limits)
+        monkeypatch.setattr(settings, "TRUSTED_PROXY_COUNT", 1)
+
+        async def login_from(address):
+            return await client.post(
+                "/api/auth/login",
+                data=unknown_login,
+                headers={"X-Forwarded-For": address},
+            )
+
+        assert (await login_from("203.0.113.5")).status_code == 400
+        assert (await login_from("203.0.113.5")).status_code == 429
+        assert (await login_from("203.0.113.6")).status_code == 400
+        print("Clients behind the proxy get their own IP buckets.")
+
+        metrics_response = await client.get("/metrics/")
+        assert metrics_response.status_code == 200
+        assert 'healthsync_login_throttle_rejections_total{scope="username"}' in (
+            metrics_response.text
+        )
+        print("Throttle rejections exposed as metrics.")
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.doctor
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_my_appointments_keyset_pagination():
+    """
+    Pages through a doctor's appointments (as doctor and as patient) with the
+    keyset cursor, applies date and status filters, and checks the UNION ALL
+    query is answered from the participant indexes.
+    """
+    base = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="mine_doctor",
+            email="mine_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        other_doctor = User(
+            username="mine_other",
+            email="mine_other@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        patient = User(
+            username="mine_patient",
+            email="mine_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        session.add_all([doctor, other_doctor, patient])
+        await session.flush()
+
+        for day in range(7):
+            session.add(
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    start_time=base + timedelta(days=day),
+                    end_time=base + timedelta(days=day, minutes=30),
+                    status=(
+                        AppointmentStatus.cancelled
+                        if day == 2
+                        else AppointmentStatus.scheduled
+                    ),
+                )
+            )
+        # The doctor is also a patient of a colleague.
+        session.add(
+            Appointment(
+                patient_id=doctor.id,
+                doctor_id=other_doctor.id,
+                start_time=base + timedelta(days=3, hours=2),
+                end_time=base + timedelta(days=3, hours=3),
+                status=AppointmentStatus.scheduled,
+            )
+        )
+        # Unrelated appointment, never returned.
+        session.add(
+            Appointment(
+                patient_id=patient.id,
+                doctor_id=other_doctor.id,
+                start_time=base,
+                end_time=base + timedelta(hours=1),
+                status=AppointmentStatus.scheduled,
+            )
+        )
+        await session.commit()
+        _dummy_auth_service.user_id = doctor.id
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "UNION ALL" in statement:
+            statements.append((statement, parameters))
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+
+            seen, cursor, pages = [], None, 0
+            while True:
+                params = {"limit": 3}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get(
+                    "/api/appointment/my-appointments", params=params, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                seen.extend(response.json())
+                pages += 1
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+
+            assert pages == 3
+            assert len(seen) == 8 and len({a["id"] for a in seen}) == 8
+            starts = [a["start_time"] for a in seen]
+            assert starts == sorted(starts, reverse=True), "Newest first"
+            print(f"Paged through {len(seen)} appointments in {pages} pages.")
+
+            response = await client.get(
+                "/api/appointment/my-appointments",
+                params={
+                    "start_from": (base + timedelta(days=1)).isoformat(),
+                    "start_to": (base + timedelta(days=4)).isoformat(),
+                    "status": "scheduled",
+                },
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            window = response.json()
+            assert len(window) == 3, "Days 1 and 3 plus the colleague visit"
+            assert "X-Next-Cursor" not in response.headers
+
+            response = await client.get(
+                "/api/appointment/my-appointments",
+                params={"cursor": "not-a-cursor"},
+                headers=headers,
+            )
+            assert response.status_code == 400
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    statement, parameters = statements[0]
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+        plan_text = "\n".join(row[0] for row in plan)
+    print(plan_text)
+    assert "ix_appointments_patient_start" in plan_text
+    assert "ix_appointments_doctor_start" in plan_text
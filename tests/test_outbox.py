@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, update
+
+from app.main import app
+from app.db.database import TestAsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.services.outbox import OutboxDispatcher
+
+
+class FlakyEmailService:
+    """Fails the first `failures` sends, then accepts everything."""
+
+    def __init__(self, failures=1):
+        self.failures = failures
+        self.sent = []
+
+    async def send_email(self, to: str, subject: str, body: str) -> bool:
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append((to, subject))
+        return True
+
+
+class ClaimCheckingEmailService(FlakyEmailService):
+    """Checks from another connection that the claim is committed and unlocked."""
+
+    async def send_email(self, to: str, subject: str, body: str) -> bool:
+        async with TestAsyncSessionLocal() as other:
+            row = (
+                await other.execute(
+                    select(EmailOutbox.attempts, EmailOutbox.next_attempt_at)
+                    .where(EmailOutbox.recipient == to)
+                    .with_for_update(nowait=True)
+                )
+            ).one()
+            assert row.next_attempt_at > datetime.now(timezone.utc), "Claimed"
+            await other.rollback()
+        return await super().send_email(to, subject, body)
+
+
+@pytest.mark.asyncio
+async def test_registration_email_goes_through_outbox():
+    """
+    Registration stages the welcome email in the outbox instead of sending it
+    inline; the dispatcher then claims it without holding a lock while
+    sending, and delivers it, retrying after a failure.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        register_payload = {
+            "username": "outbox_user",
+            "email": "outbox_user@example.com",
+            "password": "SecretPassword123!",
+        }
+        response = await client.post("/api/auth/register", json=register_payload)
+        assert response.status_code == 201, response.text
+
+    async with TestAsyncSessionLocal() as session:
+        result = await session.execute(select(EmailOutbox))
+        messages = result.scalars().all()
+        assert len(messages) == 1
+        assert messages[0].recipient == "outbox_user@example.com"
+        assert messages[0].status == OutboxStatus.pending
+        print("Welcome email staged in the outbox with the user row.")
+
+        email_service = ClaimCheckingEmailService(failures=1)
+        dispatcher = OutboxDispatcher(email_service, batch_size=10)
+
+        assert await dispatcher.dispatch_batch(session) == 1
+        await session.refresh(messages[0])
+        assert messages[0].status == OutboxStatus.pending
+        assert messages[0].attempts == 1
+        assert messages[0].next_attempt_at > datetime.now(timezone.utc)
+        print("Failed delivery rescheduled with backoff.")
+
+        assert await dispatcher.dispatch_batch(session) == 0, "Not yet due"
+
+        await session.execute(
+            update(EmailOutbox).values(
+                next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+
+        assert await dispatcher.dispatch_batch(session) == 1
+        await session.refresh(messages[0])
+        assert messages[0].status == OutboxStatus.sent
+        assert messages[0].sent_at is not None
+        assert email_service.sent == [
+            ("outbox_user@example.com", "Welcome to HealthSync AI!")
+        ]
+        print("Outbox message delivered on retry and marked sent.")
+
+        assert messages[0].attempts == 2
+        print("Rows were claimed and committed before sending, without locks held.")
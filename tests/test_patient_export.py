@@ -0,0 +1,225 @@
+import io
+import json
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.db.database import TestAsyncSessionLocal
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.chat_room import ChatRoom
+from app.models.chat_session import ChatSession
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import Gender, User, UserRole
+from app.services import patient_export
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+    role = UserRole.patient
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id, self.role)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_patient_export_stream(monkeypatch):
+    """
+    Exports a patient as FHIR-style NDJSON read in small batches, resumes
+    after the last resource received, and streams the same resources as a
+    zip with one member per resource type.
+    """
+    base = datetime(2030, 6, 3, 9, 0, tzinfo=timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        patient = User(
+            username="export_patient",
+            email="export_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+            first_name="Ex",
+            last_name="Port",
+            gender=Gender.prefer_not_to_say,
+            date_of_birth=date(1990, 2, 1),
+            blood_type="O+",
+        )
+        other = User(
+            username="export_other",
+            email="export_other@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        doctor = User(
+            username="export_doctor",
+            email="export_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        session.add_all([patient, other, doctor])
+        await session.flush()
+        room = ChatRoom(patient_id=patient.id, room_number=1)
+        session.add(room)
+        await session.flush()
+
+        for n in range(3):
+            session.add(
+                ChatSession(
+                    patient_id=patient.id,
+                    chat_room_id=room.id,
+                    input_text=f"Symptom report {n}",
+                    model_response="Please see a doctor.",
+                    created_at=base + timedelta(hours=n),
+                )
+            )
+        for n in range(3):
+            session.add(
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    start_time=base + timedelta(days=n),
+                    end_time=base + timedelta(days=n, minutes=30),
+                    status=AppointmentStatus.completed,
+                    telemedicine_url="https://meet.example/export",
+                )
+            )
+        session.add(
+            HealthRecord(
+                patient_id=patient.id,
+                doctor_id=doctor.id,
+                record_type=RecordType.doctor_note,
+                title="Follow-up",
+                summary="Cough <resolving>",
+                diagnosis=[{"name": "Bronchitis", "icd10_code": "J20"}],
+                created_at=base + timedelta(days=1),
+            )
+        )
+        other_record = HealthRecord(
+            patient_id=other.id,
+            record_type=RecordType.doctor_note,
+            title="Not exported",
+        )
+        session.add(other_record)
+        await session.commit()
+        patient_id, other_id, doctor_id = patient.id, other.id, doctor.id
+        other_record_id = other_record.id
+
+    monkeypatch.setattr(patient_export, "EXPORT_BATCH_SIZE", 2)
+
+    async with TestAsyncSessionLocal() as session:
+        patient_row = await patient_export.get_export_patient(session, patient_id)
+        batches = [
+            (resource_type, len(resources))
+            async for resource_type, resources in patient_export.export_patient_resources(
+                session, patient_row
+            )
+        ]
+    print(f"Batches: {batches}")
+    assert max(size for _, size in batches) <= 2, "Read in batches"
+    assert len(batches) == 6
+
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            url = f"/api/export/patient/{patient_id}"
+            _dummy_auth_service.user_id = patient_id
+            _dummy_auth_service.role = UserRole.patient
+
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"].startswith(
+                "application/fhir+ndjson"
+            )
+            resources = [json.loads(line) for line in response.text.splitlines()]
+            types = [r["resourceType"] for r in resources]
+            assert types == ["Patient"] + ["Communication"] * 3 + [
+                "Appointment"
+            ] * 3 + ["Composition"]
+            patient_resource = resources[0]
+            assert patient_resource["gender"] == "unknown"
+            assert patient_resource["birthDate"] == "1990-02-01"
+            assert patient_resource["name"] == [{"family": "Port", "given": ["Ex"]}]
+            sent = [
+                r["sent"] for r in resources if r["resourceType"] == "Communication"
+            ]
+            assert sent == sorted(sent), "Oldest first"
+            appointment = resources[4]
+            assert appointment["status"] == "fulfilled"
+            assert appointment["participant"][1]["actor"] == {
+                "reference": f"Practitioner/{doctor_id}"
+            }
+            composition = resources[-1]
+            assert composition["author"] == [{"reference": f"Practitioner/{doctor_id}"}]
+            assert "Cough &lt;resolving&gt;" in composition["section"][0]["text"]["div"]
+            assert composition["section"][1]["items"][0]["icd10_code"] == "J20"
+            assert "Not exported" not in response.text
+            print(f"Exported {len(resources)} resources.")
+
+            references = [f"{r['resourceType']}/{r['id']}" for r in resources]
+            for cut in (0, 2, 4):
+                response = await client.get(
+                    url, params={"resume_after": references[cut]}, headers=headers
+                )
+                assert response.status_code == 200, response.text
+                rest = [json.loads(line) for line in response.text.splitlines()]
+                assert rest == resources[cut + 1 :], f"Resumed after {references[cut]}"
+
+            for bad in (
+                "Composition/abc",
+                "Observation/1",
+                f"Composition/{other_record_id}",
+            ):
+                response = await client.get(
+                    url, params={"resume_after": bad}, headers=headers
+                )
+                assert response.status_code == 400, bad
+
+            response = await client.get(url, params={"format": "zip"}, headers=headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"] == "application/zip"
+            with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+                assert archive.namelist() == [
+                    "Patient.ndjson",
+                    "Communication.ndjson",
+                    "Appointment.ndjson",
+                    "Composition.ndjson",
+                ]
+                unzipped = [
+                    json.loads(line)
+                    for name in archive.namelist()
+                    for line in archive.read(name).decode().splitlines()
+                ]
+            assert unzipped == resources
+
+            _dummy_auth_service.user_id = other_id
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 403
+
+            _dummy_auth_service.user_id = doctor_id
+            _dummy_auth_service.role = UserRole.doctor
+            response = await client.get(
+                f"/api/export/patient/{doctor_id}", headers=headers
+            )
+            assert response.status_code == 404
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
@@ -0,0 +1,199 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.chat_room import ChatRoom
+from app.models.chat_session import ChatSession
+from app.models.health_record import HealthRecord, RecordType
+from app.models.user import User, UserRole
+from app.services import timeline as timeline_service
+from app.services.auth import AuthService
+
+
+class DummyUser:
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    user_id = None
+    role = UserRole.patient
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(self.user_id, self.role)
+
+
+_dummy_auth_service = DummyAuthService()
+
+
+@pytest.mark.asyncio
+async def test_patient_timeline_stream(monkeypatch):
+    """
+    Streams a patient's chats, appointments and records merged newest first
+    as NDJSON, resumes from the next_cursor line, and checks the UNION ALL
+    reads each source from its patient index.
+    """
+    base = datetime(2030, 5, 6, 9, 0, tzinfo=timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        patient = User(
+            username="timeline_patient",
+            email="timeline_patient@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        other = User(
+            username="timeline_other",
+            email="timeline_other@example.com",
+            hashed_password="x",
+            role=UserRole.patient,
+        )
+        doctor = User(
+            username="timeline_doctor",
+            email="timeline_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        session.add_all([patient, other, doctor])
+        await session.flush()
+        room = ChatRoom(patient_id=patient.id, room_number=1)
+        session.add(room)
+        await session.flush()
+
+        for hour in range(4):
+            session.add(
+                ChatSession(
+                    patient_id=patient.id,
+                    chat_room_id=room.id,
+                    input_text=f"Message {hour}",
+                    model_response="Rest and drink water.",
+                    created_at=base + timedelta(hours=hour),
+                )
+            )
+        for day in range(3):
+            session.add(
+                Appointment(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    start_time=base + timedelta(days=day),
+                    end_time=base + timedelta(days=day, minutes=30),
+                    status=AppointmentStatus.scheduled,
+                )
+            )
+        for hour in (1, 5):
+            session.add(
+                HealthRecord(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    record_type=RecordType.doctor_note,
+                    title=f"Note {hour}",
+                    created_at=base + timedelta(hours=hour),
+                )
+            )
+        # Someone else's history never shows up.
+        session.add(
+            HealthRecord(
+                patient_id=other.id,
+                record_type=RecordType.doctor_note,
+                title="Not mine",
+                created_at=base,
+            )
+        )
+        await session.commit()
+        patient_id, other_id, doctor_id = patient.id, other.id, doctor.id
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "UNION ALL" in statement:
+            statements.append((statement, parameters))
+
+    # Small pages, so a single response spans several round trips.
+    monkeypatch.setattr(timeline_service, "TIMELINE_PAGE_SIZE", 2)
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = lambda: _dummy_auth_service
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            headers = {"Authorization": "Bearer dummy_token"}
+            url = f"/api/timeline/patient/{patient_id}"
+            _dummy_auth_service.user_id = patient_id
+            _dummy_auth_service.role = UserRole.patient
+
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            full = [json.loads(line) for line in response.text.splitlines()]
+            assert len(full) == 9
+            assert len(statements) == 5, "Fetched page by page"
+            keys = [(datetime.fromisoformat(e["at"]), e["type"], e["id"]) for e in full]
+            assert keys == sorted(keys, reverse=True), "Newest first"
+            assert full[0]["type"] == "appointment"
+            assert full[0]["data"]["status"] == "scheduled"
+            # The chat and the record at base+1h tie; kind breaks the tie.
+            at_one_hour = [
+                e["type"]
+                for e in full
+                if datetime.fromisoformat(e["at"]) == base + timedelta(hours=1)
+            ]
+            assert at_one_hour == ["health_record", "chat"]
+            assert {e["data"].get("title") for e in full} >= {"Note 1", "Note 5"}
+            assert "Not mine" not in response.text
+            print(f"Timeline: {[(e['type'], e['at']) for e in full]}")
+
+            seen, cursor, requests = [], None, 0
+            _dummy_auth_service.user_id = doctor_id
+            _dummy_auth_service.role = UserRole.doctor
+            while True:
+                params = {"limit": 4}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get(url, params=params, headers=headers)
+                assert response.status_code == 200, response.text
+                lines = [json.loads(line) for line in response.text.splitlines()]
+                requests += 1
+                cursor = None
+                if lines[-1]["type"] == "next_cursor":
+                    cursor = lines.pop()["cursor"]
+                seen.extend(lines)
+                if not cursor:
+                    break
+            assert requests == 3
+            assert seen == full, "Resuming from the cursor loses nothing"
+
+            response = await client.get(
+                url, params={"cursor": "not-a-cursor"}, headers=headers
+            )
+            assert response.status_code == 400
+
+            _dummy_auth_service.user_id = other_id
+            _dummy_auth_service.role = UserRole.patient
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 403
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    statement, parameters = statements[-1]
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+        plan_text = "\n".join(row[0] for row in plan)
+    print(plan_text)
+    assert "ix_chat_sessions_patient_recent" in plan_text
+    assert "ix_health_records_patient_recent" in plan_text
+    assert "ix_appointments_patient_start" in plan_text
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, select, update
+
+from app.core.notifications import EmailFanout
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.appointment_reminder import AppointmentReminder, ReminderKind
+from app.models.user import User, UserRole
+from app.services.reminders import ReminderDispatcher, create_appointment_reminders
+
+
+class RecordingEmailService:
+    """Collects emails instead of sending them, failing any that mention `failing`."""
+
+    def __init__(self, failing: str):
+        self.failing = failing
+        self.sent = []
+
+    async def send_email(self, to: str, subject: str, body: str) -> bool:
+        if self.failing in to or self.failing in body:
+            return False
+        self.sent.append((to, subject))
+        return True
+
+
+@pytest.mark.asyncio
+async def test_reminder_queue_dispatch():
+    """
+    Books appointments, makes their reminders due, and checks that the poller
+    claims and sends them with a single query, never sends one twice, skips
+    cancelled appointments and releases failed deliveries for retry, only
+    to the recipients that missed them, until they are marked failed.
+    """
+    now = datetime.now(timezone.utc)
+
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="sched_doctor",
+            email="sched_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+            last_name="Who",
+        )
+        patients = [
+            User(
+                username=f"sched_patient{i}",
+                email=f"sched_patient{i}@example.com",
+                hashed_password="x",
+                role=UserRole.patient,
+            )
+            for i in range(4)
+        ]
+        session.add_all([doctor, *patients])
+        await session.flush()
+
+        for i, patient in enumerate(patients):
+            appointment = Appointment(
+                patient_id=patient.id,
+                doctor_id=doctor.id,
+                start_time=now + timedelta(days=2, hours=i),
+                end_time=now + timedelta(days=2, hours=i, minutes=30),
+                status=(
+                    AppointmentStatus.cancelled
+                    if i == 3
+                    else AppointmentStatus.scheduled
+                ),
+            )
+            session.add(appointment)
+            await session.flush()
+            reminders = create_appointment_reminders(session, appointment)
+            assert {r.kind for r in reminders} == set(ReminderKind)
+        await session.commit()
+
+        # Make only the day-before reminders due.
+        await session.execute(
+            update(AppointmentReminder)
+            .where(AppointmentReminder.kind == ReminderKind.day_before)
+            .values(due_at=now - timedelta(minutes=1))
+        )
+        await session.commit()
+
+    email_service = RecordingEmailService(failing="sched_patient2")
+    dispatcher = ReminderDispatcher(
+        EmailFanout(email_service, concurrency=2, rate_per_second=None),
+        batch_size=10,
+    )
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        async with TestAsyncSessionLocal() as session:
+            claimed, stats = await dispatcher.dispatch_due(session)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert claimed == 3, "Cancelled appointment's reminder must not be claimed"
+    assert stats.attempted == 6 and stats.sent == 4 and stats.failed == 2
+    # One claim statement plus one release for the failed reminder.
+    assert len(statements) == 2, f"Expected two statements, got {len(statements)}"
+    recipients = [to for to, _ in email_service.sent]
+    assert recipients.count("sched_doctor@example.com") == 2
+    assert "sched_patient3@example.com" not in recipients
+    print(f"Poller delivered {stats.as_dict()} with a single claim query.")
+
+    async with TestAsyncSessionLocal() as session:
+        claimed_again, _ = await dispatcher.dispatch_due(session)
+        assert claimed_again == 0, "Sent reminders must never be claimed twice"
+
+        result = await session.execute(
+            select(AppointmentReminder).where(
+                AppointmentReminder.kind == ReminderKind.day_before
+            )
+        )
+        day_before = result.scalars().all()
+        unsent = [r for r in day_before if r.sent_at is None]
+        assert len(unsent) == 2, "Failed and cancelled reminders remain unsent"
+        retried = [r for r in unsent if r.attempts == 1]
+        assert len(retried) == 1 and retried[0].due_at > now
+        assert retried[0].last_error is not None
+        print("Reminders are sent once; failed delivery is queued for retry.")
+
+        # The doctor accepts the hour-before reminder but the patient's fails.
+        await session.execute(
+            update(AppointmentReminder)
+            .where(AppointmentReminder.kind == ReminderKind.hour_before)
+            .values(due_at=now - timedelta(minutes=1))
+        )
+        await session.commit()
+        partial_service = RecordingEmailService(failing="sched_patient1@")
+        partial = ReminderDispatcher(
+            EmailFanout(partial_service, concurrency=2, rate_per_second=None),
+            batch_size=10,
+            max_attempts=2,
+        )
+        claimed, stats = await partial.dispatch_due(session)
+        assert claimed == 3 and stats.failed == 1
+        await session.execute(
+            update(AppointmentReminder).values(due_at=now - timedelta(minutes=1))
+        )
+        await session.commit()
+
+        retry_service = RecordingEmailService(failing="sched_patient2")
+        retry = ReminderDispatcher(
+            EmailFanout(retry_service, concurrency=2, rate_per_second=None),
+            batch_size=10,
+            max_attempts=2,
+        )
+        claimed, stats = await retry.dispatch_due(session)
+        assert claimed == 2, "The partly failed and the failed reminder"
+        assert [to for to, _ in retry_service.sent] == [
+            "sched_patient1@example.com"
+        ], "Only the recipient that missed it is emailed again"
+        print("Partial failures are retried for the missed recipient only.")
+
+        result = await session.execute(
+            select(AppointmentReminder)
+            .where(AppointmentReminder.failed_at.is_not(None))
+            .execution_options(populate_existing=True)
+        )
+        (exhausted,) = result.scalars().all()
+        assert exhausted.attempts == 2 and exhausted.sent_at is None
+        claimed, _ = await retry.dispatch_due(session)
+        assert claimed == 0, "Reminders that ran out of attempts leave the queue"
+        print("Exhausted reminders are marked failed.")
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.core.config import settings
+from app.core.scheduler import scheduler_service
+
+
+@pytest.mark.asyncio
+async def test_registering_jobs_keeps_missed_runs(monkeypatch):
+    """
+    Re-declaring the jobs when a worker becomes leader keeps the stored next
+    run time of unchanged jobs, so a run missed during downtime is caught
+    up, and only reschedules a job whose schedule changed. Polling jobs stay
+    out of the persistent store.
+    """
+    scheduler = AsyncIOScheduler(jobstores={"default": MemoryJobStore()})
+    polling = AsyncIOScheduler()
+    monkeypatch.setattr(scheduler_service, "scheduler", scheduler)
+    monkeypatch.setattr(scheduler_service, "polling_scheduler", polling)
+    scheduler.start(paused=True)
+    polling.start(paused=True)
+    try:
+        # A polling job persisted by an earlier release.
+        scheduler.add_job(print, "interval", seconds=5, id="appointment_reminders")
+        scheduler_service._register_jobs()
+        assert {job.id for job in scheduler.get_jobs()} == {
+            "job_run_retention",
+            "doctor_briefings",
+        }
+        assert {job.id for job in polling.get_jobs()} == {
+            "appointment_reminders",
+            "email_outbox_dispatch",
+            "slot_hold_sweep",
+            "presence_sweep",
+        }
+
+        missed = datetime.now(timezone.utc) - timedelta(minutes=5)
+        scheduler.modify_job("doctor_briefings", next_run_time=missed)
+        polling.modify_job("appointment_reminders", next_run_time=missed)
+
+        monkeypatch.setattr(
+            settings, "REMINDER_POLL_SECONDS", settings.REMINDER_POLL_SECONDS + 1
+        )
+        scheduler_service._register_jobs()
+
+        assert scheduler.get_job("doctor_briefings").next_run_time == missed
+        print("Unchanged job kept its missed run time for catch-up.")
+        reminders = polling.get_job("appointment_reminders")
+        assert reminders.next_run_time > missed
+        assert reminders.trigger.interval == timedelta(
+            seconds=settings.REMINDER_POLL_SECONDS
+        )
+        print("Changed job was rescheduled with its new interval.")
+    finally:
+        scheduler.shutdown(wait=False)
+        polling.shutdown(wait=False)
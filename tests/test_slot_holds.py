@@ -0,0 +1,234 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, text, update
+
+from app.api.routers import appointment as appointment_router
+from app.db.database import TestAsyncSessionLocal, test_engine
+from app.main import app
+from app.models.slot_hold import HOLD_OVERLAP_CONSTRAINT, SlotHold
+from app.models.user import User, UserRole
+from app.services.auth import AuthService
+from app.services.slot_holds import sweep_expired_holds
+
+
+class DummyUser:
+    def __init__(self, id):
+        self.id = id
+        self.role = UserRole.patient
+        self.username = f"dummy_{id}"
+
+
+class DummyAuthService:
+    """Treats the bearer token as the user id, so requests can run concurrently."""
+
+    async def get_current_user(self, token: str = None):
+        return DummyUser(int(token))
+
+
+async def create_hold_constraint():
+    """Add the migration's exclusion constraint on slot holds to the test schema."""
+    async with test_engine.connect() as conn:
+        try:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            await conn.commit()
+            doctor_expr = "doctor_id WITH ="
+        except Exception:
+            await conn.rollback()
+            doctor_expr = "int4range(doctor_id, doctor_id, '[]') WITH ="
+        await conn.execute(text(f"""
+                ALTER TABLE slot_holds
+                ADD CONSTRAINT {HOLD_OVERLAP_CONSTRAINT}
+                EXCLUDE USING gist (
+                    {doctor_expr},
+                    tstzrange(start_time, end_time) WITH &&
+                )
+                """))
+        await conn.commit()
+
+
+@pytest.mark.asyncio
+async def test_slot_holds(monkeypatch):
+    """
+    Ten patients race for one slot: exactly one gets the hold, the others
+    are turned away before triage runs. The holder books with the hold, an
+    expired hold can be taken over, and the sweep clears expired holds.
+    """
+    await create_hold_constraint()
+    async with TestAsyncSessionLocal() as session:
+        doctor = User(
+            username="hold_doctor",
+            email="hold_doctor@example.com",
+            hashed_password="x",
+            role=UserRole.doctor,
+        )
+        patients = [
+            User(
+                username=f"hold_patient_{i}",
+                email=f"hold_patient_{i}@example.com",
+                hashed_password="x",
+                role=UserRole.patient,
+            )
+            for i in range(10)
+        ]
+        session.add_all([doctor, *patients])
+        await session.commit()
+        doctor_id = doctor.id
+        patient_ids = [patient.id for patient in patients]
+
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    slot = {
+        "doctor_id": doctor_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=30)).isoformat(),
+    }
+    triage_calls = []
+
+    async def record_triage(*args, **kwargs):
+        triage_calls.append(args)
+        return None
+
+    monkeypatch.setattr(
+        appointment_router, "create_triage_record_from_chats", record_triage
+    )
+    original_auth_override = app.dependency_overrides.get(AuthService)
+    app.dependency_overrides[AuthService] = DummyAuthService
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+
+            def as_user(user_id):
+                return {"Authorization": f"Bearer {user_id}"}
+
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/api/appointment/holds", json=slot, headers=as_user(pid)
+                    )
+                    for pid in patient_ids
+                )
+            )
+            codes = sorted(response.status_code for response in responses)
+            assert codes == [201] + [409] * 9, codes
+            winner = next(r for r in responses if r.status_code == 201).json()
+            holder = patient_ids[[r.status_code for r in responses].index(201)]
+            other = next(pid for pid in patient_ids if pid != holder)
+            print(f"Patient {holder} holds slot until {winner['expires_at']}")
+
+            overlapping = {
+                **slot,
+                "start_time": (start + timedelta(minutes=15)).isoformat(),
+                "end_time": (start + timedelta(minutes=45)).isoformat(),
+            }
+            response = await client.post(
+                "/api/appointment/holds", json=overlapping, headers=as_user(other)
+            )
+            assert response.status_code == 409
+
+            naive = {
+                **slot,
+                "start_time": start.replace(tzinfo=None).isoformat(),
+                "end_time": (start + timedelta(minutes=30))
+                .replace(tzinfo=None)
+                .isoformat(),
+            }
+            response = await client.post(
+                "/api/appointment/holds", json=naive, headers=as_user(other)
+            )
+            assert response.status_code == 409, "Times without offset are UTC"
+            past = {
+                **slot,
+                "start_time": "2020-01-01T10:00:00",
+                "end_time": "2020-01-01T10:30:00",
+            }
+            response = await client.post(
+                "/api/appointment/holds", json=past, headers=as_user(other)
+            )
+            assert response.status_code == 400
+
+            response = await client.post(
+                "/api/appointment/", json=slot, headers=as_user(other)
+            )
+            assert response.status_code == 409, response.text
+            assert triage_calls == [], "Rejected before any triage work"
+
+            response = await client.post(
+                "/api/appointment/",
+                json={**slot, "hold_id": winner["id"] + 1000},
+                headers=as_user(holder),
+            )
+            assert response.status_code == 409, "Unknown hold ids are rejected"
+
+            response = await client.post(
+                "/api/appointment/",
+                json={**slot, "hold_id": winner["id"]},
+                headers=as_user(holder),
+            )
+            assert response.status_code == 201, response.text
+            assert len(triage_calls) == 1
+
+            async with TestAsyncSessionLocal() as session:
+                remaining = await session.scalar(select(SlotHold.id))
+            assert remaining is None, "The hold is consumed by the booking"
+
+            response = await client.post(
+                "/api/appointment/holds", json=slot, headers=as_user(other)
+            )
+            assert response.status_code == 409, "Booked slots cannot be held"
+
+            later = {
+                **slot,
+                "start_time": (start + timedelta(hours=1)).isoformat(),
+                "end_time": (start + timedelta(hours=1, minutes=30)).isoformat(),
+            }
+            response = await client.post(
+                "/api/appointment/holds", json=later, headers=as_user(holder)
+            )
+            assert response.status_code == 201
+            expired_id = response.json()["id"]
+            async with TestAsyncSessionLocal() as session:
+                await session.execute(
+                    update(SlotHold)
+                    .where(SlotHold.id == expired_id)
+                    .values(expires_at=datetime.now(timezone.utc))
+                )
+                await session.commit()
+
+            response = await client.post(
+                "/api/appointment/holds", json=later, headers=as_user(other)
+            )
+            assert response.status_code == 201, "Expired holds can be taken over"
+            taken_over = response.json()["id"]
+
+            response = await client.delete(
+                f"/api/appointment/holds/{taken_over}", headers=as_user(holder)
+            )
+            assert response.status_code == 404, "Only the holder can release it"
+            response = await client.delete(
+                f"/api/appointment/holds/{taken_over}", headers=as_user(other)
+            )
+            assert response.status_code == 204
+    finally:
+        if original_auth_override:
+            app.dependency_overrides[AuthService] = original_auth_override
+        else:
+            app.dependency_overrides.pop(AuthService, None)
+
+    async with TestAsyncSessionLocal() as session:
+        session.add(
+            SlotHold(
+                doctor_id=doctor_id,
+                patient_id=patient_ids[0],
+                start_time=start + timedelta(hours=3),
+                end_time=start + timedelta(hours=4),
+                expires_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+            )
+        )
+        await session.commit()
+        assert await sweep_expired_holds(session) == 1
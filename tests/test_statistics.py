@@ -1,7 +1,7 @@
 import pytest
 from httpx import AsyncClient, ASGITransport
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.main import app
 from app.db.database import TestAsyncSessionLocal
@@ -68,18 +68,19 @@ async def setup_data_for_statistics():
         await session.refresh(d1)
         print(f"SETUP: Users created: p1={p1.id}, p2={p2.id}, d1={d1.id}")
 
+        now = datetime.now(timezone.utc)
         appt1 = Appointment(
             patient_id=p1.id,
             doctor_id=d1.id,
-            start_time=datetime.now(timezone.utc),
-            end_time=datetime.now(timezone.utc),
+            start_time=now,
+            end_time=now + timedelta(minutes=30),
             status=AppointmentStatus.scheduled,
         )
         appt2 = Appointment(
             patient_id=p2.id,
             doctor_id=d1.id,
-            start_time=datetime.now(timezone.utc),
-            end_time=datetime.now(timezone.utc),
+            start_time=now,
+            end_time=now + timedelta(minutes=30),
             status=AppointmentStatus.completed,
         )
         session.add_all([appt1, appt2])